@@ -0,0 +1,159 @@
+# Copyright NTESS. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: MIT
+"""Detect specs whose inputs changed since they last ran.
+
+The inputs of a spec are its test file and the sources of its assets.  When a session starts, the
+content hash of each input of each job that will run is recorded in the workspace database.  A spec
+has changed if the hash of any of its inputs no longer matches the recorded hash.  Recording is
+opt-in: it is done for sessions run with ``--only=changed`` or with ``run:record_inputs`` set, and
+for every session of a workspace once its inputs have been recorded, so the records stay current.
+
+Files shared between specs (eg, the file of a parameterized test) are only examined once, and files
+are examined concurrently since each examination is dominated by file system latency.  Hashes are
+cached in the database along with the file's modification time and size so that a file is only
+read again when it is modified.
+"""
+
+import dataclasses
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Iterable
+
+from .jobspec import _GlobalSpecCache
+from .util import logging
+
+if TYPE_CHECKING:
+    from .database import WorkspaceDatabase
+    from .jobspec import JobSpec
+
+logger = logging.get_logger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class FileState:
+    path: str
+    mtime_ns: int = -1
+    size: int = -1
+    digest: str | None = None
+
+    @property
+    def mtime(self) -> float:
+        return self.mtime_ns / 1e9
+
+
+class ChangeDetector:
+    def __init__(self, db: "WorkspaceDatabase") -> None:
+        self.db = db
+        self.states: dict[str, FileState] = {}
+
+    def scan(self, paths: Iterable[str]) -> dict[str, FileState]:
+        """Return the state of each file in ``paths``.  Each file is only examined once."""
+        paths = set(paths)
+        if todo := sorted(paths.difference(self.states)):
+            known = self.db.get_file_states(todo)
+            with ThreadPoolExecutor() as ex:
+                states = list(ex.map(lambda path: examine(path, known.get(path)), todo))
+            self.states.update((state.path, state) for state in states)
+            modified = [s for s in states if s.digest is not None and s != known.get(s.path)]
+            if modified:
+                self.db.put_file_states(modified)
+        return {path: self.states[path] for path in paths}
+
+    def enabled(self, only: str) -> bool:
+        """Whether the inputs of a session run with rerun strategy ``only`` should be recorded"""
+        from . import config
+
+        if only == "changed" or config.get("run:record_inputs"):
+            return True
+        return self.db.has_spec_inputs()
+
+    def record(self, specs: Iterable["JobSpec"]) -> None:
+        """Record the current hashes of the inputs to ``specs``.  Only specs whose recorded
+        hashes differ are written."""
+        dirs: dict[str, list[str]] = {}
+        inputs = {spec.id: spec_inputs(spec, dirs) for spec in specs}
+        states = self.scan(path for paths in inputs.values() for path in paths)
+        rows = {id: {path: states[path].digest for path in paths} for id, paths in inputs.items()}
+        recorded = self.db.get_spec_inputs(list(rows))
+        if modified := {id: row for id, row in rows.items() if recorded.get(id) != row}:
+            self.db.put_spec_inputs(modified)
+
+    def changed(self, candidates: Iterable[tuple[str, Path, float]]) -> set[str]:
+        """Return the IDs of specs whose inputs changed since they last ran.
+
+        ``candidates`` are ``(spec_id, file, started_at)`` tuples.  Specs whose inputs were never
+        recorded fall back to comparing the modification time of ``file`` to ``started_at``.
+
+        """
+        candidates = list(candidates)
+        recorded = self.db.get_spec_inputs([c[0] for c in candidates])
+        paths: set[str] = set()
+        for id, file, _ in candidates:
+            if id in recorded:
+                paths.update(recorded[id])
+            else:
+                paths.add(os.path.abspath(file))
+        states = self.scan(paths)
+        changed: set[str] = set()
+        for id, file, started_at in candidates:
+            if id in recorded:
+                if any(states[path].digest != digest for path, digest in recorded[id].items()):
+                    changed.add(id)
+            elif started_at > 0 and states[os.path.abspath(file)].mtime > started_at:
+                changed.add(id)
+        logger.debug(f"{len(changed)} of {len(candidates)} specs changed since their last run")
+        return changed
+
+
+def spec_inputs(spec: "JobSpec", dirs: dict[str, list[str]] | None = None) -> list[str]:
+    """The test file of ``spec`` and its asset files (directories are expanded).  ``dirs`` caches
+    the expansion of directories shared by several specs."""
+    dirs = {} if dirs is None else dirs
+    inputs: list[str] = [os.path.abspath(spec.file)]
+    for asset in spec.assets:
+        src = os.path.abspath(asset.src)
+        if src in dirs:
+            inputs.extend(dirs[src])
+        elif not os.path.isdir(src):
+            inputs.append(src)
+        else:
+            inputs.extend(dirs.setdefault(src, walk_files(src)))
+    return inputs
+
+
+def walk_files(path: str) -> list[str]:
+    files: list[str] = []
+    for dirname, dirnames, filenames in os.walk(path):
+        dirnames.sort()
+        files.extend(os.path.join(dirname, f) for f in sorted(filenames))
+    return files
+
+
+def examine(path: str, known: FileState | None = None) -> FileState:
+    """Stat ``path`` and hash it, unless its size and modification time match ``known``"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return FileState(path)
+    if known is not None and (known.mtime_ns, known.size) == (st.st_mtime_ns, st.st_size):
+        return known
+    digest = _GlobalSpecCache.cached_file_hash(Path(path), st.st_mtime_ns, st.st_size)
+    if digest is None:
+        try:
+            digest = file_hash(path)
+        except OSError:
+            return FileState(path)
+    return FileState(path, mtime_ns=st.st_mtime_ns, size=st.st_size, digest=digest)
+
+
+def file_hash(path: str) -> str:
+    """Hash of the file's contents, computed the same way as for spec IDs"""
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while chunk := fh.read(1 << 20):
+            h.update(chunk)
+    return h.digest()[:16].hex()
@@ -15,6 +15,7 @@ import urllib
 import urllib.parse
 from typing import TYPE_CHECKING
 from typing import Any
+from typing import Callable
 from typing import Sequence
 
 from .. import version
@@ -81,7 +82,11 @@ class Parser(argparse.ArgumentParser):
         self.register("type", None, identity)
         self.__subcommand_objects: dict[str, "CanarySubcommand"] = {}
         self.__subcommand_parsers: dict[str, "Parser"] = {}
+        self.__deferred_setup: list[Callable[[], None]] = []
         self.argv: Sequence[str] = sys.argv[1:]
+        # Name of the subcommand found on the command line by preparse, if any.  The parsers of
+        # other subcommands are not needed and are not fully set up.
+        self.command_hint: str | None = None
         if positionals_title:
             self._positionals.title = positionals_title
 
@@ -89,7 +94,7 @@ class Parser(argparse.ArgumentParser):
         return shlex.split(arg_line.split("#", 1)[0].strip())
 
     def preparse(self, args: list[str], addopts: bool = False):
-        ns = argparse.Namespace(plugins=[], debug=False, C=None)
+        ns = argparse.Namespace(plugins=[], debug=False, C=None, command=None)
         if addopts:
             self.add_opts_from_environment(args)
         for i, arg in enumerate(args):
@@ -101,6 +106,7 @@ class Parser(argparse.ArgumentParser):
             opt = args[i]
             i += 1
             if opt in commands:
+                ns.command = opt
                 return ns
             if isinstance(opt, str):
                 if opt == "-p":
@@ -138,11 +144,28 @@ class Parser(argparse.ArgumentParser):
                 argv[i:i] = shlex.split(env_opts)
 
     def parse_known_args(self, args=None, namespace=None):
+        self.complete_setup()
         if args is not None:
             self.argv = args
         namespace, unknown_args = super().parse_known_args(args, namespace)
         return namespace, unknown_args
 
+    def format_help(self) -> str:
+        self.complete_setup()
+        return super().format_help()
+
+    def defer_setup(self, setup: Callable[[], None]) -> None:
+        """Defer adding arguments to this parser until it is used"""
+        self.__deferred_setup.append(setup)
+
+    def setup_pending(self) -> bool:
+        return bool(self.__deferred_setup)
+
+    def complete_setup(self) -> None:
+        while self.__deferred_setup:
+            setup = self.__deferred_setup.pop(0)
+            setup()
+
     def _read_args_from_files(self, arg_strings: list[str]) -> list[str]:
         arg_strings = super()._read_args_from_files(arg_strings)
         self.argv = arg_strings
@@ -170,10 +193,17 @@ class Parser(argparse.ArgumentParser):
         subparser = self.subparsers.add_parser(command.name, **kwds)
         subparser.register("type", None, identity)
         command.setup_parser(subparser)  # type: ignore
-        try:
-            add_parser_help(subparser)
-        except argparse.ArgumentError:
-            pass
+
+        def add_help() -> None:
+            try:
+                add_parser_help(subparser)
+            except argparse.ArgumentError:
+                pass
+
+        if subparser.setup_pending():
+            subparser.defer_setup(add_help)
+        else:
+            add_help()
 
         self.__subcommand_objects[command.name] = command
         self.__subcommand_parsers[command.name] = subparser
@@ -208,7 +238,7 @@ class Parser(argparse.ArgumentParser):
 
     def add_plugin_argument_group(self, *args, **kwargs):
         if "command" in kwargs:
-            parser = self.__subcommand_parsers[kwargs.pop("command")]
+            parser = self.get_subparser(kwargs.pop("command"))
         else:
             parser = self
         return super(Parser, parser).add_argument_group(*args, **kwargs)
@@ -244,10 +274,13 @@ class Parser(argparse.ArgumentParser):
                 p = getattr(current, "prog", current)
                 raise KeyError(f"No subparsers found under parser {p}")
             try:
-                current = sub_action.choices[name]
+                subparser: Parser = sub_action.choices[name]
             except KeyError as e:
                 choices = list(sub_action.choices.keys())
                 raise KeyError(f"Unknown subcommand {name}. Available: {choices}") from e
+            if sub_action.choices.get(current.command_hint or name, subparser) is subparser:
+                subparser.complete_setup()
+            current = subparser
         return current
 
     def update_argument(self, option: str, **kwargs: Any) -> None:
@@ -278,9 +311,22 @@ def identity(arg):
 
 
 def known_commands() -> list[str]:
-    from ..plugins.subcommands import plugins
+    from .. import plugincache
+
+    if (commands := plugincache.known_commands()) is not None:
+        return commands
+
+    from ..plugins.subcommands import names
+
+    return list(names)
 
-    return [p.__name__.split(".")[-1] for p in plugins]
+
+class VersionAction(argparse._VersionAction):
+    """Determine the version only when it is requested, it can be expensive for editable installs"""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        self.version = version.__version__
+        super().__call__(parser, namespace, values, option_string=option_string)
 
 
 class EnvironmentModification(argparse.Action):
@@ -347,9 +393,7 @@ def make_argument_parser(**kwargs):
         positionals_title="subcommands",
         **kwargs,
     )
-    parser.add_argument(
-        "--version", action="version", version=version.__version__, help="show version and exit"
-    )
+    parser.add_argument("--version", action=VersionAction, help="show version and exit")
     parser.add_argument(
         "-C",
         default=None,
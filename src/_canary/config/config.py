@@ -58,6 +58,7 @@ def default_config_values() -> dict[str, Any]:
         },
         "run": {
             "default_tag": ":all:",
+            "record_inputs": False,
             "timeout": {
                 "session": -1.0,
                 "multiplier": 1.0,
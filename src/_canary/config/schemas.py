@@ -86,12 +86,17 @@ workspace_schema = Schema(
             Optional("mode", default=default_view["mode"]): And(str, validate_view("mode")),
             Optional("when", default=default_view["when"]): And(str, validate_view("when")),
             Optional("only", default=default_view["only"]): And(str, validate_view("only")),
-        }
+        },
+        Optional("format"): And(Use(int), lambda n: n in (1, 2)),
     }
 )
 
 run_schema = Schema(
-    {Optional("default_tag"): str, Optional("timeout"): {Optional(str): Use(time_in_seconds)}}
+    {
+        Optional("default_tag"): str,
+        Optional("record_inputs"): Use(boolean),
+        Optional("timeout"): {Optional(str): Use(time_in_seconds)},
+    }
 )
 
 
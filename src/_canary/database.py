@@ -2,8 +2,10 @@
 #
 # SPDX-License-Identifier: MIT
 import collections
+import contextlib
 import dataclasses
 import datetime
+import os
 import sqlite3
 import threading
 import time
@@ -12,16 +14,20 @@ from concurrent.futures import as_completed
 from pathlib import Path
 from typing import TYPE_CHECKING
 from typing import Any
+from typing import Generator
 from typing import Iterable
 
 from . import jobspec
+from .changes import FileState
 from .job import JobPhase
 from .job import JobState
 from .jobspec import JobSpec
 from .jobspec_graph import make_spec_graph
 from .status import Status
+from .timekeeper import Timekeeper
 from .util import json_helper as json
 from .util import logging
+from .util.filesystem import is_network_filesystem
 from .util.multiprocessing import FSQueue
 
 if TYPE_CHECKING:
@@ -30,9 +36,43 @@ if TYPE_CHECKING:
 
 logger = logging.get_logger(__name__)
 
+# Columns of the results, latest_results, and results_archive tables.  Timestamps are those of the
+# job's Timekeeper and peak_rss is the peak resident set size (in MB) of the job's process
+result_columns: list[tuple[str, str]] = [
+    ("spec_id", "TEXT"),
+    ("spec_name", "TEXT"),
+    ("spec_fullname", "TEXT"),
+    ("file_root", "TEXT"),
+    ("file_path", "TEXT"),
+    ("session", "TEXT"),
+    ("workspace", "TEXT"),
+    ("job_state", "TEXT"),
+    ("status_category", "TEXT"),
+    ("status_outcome", "TEXT"),
+    ("status_reason", "TEXT"),
+    ("status_code", "INTEGER"),
+    ("submitted", "REAL"),
+    ("staged", "REAL"),
+    ("started", "REAL"),
+    ("stopped", "REAL"),
+    ("finished", "REAL"),
+    ("duration", "REAL"),
+    ("peak_rss", "REAL"),
+    ("measurements", "TEXT"),
+]
+
 
 class WorkspaceDatabase:
-    """Database wrapper"""
+    """Database wrapper
+
+    The database is kept in WAL mode so that readers (``canary status``, reports, etc.) and the
+    writer never block each other, even across processes (see :func:`journal_mode` for when it is
+    not).  The last connection to close switches it back to a rollback journal, which anyone with
+    read access can read.  ``connection`` is the writer and ``reader`` a read-only connection used
+    by queries.  Queries spanning more than one statement run in a :meth:`snapshot` so that they
+    never observe a partially written batch of results.
+
+    """
 
     def __init__(self, root: Path):
         self.root = Path(root)
@@ -41,6 +81,10 @@ class WorkspaceDatabase:
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self._connection: sqlite3.Connection | None = None
         self._ready: bool = False
+        # Read-only connections, one per thread
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
 
     @property
     def connection(self) -> sqlite3.Connection:
@@ -49,14 +93,116 @@ class WorkspaceDatabase:
         assert self._connection is not None
         return self._connection
 
+    @property
+    def reader(self) -> sqlite3.Connection:
+        """The calling thread's read-only connection"""
+        conn: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if conn is None:
+            if not self._ready and not self._has_schema():
+                self.connect()
+            conn = sqlite3.connect(
+                self._reader_uri(),
+                uri=True,
+                timeout=30.0,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            self._local.connection = conn
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+
+    @contextlib.contextmanager
+    def snapshot(self) -> Generator[sqlite3.Connection, None, None]:
+        """Read from a consistent snapshot of the database.
+
+        Every statement executed on the yielded (read-only) connection sees the database as of
+        the first read, regardless of what the writer commits in the meantime.  Snapshots nest.
+        An open snapshot keeps WAL checkpoints from completing, so do not hold one across a
+        ``yield`` or any other unbounded wait.
+
+        """
+        conn = self.reader
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def checkpoint(self, mode: str = "PASSIVE") -> tuple[int, int, int]:
+        """Copy committed transactions from the write-ahead log into the database file.
+
+        ``PASSIVE`` copies what it can without waiting on readers, ``TRUNCATE`` waits for readers
+        (up to the busy timeout) and resets the log to zero bytes.  Returns SQLite's
+        ``(busy, log pages, checkpointed pages)``.
+
+        """
+        row = self.connection.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        return row[0], row[1], row[2]
+
     def listener(self) -> "ResultListener":
         return ResultListener(self)
 
     def close(self) -> None:
+        with self._lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            conn.close()
+        self._local = threading.local()
         if self._connection is not None:
+            self._leave_wal()
             self._connection.close()
             self._connection = None
 
+    def _leave_wal(self) -> None:
+        """Switch the database back to a rollback journal so that WAL is only in effect while the
+        database is being written.  A WAL database cannot be read by users without write access to
+        the workspace once its ``-shm`` file is gone.  The switch only succeeds for the last
+        connection to the database, other connections leave it to that one."""
+        assert self._connection is not None
+        if self._connection.execute("PRAGMA journal_mode;").fetchone()[0].upper() != "WAL":
+            return
+        self._connection.execute("PRAGMA busy_timeout=0;")
+        try:
+            self._connection.execute("PRAGMA journal_mode=DELETE;")
+        except sqlite3.OperationalError as e:
+            logger.debug(f"Leaving {self.path} in WAL mode: {e}")
+
+    def _reader_uri(self) -> str:
+        """URI of the read-only connections.  A WAL database whose ``-shm`` file is gone (no
+        connection has it open) cannot otherwise be read without write access to its directory,
+        e.g., if a session was killed before the database was switched back to a rollback journal"""
+        uri = f"{self.path.absolute().as_uri()}?mode=ro"
+        if (
+            os.access(self.path.parent, os.W_OK)
+            or self.path.with_name(f"{self.path.name}-shm").exists()
+        ):
+            return uri
+        try:
+            with open(self.path, "rb") as fh:
+                header = fh.read(20)
+        except OSError:
+            return uri
+        # Bytes 18 and 19 of the header are the file format versions, 2 for WAL
+        if header[18:19] == b"\x02":
+            uri += "&immutable=1"
+        return uri
+
+    def _has_schema(self) -> bool:
+        if not self.path.exists():
+            return False
+        conn = sqlite3.connect(self._reader_uri(), uri=True)
+        try:
+            sql = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'latest_results'"
+            return conn.execute(sql).fetchone() is not None
+        finally:
+            conn.close()
+
     @classmethod
     def create(cls, path: Path) -> "WorkspaceDatabase":
         self = cls(path)
@@ -71,8 +217,18 @@ class WorkspaceDatabase:
     def connect(self) -> None:
         if self._connection is None:
             self._connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
-            self._connection.execute("PRAGMA journal_mode=MEMORY;")
-            self._connection.execute("PRAGMA synchronous=OFF;")
+            mode = journal_mode(self.path)
+            row = self._connection.execute("PRAGMA journal_mode;").fetchone()
+            current = row[0].upper()
+            # A nested instance must not switch the database out of WAL: the switch fails while
+            # the instance that launched it is connected
+            if mode != current and not (current == "WAL" and canary_level() > 0):
+                self._connection.execute(f"PRAGMA journal_mode={mode};")
+                current = mode
+            # In WAL mode commits are only synced to disk by checkpoints: a crash may lose the
+            # most recent transactions but cannot corrupt the database
+            synchronous = "NORMAL" if current == "WAL" else "OFF"
+            self._connection.execute(f"PRAGMA synchronous={synchronous};")
             self._connection.execute("PRAGMA foreign_key=ON;")
         assert self._connection is not None
         conn = self._connection
@@ -145,24 +301,7 @@ class WorkspaceDatabase:
                 """
             )
 
-            sql = """CREATE TABLE IF NOT EXISTS results (
-            spec_id TEXT,
-            spec_name TEXT,
-            spec_fullname TEXT,
-            file_root TEXT,
-            file_path TEXT,
-            session TEXT,
-            workspace TEXT,
-            job_state TEXT,
-            status_category TEXT,
-            status_outcome TEXT,
-            status_reason TEXT,
-            status_code INTEGER,
-            timekeeper TEXT,
-            measurements TEXT,
-            PRIMARY KEY (spec_id, session)
-            )"""
-            conn.execute(sql)
+            create_results_table(conn, "results", "PRIMARY KEY (spec_id, session)")
 
             sql = "CREATE INDEX IF NOT EXISTS ix_results_id ON results (spec_id)"
             conn.execute(sql)
@@ -171,6 +310,53 @@ class WorkspaceDatabase:
             conn.execute(sql)
 
         _migrate_results_status_state_to_job_state(self)
+        _migrate_results_timekeeper_to_columns(self)
+
+        with conn:
+            # The latest result of each spec, maintained on insert so that queries of the current
+            # state of the workspace never have to search the result history
+            create_results_table(conn, "latest_results", "PRIMARY KEY (spec_id)", rowid=False)
+
+            sql = "CREATE INDEX IF NOT EXISTS ix_latest_results_category "
+            sql += "ON latest_results (status_category)"
+            conn.execute(sql)
+
+            conn.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS trg_latest_results_insert
+                AFTER INSERT ON results
+                WHEN NEW.session >= COALESCE(
+                  (SELECT session FROM latest_results WHERE spec_id = NEW.spec_id), ''
+                )
+                BEGIN
+                  INSERT OR REPLACE INTO latest_results
+                  SELECT * FROM results WHERE spec_id = NEW.spec_id AND session = NEW.session;
+                END;
+                """
+            )
+
+            # Results of old sessions, moved out of the results table by compact()
+            create_results_table(conn, "results_archive", "PRIMARY KEY (spec_id, session)")
+
+            # Content hashes of spec inputs (test files and assets), see changes.py
+            sql = """CREATE TABLE IF NOT EXISTS file_states (
+              path TEXT PRIMARY KEY,
+              mtime_ns INTEGER,
+              size INTEGER,
+              digest TEXT
+            )"""
+            conn.execute(sql)
+
+            sql = """CREATE TABLE IF NOT EXISTS spec_inputs (
+              spec_id TEXT NOT NULL,
+              path TEXT NOT NULL,
+              digest TEXT,
+              PRIMARY KEY (spec_id, path)
+            )"""
+            conn.execute(sql)
+
+        _populate_latest_results(self)
+        self._ready = True
         return
 
     def put_specs(self, specs: list[JobSpec]) -> None:
@@ -188,6 +374,7 @@ class WorkspaceDatabase:
                 data.append(future.result())
 
         with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
             self.connection.execute("CREATE TEMP TABLE _ids(id TEXT PRIMARY KEY)")
             self.connection.executemany("INSERT INTO _ids(id) VALUES (?)", ((_[0],) for _ in data))
             # 2. Bulk insert/update specs
@@ -241,7 +428,7 @@ class WorkspaceDatabase:
         if hi is None:
             return None
         sql = "SELECT spec_id FROM specs WHERE spec_id >= ? AND spec_id < ? LIMIT 2"
-        rows = self.connection.execute(sql, (id, hi)).fetchall()
+        rows = self.reader.execute(sql, (id, hi)).fetchall()
         if len(rows) == 0:
             return None
         elif len(rows) > 1:
@@ -257,7 +444,7 @@ class WorkspaceDatabase:
                 continue
             hi = increment_hex_prefix(id)
             assert hi is not None
-            cur = self.connection.execute(
+            cur = self.reader.execute(
                 """
                 SELECT spec_id
                 FROM specs
@@ -276,26 +463,26 @@ class WorkspaceDatabase:
     def load_specs(
         self, ids: list[str] | None = None, include_upstreams: bool = False
     ) -> list[JobSpec]:
-        if not ids:
-            rows = self.connection.execute("SELECT * FROM specs").fetchall()
-            return self._reconstruct_specs(rows)
-        self.resolve_spec_ids(ids)
-        upstream = self.get_upstream_ids(ids)
-        load_ids = upstream.union(ids)
-        with self.connection:
-            self.connection.execute("CREATE TEMP TABLE _ids (id TEXT PRIMARY KEY)")
-            self.connection.executemany("INSERT INTO _ids(id) VALUES (?)", ((_,) for _ in load_ids))
-            rows = self.connection.execute(
+        with self.snapshot() as conn:
+            if not ids:
+                rows = conn.execute("SELECT * FROM specs").fetchall()
+                return self._reconstruct_specs(rows)
+            self.resolve_spec_ids(ids)
+            upstream = self.get_upstream_ids(ids)
+            load_ids = upstream.union(ids)
+            conn.execute("CREATE TEMP TABLE _ids (id TEXT PRIMARY KEY)")
+            conn.executemany("INSERT INTO _ids(id) VALUES (?)", ((_,) for _ in load_ids))
+            rows = conn.execute(
                 "SELECT * FROM specs where spec_id IN (SELECT id FROM _ids)"
             ).fetchall()
-            self.connection.execute("DROP TABLE _ids")
-        specs = self._reconstruct_specs(rows)
+            conn.execute("DROP TABLE _ids")
+            specs = self._reconstruct_specs(rows)
         if include_upstreams:
             return specs
         return [spec for spec in specs if spec.id in ids]
 
     def load_specs_by_tagname(self, tag: str) -> list["JobSpec"]:
-        rows = self.connection.execute(
+        rows = self.reader.execute(
             """
             SELECT s.spec_id, s.data
             FROM specs s
@@ -325,15 +512,15 @@ class WorkspaceDatabase:
 
     def get_edges(self, ids: list[str] | None = None) -> list[tuple[str, str]]:
         if not ids:
-            return self.connection.execute("SELECT spec_id, dep_id FROM spec_deps").fetchall()
+            return self.reader.execute("SELECT spec_id, dep_id FROM spec_deps").fetchall()
         rows: list[tuple[str, str]]
-        with self.connection:
-            self.connection.execute("CREATE TEMP TABLE _ids (id TEXT PRIMARY KEY)")
-            self.connection.executemany("INSERT INTO _ids(id) VALUES (?)", ((_,) for _ in ids))
-            rows = self.connection.execute(
+        with self.snapshot() as conn:
+            conn.execute("CREATE TEMP TABLE _ids (id TEXT PRIMARY KEY)")
+            conn.executemany("INSERT INTO _ids(id) VALUES (?)", ((_,) for _ in ids))
+            rows = conn.execute(
                 "SELECT spec_id, dep_id FROM spec_deps WHERE spec_id IN (SELECT id FROM _ids)"
             ).fetchall()
-            self.connection.execute("DROP TABLE _ids")
+            conn.execute("DROP TABLE _ids")
         return rows
 
     @staticmethod
@@ -354,7 +541,13 @@ class WorkspaceDatabase:
             job.status.outcome.name,
             job.status.reason or "",
             job.status.code,
-            json.dumps_min(job.timekeeper),
+            job.timekeeper._submitted,
+            job.timekeeper._staged,
+            job.timekeeper._started,
+            job.timekeeper._stopped,
+            job.timekeeper._finished,
+            job.timekeeper.duration(),
+            peak_rss(job.measurements.data),
             json.dumps_min(job.measurements),
         )
         return row
@@ -365,73 +558,193 @@ class WorkspaceDatabase:
     def put_results(self, *jobs: "Job") -> None:
         """Store results in the DB.
 
-        Since canary uses hierarchical parallelism, this function can be called by many independent
-        processes at once, resulting in some callers hitting a locked database.  We guard against a
-        locked database by trying multiple times with an exponential backoff between attempts.  If
-        we don't succeed we return False and let the caller decide what to do.
-
-        If writing to the database results in other types of errors, we re-raise those.
+        The results are written in a single transaction: readers see all of them or none, and
+        the batch costs one commit however many results it holds.  While a session runs, results
+        from every process are funneled through the ``ResultListener`` so that the database has a
+        single writer.  Other writers wait on the connection's busy timeout.
 
         """
 
         rows = [self.format_single_result(job) for job in jobs]
-        sql = """
-        INSERT OR REPLACE INTO results (
-          spec_id, spec_name, spec_fullname, file_root, file_path, session, workspace,
-          job_state, status_category, status_outcome, status_reason, status_code,
-          timekeeper, measurements
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
+        names = ", ".join(name for name, _ in result_columns)
+        values = ", ".join("?" for _ in result_columns)
+        sql = f"INSERT OR REPLACE INTO results ({names}) VALUES ({values})"  # nosec B608
         with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
             self.connection.executemany(sql, rows)
 
     def get_results(
         self, ids: list[str] | None = None, include_upstreams: bool = False
     ) -> dict[str, dict[str, Any]]:
         rows: list[tuple[str, ...]]
-        if not ids:
-            with self.connection:
-                rows = self.connection.execute(
-                    """SELECT *
-                    FROM results AS r
-                    WHERE r.session = (
-                      SELECT MAX(session)
-                      FROM results AS r2
-                      WHERE r2.spec_id = r.spec_id
-                    )
+        with self.snapshot() as conn:
+            if not ids:
+                rows = conn.execute("SELECT * FROM latest_results").fetchall()
+                return {row[0]: self._reconstruct_results(row) for row in rows}
+            self.resolve_spec_ids(ids)
+            upstream = self.get_upstream_ids(ids) if include_upstreams else set()
+            load_ids = list(upstream.union(ids))
+            conn.execute("CREATE TEMP TABLE _ids (id TEXT PRIMARY KEY)")
+            conn.executemany("INSERT INTO _ids(id) VALUES (?)", ((_,) for _ in load_ids))
+            rows = conn.execute(
+                "SELECT * FROM latest_results WHERE spec_id IN (SELECT id FROM _ids)"
+            ).fetchall()
+            conn.execute("DROP TABLE _ids")
+        return {row[0]: self._reconstruct_results(row) for row in rows}
+
+    def iter_results(
+        self, batch_size: int = 1000
+    ) -> Generator[list[tuple[dict[str, Any], bytes]], None, None]:
+        """Yield the latest result of every spec, paired with the spec's serialized data.
+
+        Results are yielded in batches of ``batch_size`` so that callers never hold more than one
+        batch in memory.  Only the ordered spec IDs are read up front; each batch is then read in
+        its own snapshot so that no read transaction is held open while the caller processes a
+        batch.  Specs whose results are removed in the meantime are skipped.
+
+        """
+        sql = "SELECT spec_id FROM latest_results ORDER BY file_path, spec_fullname"
+        ids = [row[0] for row in self.reader.execute(sql)]
+        for i in range(0, len(ids), batch_size):
+            batch = ids[i : i + batch_size]
+            with self.snapshot() as conn:
+                conn.execute("CREATE TEMP TABLE _ids (id TEXT PRIMARY KEY)")
+                conn.executemany("INSERT INTO _ids(id) VALUES (?)", ((_,) for _ in batch))
+                rows = conn.execute(
+                    """
+                    SELECT r.*, s.data
+                    FROM latest_results AS r
+                    JOIN specs AS s ON s.spec_id = r.spec_id
+                    WHERE r.spec_id IN (SELECT id FROM _ids)
                     """
                 ).fetchall()
-            return {row[0]: self._reconstruct_results(row) for row in rows}
-        self.resolve_spec_ids(ids)
-        upstream = self.get_upstream_ids(ids) if include_upstreams else set()
-        load_ids = list(upstream.union(ids))
+                conn.execute("DROP TABLE _ids")
+            by_id = {row[0]: row for row in rows}
+            results = [by_id[id] for id in batch if id in by_id]
+            if results:
+                yield [(self._reconstruct_results(row[:-1]), row[-1]) for row in results]
+
+    def get_result_history(self, id: str) -> list:
+        """Return the results of all specs whose ID starts with ``id``, oldest first, including
+        results moved to the archive"""
+        if id.startswith(jobspec.select_sygil):
+            id = id[1:]
+        try:
+            hi = increment_hex_prefix(id)
+        except ValueError:
+            return []
+        where = "spec_id >= ?" if hi is None else "spec_id >= ? AND spec_id < ?"
+        params = (id,) if hi is None else (id, hi)
+        sql = f"""
+        SELECT * FROM results_archive WHERE {where}
+        UNION ALL
+        SELECT * FROM results WHERE {where}
+        ORDER BY session ASC
+        """  # nosec B608
+        rows = self.reader.execute(sql, params + params).fetchall()
+        return [self._reconstruct_results(row) for row in rows]
+
+    def compact(self, keep: int = 10) -> int:
+        """Move the results of all but the ``keep`` most recent sessions to the archive.
+
+        The latest result of each spec is unaffected.  Returns the number of results moved.
+
+        """
+        cutoff = self.connection.execute(
+            "SELECT DISTINCT session FROM results ORDER BY session DESC LIMIT 1 OFFSET ?",
+            (max(keep, 1) - 1,),
+        ).fetchone()
+        if cutoff is None:
+            return 0
         with self.connection:
-            self.connection.execute("CREATE TEMP TABLE _ids (id TEXT PRIMARY KEY)")
-            self.connection.executemany("INSERT INTO _ids(id) VALUES (?)", ((_,) for _ in load_ids))
-            rows = self.connection.execute(
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results_archive SELECT * FROM results WHERE session < ?",
+                cutoff,
+            )
+            cursor = self.connection.execute("DELETE FROM results WHERE session < ?", cutoff)
+        if cursor.rowcount > 0:
+            logger.debug(f"Archived {cursor.rowcount} results from sessions before {cutoff[0]}")
+        return max(cursor.rowcount, 0)
+
+    def get_result_dirs(self) -> tuple[set[tuple[str, str]], set[tuple[str, str]]]:
+        """Return the ``(session, workspace)`` of each spec's latest result and of every other
+        stored result, including results in the archive"""
+        with self.snapshot() as conn:
+            rows = conn.execute("SELECT session, workspace FROM latest_results")
+            latest = {(row[0], row[1]) for row in rows}
+            rows = conn.execute(
                 """
-                SELECT r.*
-                FROM results AS r
-                WHERE r.spec_id IN (SELECT id FROM _ids)
-                AND r.session = (
-                  SELECT MAX(session)
-                  FROM results AS r2
-                  WHERE r2.spec_id = r.spec_id
-                )
+                SELECT session, workspace FROM results
+                UNION
+                SELECT session, workspace FROM results_archive
                 """
-            ).fetchall()
-            self.connection.execute("DROP TABLE _ids")
-        return {row[0]: self._reconstruct_results(row) for row in rows}
+            )
+            stale = {(row[0], row[1]) for row in rows} - latest
+        return latest, stale
 
-    def get_result_history(self, id: str) -> list:
-        rows = self.connection.execute(
-            "SELECT * FROM results WHERE spec_id LIKE ? ORDER BY session ASC", (f"{id}%",)
-        ).fetchall()
-        data: list[dict] = []
-        for row in rows:
-            d = self._reconstruct_results(row)
-            data.append(d)
-        return data
+    def prune(self, keep: int = 10, dryrun: bool = False) -> tuple[int, int]:
+        """Drop results of all but the ``keep`` most recent sessions and specs that are no longer
+        referenced by any selection.
+
+        The latest result of each spec is always retained, as is every spec having a latest result
+        and the upstream dependencies of the specs retained.  If ``dryrun``, the changes are rolled
+        back.  Returns the number of results and specs removed.
+
+        """
+        conn = self.connection
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            n_results = 0
+            cutoff = conn.execute(
+                """
+                SELECT session FROM (
+                  SELECT session FROM results UNION SELECT session FROM results_archive
+                )
+                ORDER BY session DESC LIMIT 1 OFFSET ?
+                """,
+                (max(keep, 1) - 1,),
+            ).fetchone()
+            if cutoff is not None:
+                for table in ("results", "results_archive"):
+                    sql = f"DELETE FROM {table} WHERE session < ?"  # nosec B608
+                    n_results += max(conn.execute(sql, cutoff).rowcount, 0)
+            n_specs = 0
+            if conn.execute("SELECT 1 FROM selections LIMIT 1").fetchone() is not None:
+                conn.execute("CREATE TEMP TABLE _keep (id TEXT PRIMARY KEY)")
+                conn.execute(
+                    """
+                    WITH RECURSIVE
+                    keep(id) AS (
+                      SELECT spec_id FROM selections
+                      UNION
+                      SELECT spec_id FROM latest_results
+                      UNION
+                      SELECT d.dep_id FROM spec_deps d JOIN keep k ON d.spec_id = k.id
+                    )
+                    INSERT INTO _keep SELECT id FROM keep
+                    """
+                )
+                where = "spec_id NOT IN (SELECT id FROM _keep)"
+                n_specs = conn.execute(f"DELETE FROM specs WHERE {where}").rowcount  # nosec B608
+                for table in ("specs_meta", "spec_deps", "spec_inputs"):
+                    conn.execute(f"DELETE FROM {table} WHERE {where}")  # nosec B608
+                conn.execute(
+                    "DELETE FROM file_states WHERE path NOT IN (SELECT path FROM spec_inputs)"
+                )
+                conn.execute("DROP TABLE _keep")
+            if dryrun:
+                conn.execute("ROLLBACK")
+        return n_results, max(n_specs, 0)
+
+    def vacuum(self) -> int:
+        """Rebuild the database file to return the pages freed by deleted rows to the file system.
+        Returns the number of bytes reclaimed."""
+        size = self.path.stat().st_size
+        self.connection.execute("VACUUM")
+        # The rebuilt pages are written to the log, the file shrinks once they are checkpointed
+        self.checkpoint("TRUNCATE")
+        return max(size - self.path.stat().st_size, 0)
 
     def _reconstruct_results(self, row: tuple[Any, ...]) -> dict[str, Any]:
         d: dict[str, Any] = {}
@@ -446,14 +759,85 @@ class WorkspaceDatabase:
         d["status"] = Status.from_dict(
             {"category": row[8], "outcome": row[9], "reason": row[10], "code": row[11]}
         )
-        d["timekeeper"] = json.loads(row[12])
-        d["measurements"] = json.loads(row[13])
+        timekeeper = Timekeeper()
+        timekeeper.update(
+            _submitted=row[12],
+            _staged=row[13],
+            _started=row[14],
+            _stopped=row[15],
+            _finished=row[16],
+        )
+        d["timekeeper"] = timekeeper
+        d["measurements"] = json.loads(row[19])
         return d
 
+    def get_file_states(self, paths: list[str]) -> dict[str, FileState]:
+        with self.snapshot() as conn:
+            conn.execute("CREATE TEMP TABLE _ids (id TEXT PRIMARY KEY)")
+            conn.executemany("INSERT INTO _ids(id) VALUES (?)", ((_,) for _ in paths))
+            rows = conn.execute(
+                """
+                SELECT path, mtime_ns, size, digest
+                FROM file_states
+                WHERE path IN (SELECT id FROM _ids)
+                """
+            ).fetchall()
+            conn.execute("DROP TABLE _ids")
+        return {row[0]: FileState(*row) for row in rows}
+
+    def put_file_states(self, states: list[FileState]) -> None:
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO file_states (path, mtime_ns, size, digest) VALUES (?, ?, ?, ?)",
+                ((s.path, s.mtime_ns, s.size, s.digest) for s in states),
+            )
+
+    def get_spec_inputs(self, ids: list[str]) -> dict[str, dict[str, str | None]]:
+        """Return the recorded digest of each input of the specs in ``ids``"""
+        with self.snapshot() as conn:
+            conn.execute("CREATE TEMP TABLE _ids (id TEXT PRIMARY KEY)")
+            conn.executemany("INSERT INTO _ids(id) VALUES (?)", ((_,) for _ in ids))
+            rows = conn.execute(
+                """
+                SELECT spec_id, path, digest
+                FROM spec_inputs
+                WHERE spec_id IN (SELECT id FROM _ids)
+                """
+            ).fetchall()
+            conn.execute("DROP TABLE _ids")
+        inputs: dict[str, dict[str, str | None]] = {}
+        for spec_id, path, digest in rows:
+            inputs.setdefault(spec_id, {})[path] = digest
+        return inputs
+
+    def has_spec_inputs(self) -> bool:
+        """Whether the inputs of any spec have been recorded"""
+        return self.reader.execute("SELECT 1 FROM spec_inputs LIMIT 1").fetchone() is not None
+
+    def put_spec_inputs(self, inputs: dict[str, dict[str, str | None]]) -> None:
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.execute("CREATE TEMP TABLE _ids (id TEXT PRIMARY KEY)")
+            self.connection.executemany("INSERT INTO _ids(id) VALUES (?)", ((_,) for _ in inputs))
+            self.connection.execute(
+                "DELETE FROM spec_inputs WHERE spec_id IN (SELECT id FROM _ids)"
+            )
+            self.connection.execute("DROP TABLE _ids")
+            self.connection.executemany(
+                "INSERT INTO spec_inputs (spec_id, path, digest) VALUES (?, ?, ?)",
+                (
+                    (spec_id, path, digest)
+                    for spec_id, digests in inputs.items()
+                    for path, digest in digests.items()
+                ),
+            )
+
     def put_selection(self, tag: str, specs: list["JobSpec"], **meta: Any) -> None:
         if tag == ":all:":
             raise ValueError("Tag name :all: is reserved")
         with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
             self.connection.execute("DELETE FROM selections WHERE tag = ?", (tag,))
             self.connection.execute("DELETE FROM selection_meta WHERE tag = ?", (tag,))
             self.connection.executemany(
@@ -477,24 +861,23 @@ class WorkspaceDatabase:
             self.connection.execute("UPDATE selections SET tag = ? WHERE tag = ?", (new, old))
 
     def get_selection_metadata(self, tag: str) -> dict[str, Any]:
-        if not self.is_selection(tag):
-            raise NotASelection(f"{tag} is not a selection")
-        text = self.connection.execute(
-            "SELECT data FROM selection_meta WHERE tag = ? LIMIT 1", (tag,)
-        ).fetchone()
+        with self.snapshot() as conn:
+            if not self.is_selection(tag):
+                raise NotASelection(f"{tag} is not a selection")
+            text = conn.execute(
+                "SELECT data FROM selection_meta WHERE tag = ? LIMIT 1", (tag,)
+            ).fetchone()
         meta = json.loads(text[0])
         meta["tag"] = tag
         return meta
 
     @property
     def tags(self) -> list[str]:
-        rows = self.connection.execute(
-            "SELECT DISTINCT tag FROM selections ORDER BY tag"
-        ).fetchall()
+        rows = self.reader.execute("SELECT DISTINCT tag FROM selections ORDER BY tag").fetchall()
         return [row[0] for row in rows]
 
     def is_selection(self, tag: str) -> bool:
-        cur = self.connection.execute("SELECT 1 FROM selections WHERE tag = ? LIMIT 1", (tag,))
+        cur = self.reader.execute("SELECT 1 FROM selections WHERE tag = ? LIMIT 1", (tag,))
         return cur.fetchone() is not None
 
     def delete_selection(self, tag: str) -> bool:
@@ -513,9 +896,9 @@ class WorkspaceDatabase:
         """Return dependencies in instantiation order."""
         if not seeds:
             return set()
-        with self.connection:
-            self.connection.execute("CREATE TEMP TABLE _ids (id TEXT PRIMARY KEY)")
-            self.connection.executemany("INSERT INTO _ids(id) VALUES (?)", ((s,) for s in seeds))
+        with self.snapshot() as conn:
+            conn.execute("CREATE TEMP TABLE _ids (id TEXT PRIMARY KEY)")
+            conn.executemany("INSERT INTO _ids(id) VALUES (?)", ((s,) for s in seeds))
             sql = """
                 WITH RECURSIVE
                 downstream(id) AS (
@@ -529,17 +912,17 @@ class WorkspaceDatabase:
                 )
                 SELECT DISTINCT id FROM downstream
             """
-            rows = self.connection.execute(sql).fetchall()
-            self.connection.execute("DROP TABLE _ids")
+            rows = conn.execute(sql).fetchall()
+            conn.execute("DROP TABLE _ids")
         return {r[0] for r in rows}
 
     def get_upstream_ids(self, seeds: Iterable[str]) -> set[str]:
         """Return dependents in reverse instantiation order."""
         if not seeds:
             return set()
-        with self.connection:
-            self.connection.execute("CREATE TEMP TABLE _ids (id TEXT PRIMARY KEY)")
-            self.connection.executemany("INSERT INTO _ids(id) VALUES (?)", ((s,) for s in seeds))
+        with self.snapshot() as conn:
+            conn.execute("CREATE TEMP TABLE _ids (id TEXT PRIMARY KEY)")
+            conn.executemany("INSERT INTO _ids(id) VALUES (?)", ((s,) for s in seeds))
             sql = """
                 WITH RECURSIVE
                 upstream(id) AS (
@@ -553,8 +936,8 @@ class WorkspaceDatabase:
                 )
                 SELECT DISTINCT id FROM upstream
             """
-            rows = self.connection.execute(sql).fetchall()
-            self.connection.execute("DROP TABLE _ids")
+            rows = conn.execute(sql).fetchall()
+            conn.execute("DROP TABLE _ids")
         return {r[0] for r in rows}
 
     def get_dependency_graph(self) -> dict[str, list[str]]:
@@ -563,10 +946,11 @@ class WorkspaceDatabase:
         Every spec appears, standalone nodes have dep_id=None (empty list).
         """
         graph: dict[str, list[str]] = collections.defaultdict(list)
-        rows = self.connection.execute("SELECT spec_id FROM specs").fetchall()
-        for (spec_id,) in rows:
-            graph[spec_id] = []
-        rows = self.connection.execute("SELECT spec_id, dep_id FROM spec_deps").fetchall()
+        with self.snapshot() as conn:
+            rows = conn.execute("SELECT spec_id FROM specs").fetchall()
+            for (spec_id,) in rows:
+                graph[spec_id] = []
+            rows = conn.execute("SELECT spec_id, dep_id FROM spec_deps").fetchall()
         for spec_id, dep_id in rows:
             graph[spec_id].append(dep_id)
         return graph
@@ -585,33 +969,15 @@ class WorkspaceDatabase:
             params.append(tag)
         where = "" if not clauses else "WHERE " + " AND ".join(clauses)
         sql = f"""
-        WITH latest_session AS (
-          SELECT spec_id, MAX(session) AS session
-          FROM results
-          GROUP BY spec_id
-        ),
-        latest_results AS (
-          SELECT
-            r.spec_id,
-            r.timekeeper,
-            r.status_category,
-            r.status_outcome,
-            r.status_reason,
-            r.status_code
-          FROM results r
-          JOIN latest_session ls
-          ON r.spec_id = ls.spec_id
-          AND r.session = ls.session
-        )
         SELECT
           s.spec_id,
           sm.source,
           sm.view,
-          lr.timekeeper,
+          lr.submitted,
+          lr.started,
+          lr.finished,
           lr.status_category,
-          lr.status_outcome,
-          lr.status_reason,
-          lr.status_code
+          lr.status_outcome
         FROM specs s
         JOIN specs_meta sm
           ON sm.spec_id = s.spec_id
@@ -620,17 +986,18 @@ class WorkspaceDatabase:
         {join}
         {where}
         """  # nosec B608
-        rows = self.connection.execute(sql, params).fetchall()
+        rows = self.reader.execute(sql, params).fetchall()
         candidates: list[PartialSpec] = []
         for row in rows:
-            start: float = self._timekeeper_started_at(row[3])
+            # Prefer the start time, falling back to the submission and finish times
+            start: float = next((t for t in (row[4], row[3], row[5]) if t and t > 0), -1.0)
             c = PartialSpec(
                 id=row[0],
                 file=Path(row[1]),
                 view=row[2],
                 started_at=start,
-                result_category=row[4],
-                result_outcome=row[5],
+                result_category=row[6],
+                result_outcome=row[7],
             )
             candidates.append(c)
         return candidates
@@ -651,56 +1018,61 @@ class WorkspaceDatabase:
             FROM specs_meta
             WHERE {" OR ".join(clauses)}
         """  # nosec B608
-        rows = self.connection.execute(sql, prefixes).fetchall()
+        rows = self.reader.execute(sql, prefixes).fetchall()
         return [row[0] for row in rows]
 
-    def _timekeeper_started_at(self, text: str | None) -> float:
-        if not text:
-            return -1.0
-        try:
-            tk = json.loads(text)
-        except Exception:
-            return -1.0
-        for name in ("_started", "_submitted", "_finished"):
-            value = getattr(tk, name, -1.0)
-            try:
-                value = float(value)
-            except Exception:
-                value = -1.0
-            if value > 0:
-                return value
-        return -1.0
-
 
 class ResultListener(threading.Thread):
     """
     Watches a spool directory for JSON test results and writes them to SQLite in batches.
+
+    The listener is the database's only writer while a session runs.  Each batch is committed in a
+    single transaction and, rather than checkpointing whenever the log grows past SQLite's
+    threshold, the log is checkpointed when the spool goes idle or after ``checkpoint_interval``
+    results, whichever comes first.
     """
 
-    def __init__(self, db: WorkspaceDatabase, poll_interval: float = 0.05) -> None:
+    def __init__(
+        self, db: WorkspaceDatabase, poll_interval: float = 0.05, checkpoint_interval: int = 10000
+    ) -> None:
         super().__init__(daemon=True)
         self.db = WorkspaceDatabase.load(db.root)
         self.poll_interval = poll_interval
+        self.checkpoint_interval = checkpoint_interval
         self._stop_event = threading.Event()
         self._processed: set[str] = set()  # Track processed files
+        self._unchecked: int = 0  # Results written since the last checkpoint
 
     def run(self):
         """Main thread loop."""
         self.db.connect()
+        self.db.connection.execute("PRAGMA wal_autocheckpoint=0;")
         try:
             while not self._stop_event.is_set():
                 objs = self.db.queue.drain()
                 if objs:
-                    self.db.put_results(*objs)
-                    self._processed.update([obj.id for obj in objs])
+                    self.write(objs)
+                if self._unchecked and (not objs or self._unchecked >= self.checkpoint_interval):
+                    self.checkpoint()
                 time.sleep(self.poll_interval)
             objs = self.db.queue.drain()
             if objs:
-                self.db.put_results(*objs)
-                self._processed.update([obj.id for obj in objs])
+                self.write(objs)
+            self.checkpoint()
         finally:
             self.db.close()
 
+    def write(self, objs: list["Job"]) -> None:
+        self.db.put_results(*objs)
+        self._processed.update([obj.id for obj in objs])
+        self._unchecked += len(objs)
+
+    def checkpoint(self) -> None:
+        busy, log, done = self.db.checkpoint("PASSIVE")
+        if busy or done < log:
+            logger.debug(f"Checkpointed {done} of {log} pages, readers are active")
+        self._unchecked = 0
+
     def stop_and_join(self):
         """Stop listener and wait for thread to finish."""
         self._stop_event.set()
@@ -729,6 +1101,48 @@ def increment_hex_prefix(prefix: str) -> str | None:
     return f"{value + 1:0{len(prefix)}x}"
 
 
+def create_results_table(
+    conn: sqlite3.Connection, name: str, primary_key: str, rowid: bool = True
+) -> None:
+    columns = ",\n".join(f"  {column} {type}" for column, type in result_columns)
+    sql = f"CREATE TABLE IF NOT EXISTS {name} (\n{columns},\n  {primary_key}\n)"
+    if not rowid:
+        sql += " WITHOUT ROWID"
+    conn.execute(sql)
+
+
+def peak_rss(measurements: dict[str, Any]) -> float | None:
+    """Peak resident set size recorded by the launcher, including child processes if sampled"""
+    for key in ("memory_rss_mb_tree", "memory_rss_mb"):
+        value = measurements.get(key)
+        if isinstance(value, dict) and isinstance(value.get("max"), (int, float)):
+            return float(value["max"])
+    return None
+
+
+def canary_level() -> int:
+    return int(os.getenv("CANARY_LEVEL", "0"))
+
+
+def journal_mode(path: Path) -> str:
+    """Return the journal mode to use for the database at ``path``
+
+    WAL lets readers and the writer work concurrently but relies on shared memory, which only works
+    between processes on the same host.  Nested instances (e.g., canary_hpc batches running on
+    compute nodes) and databases on network file systems therefore keep the in-memory rollback
+    journal.  ``CANARY_DB_JOURNAL_MODE`` overrides the choice.
+
+    """
+    if mode := os.getenv("CANARY_DB_JOURNAL_MODE"):
+        mode = mode.upper()
+        if mode not in ("WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY"):
+            raise ValueError(f"CANARY_DB_JOURNAL_MODE: invalid journal mode {mode!r}")
+        return mode
+    if canary_level() > 0 or is_network_filesystem(path.parent):
+        return "MEMORY"
+    return "WAL"
+
+
 def is_operation_error(e: BaseException) -> bool:
     return isinstance(e, sqlite3.OperationalError)
 
@@ -814,3 +1228,72 @@ def _migrate_results_status_state_to_job_state(db: WorkspaceDatabase) -> None:
         conn.execute("CREATE INDEX IF NOT EXISTS ix_results_id ON results (spec_id)")
         conn.execute("CREATE INDEX IF NOT EXISTS ix_results_session ON results (session)")
         conn.execute("DROP TABLE results_old")
+
+
+def _migrate_results_timekeeper_to_columns(db: WorkspaceDatabase) -> None:
+    """Results used to store the timekeeper as JSON text; store its fields in typed columns"""
+    conn = db.connection
+    info = conn.execute("PRAGMA table_info(results)").fetchall()
+    cols = {r[1] for r in info}
+    if "duration" in cols:
+        return
+    logger.info("DB migration: results.timekeeper -> typed columns")
+
+    def timestamp(name: str) -> str:
+        if "timekeeper" in cols:
+            return f"COALESCE(json_extract(timekeeper, '$._{name}'), -1.0)"
+        elif name in cols:
+            return f"COALESCE({name}, -1.0)"
+        return "-1.0"
+
+    with conn:
+        conn.execute("ALTER TABLE results RENAME TO results_old")
+        create_results_table(conn, "results", "PRIMARY KEY (spec_id, session)")
+        rss = "json_extract(measurements, '$.data.memory_rss_mb.max')"
+        tree_rss = "json_extract(measurements, '$.data.memory_rss_mb_tree.max')"
+        conn.execute(
+            f"""
+            INSERT INTO results
+            SELECT
+              spec_id, spec_name, spec_fullname, file_root, file_path, session, workspace,
+              job_state, status_category, status_outcome, status_reason, status_code,
+              _submitted, _staged, _started, _stopped, _finished,
+              CASE WHEN _started > 0 AND _stopped > 0 THEN _stopped - _started ELSE -1.0 END,
+              COALESCE({tree_rss}, {rss}),
+              measurements
+            FROM (
+              SELECT *,
+                {timestamp("submitted")} AS _submitted,
+                {timestamp("staged")} AS _staged,
+                {timestamp("started")} AS _started,
+                {timestamp("stopped")} AS _stopped,
+                {timestamp("finished")} AS _finished
+              FROM results_old
+            )
+            """  # nosec B608
+        )
+        conn.execute("DROP TABLE results_old")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_results_id ON results (spec_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_results_session ON results (session)")
+
+
+def _populate_latest_results(db: WorkspaceDatabase) -> None:
+    """Fill latest_results for workspaces created before it existed"""
+    conn = db.connection
+    if conn.execute("SELECT 1 FROM latest_results LIMIT 1").fetchone() is not None:
+        return
+    if conn.execute("SELECT 1 FROM results LIMIT 1").fetchone() is None:
+        return
+    with conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO latest_results
+            SELECT r.*
+            FROM results AS r
+            WHERE r.session = (
+              SELECT MAX(session)
+              FROM results AS r2
+              WHERE r2.spec_id = r.spec_id
+            )
+            """
+        )
@@ -11,9 +11,10 @@ import os
 import traceback
 from abc import ABC
 from abc import abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass
-from enum import Enum
 from functools import cached_property
+from functools import lru_cache
 from pathlib import Path
 from shutil import copyfile
 from typing import TYPE_CHECKING
@@ -28,7 +29,13 @@ from .error import TestFailed
 from .error import TestSkipped
 from .error import TestTimedOut
 from .expression import Expression
+from .jobspec import SpecReference
+from .jobspec import serialization_format
+from .jobstate import JobPhase
+from .jobstate import JobState
 from .launcher import Launcher
+from .status import Category
+from .status import Outcome
 from .status import Status
 from .testexec import ExecutionSpace
 from .timekeeper import Timekeeper
@@ -46,21 +53,6 @@ if TYPE_CHECKING:
 logger = logging.get_logger(__name__)
 
 
-class JobPhase(str, Enum):
-    PENDING = "PENDING"
-    STAGING = "STAGING"
-    RUNNING = "RUNNING"
-    FINISHING = "FINISHING"
-    DONE = "DONE"
-
-    def __serialize__(self) -> dict[str, Any]:
-        return {"value": self.value}
-
-    @classmethod
-    def __deserialize__(cls, d: dict[str, Any]) -> "JobPhase":
-        return cls(d["value"])
-
-
 @dataclass
 class AnyMatcher:
     __slots__ = ("choices",)
@@ -73,76 +65,108 @@ class AnyMatcher:
         return name.lower() in self.choices
 
 
+@lru_cache(maxsize=None)
+def compile_when(when: str) -> Expression:
+    """Compile the ``when`` expression of a dependency.  Compiled expressions are shared by all
+    dependencies using the same string"""
+    return Expression.compile(when)
+
+
+@lru_cache(maxsize=4096)
+def when_satisfied(when: str | None, category: Category, outcome: Outcome) -> bool:
+    """Is a dependency's ``when`` condition met by an upstream that finished with ``category``
+    and ``outcome``?"""
+    if when is None or when in ("*", "always"):
+        return True
+    elif when == "on_success":
+        return category is Category.PASS
+    elif when == "on_failure":
+        return category is Category.FAIL
+    expr = compile_when(when)
+    return expr.evaluate(AnyMatcher({category.name, outcome.name}))
+
+
 @dataclass(frozen=True, slots=True)
 class Dependency:
     job: "Job"
     when: str | None
 
     def __serialize__(self) -> dict[str, Any]:
+        if serialization_format() >= 2:
+            return DependencyReference.from_dependency(self).__serialize__()
         return {"job": self.job, "when": self.when}
 
     @classmethod
-    def __deserialize__(cls, d: dict) -> "Dependency":
+    def __deserialize__(cls, d: dict) -> "Dependency | DependencyReference":
+        if "job_id" in d:
+            return DependencyReference.__deserialize__(d)
         return cls(**d)
 
     def is_satisfied(self) -> bool:
-        from .status import Category
-
         if not self.job.is_done():
             return False
-        when = self.when
-        if when is None:
-            return True
-        assert isinstance(when, str)
-        if when in ("*", "always"):
-            return self.job.is_done()
-        if when == "on_success":
-            return self.job.status.category is Category.PASS
-        elif when == "on_failure":
-            return self.job.status.category is Category.FAIL
-        expr = Expression.compile(when)
-        choices = (self.job.status.category.name, self.job.status.outcome.name)
-        return expr.evaluate(AnyMatcher(set(choices)))
+        return when_satisfied(self.when, self.job.status.category, self.job.status.outcome)
 
     def is_done(self) -> bool:
         return self.job.is_done()
 
 
-@dataclasses.dataclass(slots=True)
-class JobState:
-    phase: JobPhase = JobPhase.PENDING
+@dataclass(frozen=True, slots=True)
+class DependencyReference:
+    """A dependency that refers to the upstream job's lock file rather than embedding the job"""
 
-    def __post_init__(self) -> None:
-        if isinstance(self.phase, str):
-            self.phase = JobPhase(self.phase)
+    job_id: str
+    when: str | None
+    lockfile: str
 
     def __serialize__(self) -> dict[str, Any]:
-        return {"phase": self.phase}
+        return {"job_id": self.job_id, "when": self.when, "lockfile": self.lockfile}
 
     @classmethod
-    def __deserialize__(cls, d: dict) -> "JobState":
-        d["phase"] = d.pop("phase", JobPhase.PENDING)
-        if isinstance(d["phase"], str):
-            d["phase"] = JobPhase(d["phase"])
-        return cls(**d)
-
-    def reset(self) -> None:
-        self.phase = JobPhase.PENDING
+    def __deserialize__(cls, d: dict) -> "DependencyReference":
+        return cls(job_id=d["job_id"], when=d.get("when"), lockfile=d["lockfile"])
 
-    def is_pending(self) -> bool:
-        return self.phase == JobPhase.PENDING
+    @classmethod
+    def from_dependency(cls, dep: Dependency) -> "DependencyReference":
+        return cls(job_id=dep.job.id, when=dep.when, lockfile=dep.job.lockfile.as_posix())
 
-    def is_submitted(self) -> bool:
-        return self.phase == JobPhase.PENDING
 
-    def is_running(self) -> bool:
-        return self.phase == JobPhase.RUNNING
+@dataclasses.dataclass(slots=True)
+class DependencySummary:
+    """Running counts of a job's dependencies by state.
+
+    Each dependency is evaluated once, when it is first seen done, after which only the
+    dependencies that are still pending are looked at again.
+
+    """
+
+    pending: list[Dependency]
+    done: int = 0
+    satisfied: int = 0
+    violated: int = 0
+    # The first dependency that finished without meeting its ``when`` condition
+    blocker: Dependency | None = None
+
+    def update(self) -> "DependencySummary":
+        if not self.pending:
+            return self
+        pending: list[Dependency] = []
+        for dep in self.pending:
+            if not dep.is_done():
+                pending.append(dep)
+            elif dep.is_satisfied():
+                self.done += 1
+                self.satisfied += 1
+            else:
+                self.done += 1
+                self.violated += 1
+                if self.blocker is None:
+                    self.blocker = dep
+        self.pending = pending
+        return self
 
-    def is_finishing(self) -> bool:
-        return self.phase == JobPhase.FINISHING
-
-    def is_done(self) -> bool:
-        return self.phase == JobPhase.DONE
+    def ready(self) -> bool:
+        return not self.pending and not self.violated
 
 
 @dataclasses.dataclass
@@ -176,11 +200,18 @@ class Measurements:
 class BaseJob(ABC):
     # ---- required data attributes (enforced by convention) ----
 
+    # True if a job that is not ready can only become ready when another job in its queue
+    # finishes or is dispatched.  The queue then skips is_ready() between such events.
+    readiness_follows_queue: bool = False
+
     def __init__(self) -> None:
         self.status = Status()
         self.state = JobState()
         self.measurements = Measurements()
         self.timekeeper = Timekeeper()
+        # Set by a queue that puts repeated attempts of this job back in the queue, see
+        # RetryPolicy, so that the job is not also repeated in the process running it
+        self.repeat_in_queue: bool = False
 
     def __serialize__(self) -> dict[str, Any]:
         return {
@@ -288,6 +319,8 @@ class BaseJob(ABC):
 
 
 class Job(BaseJob):
+    readiness_follows_queue = True
+
     def __init__(
         self,
         spec: "JobSpec",
@@ -307,6 +340,13 @@ class Job(BaseJob):
         self.variables: dict[str, str | None] = self.get_environ_from_spec()
 
         self.dependencies: list[Dependency] = dependencies or []
+        # Dependencies read from a lock file but not yet loaded, see resolve_dependencies
+        self.dependency_refs: list[DependencyReference] = []
+        self._dependency_summary: DependencySummary | None = None
+
+        # See batched_saves
+        self._save_depth: int = 0
+        self._unsaved: bool = False
 
     def __eq__(self, other) -> bool:
         if not isinstance(other, Job):
@@ -323,7 +363,7 @@ class Job(BaseJob):
         return super().__serialize__() | {
             "spec": self.spec,
             "workspace": self.workspace,
-            "dependencies": self.dependencies,
+            "dependencies": [*self.dependencies, *self.dependency_refs],
             "variables": self.variables,
             "allocation": self._allocation,
             "rparameters": self.rparameters,
@@ -332,7 +372,12 @@ class Job(BaseJob):
 
     @classmethod
     def __deserialize__(cls, d: dict[str, Any]) -> "Job":
-        obj = cls(spec=d["spec"], workspace=d["workspace"], dependencies=d["dependencies"])
+        dependencies: list[Dependency] = []
+        refs: list[DependencyReference] = []
+        for dep in d["dependencies"]:
+            (refs if isinstance(dep, DependencyReference) else dependencies).append(dep)
+        obj = cls(spec=d["spec"], workspace=d["workspace"], dependencies=dependencies)
+        obj.dependency_refs.extend(refs)
         obj._apply_base_state(d)
         if variables := d.get("variables"):
             obj.variables = variables
@@ -584,25 +629,20 @@ class Job(BaseJob):
         if self.status.is_skipped():
             return False
         # If any dependency finished in a way that violates criteria, this job will never run
-        if self.dependencies and any(
-            d.is_done() and not d.is_satisfied() for d in self.dependencies
-        ):
+        if self.dependencies and self.dependency_summary().violated:
             return False
         return True
 
     def refresh_readiness(self) -> None:
         if self.state.is_done() or not self.dependencies:
             return
-        for dep in self.dependencies:
-            if not dep.is_done():
-                continue
-            if not dep.is_satisfied():
-                self.state.phase = JobPhase.DONE
-                self.status = Status.BLOCKED(
-                    f"Dependency {dep.job.name} finished with {dep.job.status.outcome.name!r}; "
-                    f"needed {dep.when!r}"
-                )
-                return
+        summary = self.dependency_summary()
+        if dep := summary.blocker:
+            self.state.phase = JobPhase.DONE
+            self.status = Status.BLOCKED(
+                f"Dependency {dep.job.name} finished with {dep.job.status.outcome.name!r}; "
+                f"needed {dep.when!r}"
+            )
 
     def is_ready(self) -> bool:
         if not self.dependencies:
@@ -612,9 +652,20 @@ class Job(BaseJob):
         self.refresh_readiness()
         if not self.is_runnable():
             return False
-        all_satisfied = all(d.is_satisfied() for d in self.dependencies if d.is_done())
-        all_done = all(d.is_done() for d in self.dependencies)
-        return all_satisfied and all_done
+        return self.dependency_summary().ready()
+
+    def dependency_summary(self) -> DependencySummary:
+        """Counts of this job's dependencies by state, brought up to date with their upstreams"""
+        if self._dependency_summary is None or (
+            self._dependency_summary.done + len(self._dependency_summary.pending)
+            != len(self.dependencies)
+        ):
+            self._dependency_summary = DependencySummary(pending=list(self.dependencies))
+        return self._dependency_summary.update()
+
+    def reset_dependency_summary(self) -> None:
+        """Forget the state of this job's dependencies, eg, after they have been reset"""
+        self._dependency_summary = None
 
     @property
     def lockfile(self) -> Path:
@@ -669,6 +720,7 @@ class Job(BaseJob):
         from .status import Outcome
 
         code: int
+        launched: bool = False
         xstatus = self.spec.xstatus
         try:
             if self.is_runnable():
@@ -678,8 +730,13 @@ class Job(BaseJob):
                     fh.write(f"[{prefix}] Begin executing {self.spec.fullname}\n")
                 with self.workspace.enter():
                     self.state.phase = JobPhase.RUNNING
-                    self.save()
+                    # Written right away, even when saves are batched, so that the test process
+                    # and anyone inspecting the workspace sees the job running
+                    self.write_lockfile()
+                    self.save_instance()
+                    launched = True
                     code = self.launcher.run(job=self)
+                    self.merge_attributes()
                     self.update_status_from_exit_code(code=code)
                 self.timekeeper.stop()
         except KeyboardInterrupt:
@@ -717,6 +774,9 @@ class Job(BaseJob):
             self.state.phase = JobPhase.DONE
             logger.debug(f"Finished executing {self.spec.fullname}: status={self.status}")
             self.save()
+            if launched:
+                # Dependent tests read the final state of this job from its instance file
+                self.save_instance()
         return
 
     def getstate(self) -> dict[str, Any]:
@@ -800,7 +860,7 @@ class Job(BaseJob):
     def refresh(self) -> None:
         obj: Job
         try:
-            obj = json.loads(self.workspace.joinpath("testcase.lock").read_text())
+            obj = json.loads(self.lockfile.read_text())
         except (json.JSONDecodeError, FileNotFoundError):
             return
         self.measurements.update(obj.measurements)
@@ -813,6 +873,7 @@ class Job(BaseJob):
         )
         self.state.phase = obj.state.phase
         self.timekeeper.sync(obj.timekeeper)
+        self.merge_attributes()
 
     def set_runtime_env(self, env: MutableMapping[str, str]) -> None:
         env[config.CONFIG_ENV_CFG64] = config.serialize()
@@ -846,7 +907,40 @@ class Job(BaseJob):
             logger.debug("Failed to cache last run", exc_info=True)
 
     def save(self) -> None:
+        if self._save_depth:
+            self._unsaved = True
+            return
+        self.write_lockfile()
+
+    def write_lockfile(self) -> None:
         json.safesave(self.lockfile, self)
+        self._unsaved = False
+
+    @contextmanager
+    def batched_saves(self) -> Generator[None, None, None]:
+        """Write the lock file at most once, when the block exits, no matter how many times
+        ``save`` is called in the block"""
+        self._save_depth += 1
+        try:
+            yield
+        finally:
+            self._save_depth -= 1
+            if not self._save_depth and self._unsaved:
+                self.write_lockfile()
+
+    def save_instance(self) -> None:
+        """Write the instance file read by ``canary.get_instance()`` in the test process"""
+        from .testinst import dump_instance
+
+        dump_instance(self)
+
+    def merge_attributes(self) -> None:
+        """Merge attributes set by the test process into this job"""
+        from .testinst import attributes_file_name
+        from .testinst import load_attributes
+
+        if attrs := load_attributes(self.workspace.joinpath(attributes_file_name)):
+            self.spec.attributes.update(attrs)
 
     def read_output(self, compress: bool = False) -> str:
         if self.status.is_skipped():
@@ -939,6 +1033,34 @@ def load_job_from_file(arg: Path | str | None) -> Job:
     return workspace.find(job=id)
 
 
+def load_lockfile(file: Path | str, memo: dict[str, Job] | None = None) -> Job:
+    """Load the job in lock ``file``, including the jobs it depends on.
+
+    Dependencies stored by reference are loaded from their own lock files.  Each upstream is
+    loaded once, even if it is reached through several paths.
+
+    """
+    job: Job = json.loads(Path(file).read_text())
+    return resolve_dependencies(job, memo)
+
+
+def resolve_dependencies(job: Job, memo: dict[str, Job] | None = None) -> Job:
+    """Replace ``job``'s dependency references with the jobs in the referenced lock files"""
+    memo = {} if memo is None else memo
+    memo[job.id] = job
+    for ref in job.dependency_refs:
+        upstream = memo.get(ref.job_id)
+        if upstream is None:
+            upstream = load_lockfile(ref.lockfile, memo)
+        job.dependencies.append(Dependency(job=upstream, when=ref.when))
+    job.dependency_refs.clear()
+    upstreams = {dep.job.id: dep.job.spec for dep in job.dependencies}
+    for dep in job.spec.dependencies:
+        if isinstance(dep.spec, SpecReference) and dep.spec.id in upstreams:
+            dep.spec = upstreams[dep.spec.id]
+    return job
+
+
 def load_job_from_state(lock_data: dict) -> Job:
     from _canary.workspace import Workspace
 
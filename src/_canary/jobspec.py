@@ -139,18 +139,53 @@ class Mask:
         return cls(False, None)
 
 
+def serialization_format() -> int:
+    """Format used to serialize dependency links.
+
+    In format 1, a dependency embeds its upstream spec (or job), and with it the upstream's entire
+    closure.  In format 2, a dependency refers to its upstream by ID and the upstream is resolved
+    on load: specs against the database's spec table, jobs against the upstream's lock file.
+    Both formats can always be read.  Format 2 is enabled with ``workspace:format: 2``.
+
+    """
+    return int(config.get("workspace:format") or 1)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class SpecReference:
+    """Placeholder for an upstream spec that has not been resolved from its ID"""
+
+    id: str
+
+    def __getattr__(self, name: str) -> Any:
+        raise UnresolvedSpecError(self.id, name)
+
+
+class UnresolvedSpecError(AttributeError):
+    def __init__(self, id: str, attr: str) -> None:
+        super().__init__(f"Dependency {id[:7]} has not been resolved (accessing {attr!r})")
+
+
 @dataclasses.dataclass(slots=True)
 class SpecDependency:
     spec: "JobSpec"
     when: str = "on_success"
 
     def __serialize__(self) -> dict[str, Any]:
+        if isinstance(self.spec, SpecReference) or serialization_format() >= 2:
+            return {"spec_id": self.spec.id, "when": self.when}
         return {"spec": self.spec, "when": self.when}
 
     @classmethod
     def __deserialize__(cls, d: dict) -> "SpecDependency":
+        if "spec_id" in d:
+            return cls(spec=SpecReference(d["spec_id"]), when=d["when"])  # type: ignore[arg-type]
         return cls(**d)
 
+    @property
+    def resolved(self) -> bool:
+        return not isinstance(self.spec, SpecReference)
+
 
 NULL_PATH = Path("\0")
 
@@ -448,6 +483,7 @@ class _GlobalSpecCache:
     _file_hash: dict[Path, bytes] = {}
     _repo_root: dict[Path, bytes] = {}
     _rel_repo: dict[Path, bytes] = {}
+    _file_stat: dict[Path, tuple[int, int]] = {}
     _lock = threading.Lock()
 
     @classmethod
@@ -470,6 +506,7 @@ class _GlobalSpecCache:
             pass
 
         key = path.absolute()
+        st = key.stat()
         h = hashlib.sha256()
         h.update(key.read_bytes())
         digest = h.digest()[:16]
@@ -480,6 +517,7 @@ class _GlobalSpecCache:
             cls._repo_root[key] = str(root).encode()
             cls._rel_repo[key] = str(rel).encode()
             cls._file_hash[key] = digest.hex().encode()
+            cls._file_stat[key] = (st.st_mtime_ns, st.st_size)
             return cls._key.setdefault(path, key)
 
     @classmethod
@@ -487,6 +525,15 @@ class _GlobalSpecCache:
         key = cls.populate_cache(path)
         return cls._file_hash[key]
 
+    @classmethod
+    def cached_file_hash(cls, path: Path, mtime_ns: int, size: int) -> str | None:
+        """Return the hash of ``path`` if it was computed when the file had the given modification
+        time and size"""
+        key = path.absolute()
+        if cls._file_stat.get(key) == (mtime_ns, size):
+            return cls._file_hash[key].decode()
+        return None
+
     @classmethod
     def rel_repo(cls, path: Path) -> bytes:
         key = cls.populate_cache(path)
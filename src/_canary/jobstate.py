@@ -0,0 +1,60 @@
+# Copyright NTESS. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: MIT
+"""Execution state of a job, importable without the rest of ``_canary.job``"""
+
+import dataclasses
+from enum import Enum
+from typing import Any
+
+
+class JobPhase(str, Enum):
+    PENDING = "PENDING"
+    STAGING = "STAGING"
+    RUNNING = "RUNNING"
+    FINISHING = "FINISHING"
+    DONE = "DONE"
+
+    def __serialize__(self) -> dict[str, Any]:
+        return {"value": self.value}
+
+    @classmethod
+    def __deserialize__(cls, d: dict[str, Any]) -> "JobPhase":
+        return cls(d["value"])
+
+
+@dataclasses.dataclass(slots=True)
+class JobState:
+    phase: JobPhase = JobPhase.PENDING
+
+    def __post_init__(self) -> None:
+        if isinstance(self.phase, str):
+            self.phase = JobPhase(self.phase)
+
+    def __serialize__(self) -> dict[str, Any]:
+        return {"phase": self.phase}
+
+    @classmethod
+    def __deserialize__(cls, d: dict) -> "JobState":
+        d["phase"] = d.pop("phase", JobPhase.PENDING)
+        if isinstance(d["phase"], str):
+            d["phase"] = JobPhase(d["phase"])
+        return cls(**d)
+
+    def reset(self) -> None:
+        self.phase = JobPhase.PENDING
+
+    def is_pending(self) -> bool:
+        return self.phase == JobPhase.PENDING
+
+    def is_submitted(self) -> bool:
+        return self.phase == JobPhase.PENDING
+
+    def is_running(self) -> bool:
+        return self.phase == JobPhase.RUNNING
+
+    def is_finishing(self) -> bool:
+        return self.phase == JobPhase.FINISHING
+
+    def is_done(self) -> bool:
+        return self.phase == JobPhase.DONE
@@ -43,6 +43,7 @@ def main(argv: list[str] | None = None) -> int:
         os.environ["CANARY_LEVEL"] = "0"
     with CanaryMain(argv) as m:
         parser = make_argument_parser()
+        parser.command_hint = m.command
         parser.add_main_epilog(parser)
         config.pluginmanager.hook.canary_addcommand(parser=parser)
         config.pluginmanager.hook.canary_addoption(parser=parser)
@@ -73,6 +74,7 @@ class CanaryMain:
 
     def __init__(self, argv: list[str] | None = None) -> None:
         self.argv: list[str] = list(argv or sys.argv[1:])
+        self.command: str | None = None
 
     def __enter__(self) -> "CanaryMain":
         """Preparsing is necessary to parse out options that need to take effect before the main
@@ -82,6 +84,7 @@ class CanaryMain:
             reraise = True
         parser = make_argument_parser()
         args = parser.preparse(self.argv, addopts=True)
+        self.command = args.command
         if args.debug:
             reraise = True
         if args.C:
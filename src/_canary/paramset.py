@@ -2,10 +2,14 @@
 #
 # SPDX-License-Identifier: MIT
 
+import copy
 import itertools
+import math
 import random
 from io import StringIO
 from typing import Any
+from typing import Callable
+from typing import Iterator
 from typing import Sequence
 from typing import Type
 
@@ -274,25 +278,100 @@ class ParameterSet:
 
     @staticmethod
     def combine(paramsets: list["ParameterSet"]) -> list[dict[str, Any]]:
-        if not paramsets:
-            return []
-        # Pre-flatten keys once
-        flat_keys: list[str] = []
-        for ps in paramsets:
-            flat_keys.extend(ps.keys)
-        # Build iterables of rows
-        row_iters = [ps.values for ps in paramsets]
-        seen: set[tuple[Any, ...]] = set()
-        out: list[dict[str, Any]] = []
-        for group in itertools.product(*row_iters):
-            # group = tuple of rows
-            # flatten values
-            flat_values = tuple(v for row in group for v in row)
-            if flat_values in seen:
-                continue
-            seen.add(flat_values)
-            out.append(dict(zip(flat_keys, flat_values)))
-        return out
+        """Perform a Cartesian product combination of parameter sets"""
+        return list(ParameterSpace(paramsets))
+
+
+class ParameterSpace:
+    """Lazy Cartesian product of ``ParameterSet`` objects.
+
+    Combinations are generated on demand as ``{name: value}`` dictionaries, in the order of
+    ``itertools.product`` over each set's unique rows, so that only the combinations a caller
+    actually visits are ever built.  Without residual filters the space has constant time ``len``
+    and random access.
+
+    Args:
+      paramsets: the parameter sets to combine
+
+    """
+
+    def __init__(self, paramsets: Sequence[ParameterSet]) -> None:
+        self.keys: list[list[str]] = [list(ps.keys) for ps in paramsets]
+        self.rows: list[list[tuple[Any, ...]]] = [unique_rows(ps.values) for ps in paramsets]
+        self.predicates: list[Callable[[dict[str, Any]], bool]] = []
+        self._len: int | None = None
+
+    @property
+    def names(self) -> list[str]:
+        return [key for keys in self.keys for key in keys]
+
+    def filter(
+        self, predicate: Callable[[dict[str, Any]], bool], keys: Sequence[str] | None = None
+    ) -> "ParameterSpace":
+        """Return a new space containing only combinations for which ``predicate`` is true.
+
+        If ``keys`` names the only parameters ``predicate`` reads and they all come from a single
+        parameter set, the predicate is applied to that set's rows before the product is formed;
+        otherwise it is applied to each combination as it is generated.
+
+        """
+        space = copy.copy(self)
+        space.rows = list(self.rows)
+        space.predicates = list(self.predicates)
+        space._len = None
+        if keys is not None and self.keys:
+            for i, names in enumerate(self.keys):
+                others = {k for j, ks in enumerate(self.keys) if j != i for k in ks}
+                if set(keys) <= set(names) and others.isdisjoint(keys):
+                    space.rows[i] = [r for r in self.rows[i] if predicate(dict(zip(names, r)))]
+                    return space
+        space.predicates.append(predicate)
+        return space
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        if not self.keys:
+            return
+        names = self.names
+        for group in itertools.product(*self.rows):
+            parameters = dict(zip(names, itertools.chain.from_iterable(group)))
+            if all(predicate(parameters) for predicate in self.predicates):
+                yield parameters
+
+    def __len__(self) -> int:
+        if self._len is None:
+            if not self.keys:
+                self._len = 0
+            elif self.predicates:
+                self._len = sum(1 for _ in self)
+            else:
+                self._len = math.prod(len(rows) for rows in self.rows)
+        return self._len
+
+    def __bool__(self) -> bool:
+        if not self.predicates:
+            return len(self) > 0
+        return next(iter(self), None) is not None
+
+    def __getitem__(self, index: int) -> dict[str, Any]:
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("parameter space index out of range")
+        if self.predicates:
+            return next(itertools.islice(self, index, None))
+        # Mixed radix decomposition, last set varying fastest as in itertools.product
+        group: list[tuple[Any, ...]] = []
+        for rows in reversed(self.rows):
+            index, i = divmod(index, len(rows))
+            group.append(rows[i])
+        group.reverse()
+        return dict(zip(self.names, itertools.chain.from_iterable(group)))
+
+
+def unique_rows(values: Sequence[Sequence[Any]]) -> list[tuple[Any, ...]]:
+    """Rows of ``values`` as tuples with duplicates removed, preserving order"""
+    return list(dict.fromkeys(tuple(row) for row in values))
 
 
 def random_range(a: float, b: float, n: int) -> list[float]:
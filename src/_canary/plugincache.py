@@ -0,0 +1,353 @@
+# Copyright NTESS. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: MIT
+"""Persistent cache of the plugins, hook implementations, and subcommands known to canary.
+
+Discovering plugins requires importing every builtin plugin and subcommand module and scanning
+the installed distributions for entry points, which dominates the startup time of short lived
+commands.  The first invocation records what was found; later invocations register lightweight
+stand-ins (:class:`LazyPlugin`) built from the record, and a plugin module is only imported the
+first time one of its hooks is called.  Likewise, a subcommand's module is only imported when its
+parser is needed or the command is executed.
+
+The record is invalidated whenever the set of installed distributions, the plugin sources, or the
+configuration naming plugins to enable or disable change.  Set ``CANARY_STARTUP_CACHE`` to a file name to move the cache, or to ``0`` to disable it.
+"""
+
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import sys
+import types
+from argparse import Namespace
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+
+from .hookspec import project_name
+from .plugins.types import CanarySubcommand
+from .util import logging
+
+if TYPE_CHECKING:
+    from .config.argparsing import Parser
+    from .pluginmanager import CanaryPluginManager
+
+logger = logging.get_logger(__name__)
+
+cache_version = 1
+_cache: dict[str, Any] | None = None
+
+
+def cache_file() -> Path | None:
+    var = os.getenv("CANARY_STARTUP_CACHE")
+    if var is not None and var.lower() in ("0", "no", "off", "false"):
+        return None
+    if var:
+        return Path(var)
+    root = os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    # Distinct virtual environments have distinct plugins
+    prefix = hashlib.sha256(sys.prefix.encode()).hexdigest()[:10]
+    return Path(root) / "canary" / f"startup-{prefix}.json"
+
+
+def load() -> dict[str, Any] | None:
+    """Return the cached startup record, or ``None`` if it does not exist or is stale"""
+    global _cache
+    if _cache is not None:
+        return _cache
+    file = cache_file()
+    if file is None or not file.exists():
+        return None
+    try:
+        with open(file) as fh:
+            data = json.load(fh)
+        if data.get("version") != cache_version:
+            return None
+        if data["fingerprint"] != fingerprint(data["sources"]):
+            logger.debug("Startup cache is stale")
+            return None
+    except Exception as e:
+        logger.debug(f"Failed to read startup cache {file}: {e}")
+        return None
+    _cache = data
+    return _cache
+
+
+def save(pluginmanager: "CanaryPluginManager") -> None:
+    """Record the plugins registered with ``pluginmanager``"""
+    global _cache
+    file = cache_file()
+    if file is None:
+        return
+    plugins: list[dict[str, Any]] = []
+    for name, plugin in pluginmanager.list_name_plugin():
+        if not isinstance(plugin, types.ModuleType) or not getattr(plugin, "__file__", None):
+            logger.debug(f"Not caching startup information: plugin {name} is not a module")
+            return
+        plugins.append(plugin_record(pluginmanager, name, plugin))
+    sources = sorted({source_root(plugin["module"]) for plugin in plugins})
+    data = {
+        "version": cache_version,
+        "fingerprint": fingerprint(sources),
+        "sources": sources,
+        "plugins": plugins,
+    }
+    from .util import json_helper
+
+    try:
+        json_helper.safesave(file, data, indent=None)
+    except OSError as e:
+        logger.debug(f"Failed to write startup cache {file}: {e}")
+        return
+    _cache = data
+
+
+def invalidate() -> None:
+    global _cache
+    _cache = None
+    if (file := cache_file()) is not None:
+        try:
+            file.unlink()
+        except OSError:
+            pass
+
+
+def plugin_record(
+    pluginmanager: "CanaryPluginManager", name: str, plugin: types.ModuleType
+) -> dict[str, Any]:
+    hooks: list[dict[str, Any]] = []
+    attrs = {id(value): attr for attr, value in vars(plugin).items()}
+    for caller in pluginmanager.get_hookcallers(plugin) or []:
+        for impl in caller.get_hookimpls():
+            if impl.plugin is not plugin:
+                continue
+            hook = {
+                "name": caller.name,
+                "attr": attrs.get(id(impl.function), impl.function.__name__),
+                "argnames": list(impl.argnames),
+                "opts": dict(impl.opts),
+            }
+            hooks.append(hook)
+    commands: list[dict[str, Any]] | None = None
+    if addcommand := next((h["attr"] for h in hooks if h["name"] == "canary_addcommand"), None):
+        commands = []
+        recorder = CommandRecorder()
+        try:
+            getattr(plugin, addcommand)(parser=recorder)
+        except Exception:
+            # The hook does more than add commands, it can't be replayed from the cache
+            commands = None
+        else:
+            for command, add_help_override in recorder.commands:
+                command_record = {
+                    "name": command.name,
+                    "description": command.description,
+                    "epilog": command.epilog,
+                    "add_help": command.add_help,
+                    "aliases": list(getattr(command, "aliases", [])),
+                    "add_help_override": add_help_override,
+                }
+                commands.append(command_record)
+    return {
+        "name": name,
+        "module": plugin.__name__,
+        "file": plugin.__file__,
+        "package": plugin.__package__,
+        "hooks": hooks,
+        "commands": commands,
+    }
+
+
+def source_root(module: str) -> str:
+    """The directory (or file) containing the top-level package of ``module``"""
+    top = sys.modules[module.split(".")[0]]
+    if paths := getattr(top, "__path__", None):
+        return list(paths)[0]
+    return top.__file__  # type: ignore[return-value]
+
+
+def fingerprint(sources: list[str]) -> str:
+    """Hash of the installed distributions, the modification times of plugin sources, and the
+    configuration that enables or disables plugins"""
+    h = hashlib.sha256()
+    h.update(f"{sys.executable}:{sys.version}".encode())
+    for item in config_inputs():
+        h.update(item.encode())
+    for entry in sys.path:
+        if not entry or not os.path.isdir(entry):
+            continue
+        for name in sorted(os.listdir(entry)):
+            if name.endswith((".dist-info", ".egg-info", ".egg-link", ".pth")):
+                h.update(name.encode())
+    for source in sources:
+        for file in walk_sources(source):
+            st = os.stat(file)
+            h.update(f"{file}:{st.st_mtime_ns}:{st.st_size}".encode())
+    return h.hexdigest()
+
+
+def config_inputs() -> list[str]:
+    """The ``CANARY_PLUGINS`` variable and the configuration files that can list plugins.  Files
+    are identified by their modification time rather than parsed: they rarely change."""
+    from .config.config import LocalScopeDoesNotExistError
+    from .config.config import get_scope_filename
+
+    inputs = [f"CANARY_PLUGINS={os.getenv('CANARY_PLUGINS', '')}"]
+    for scope in ("site", "global", "local"):
+        try:
+            file = get_scope_filename(scope)
+            st = os.stat(file)
+        except (LocalScopeDoesNotExistError, OSError):
+            continue
+        inputs.append(f"{file}:{st.st_mtime_ns}:{st.st_size}")
+    return inputs
+
+
+def walk_sources(path: str) -> list[str]:
+    if os.path.isfile(path):
+        return [path]
+    files: list[str] = []
+    for dirname, dirs, filenames in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        files.extend(os.path.join(dirname, f) for f in sorted(filenames) if f.endswith(".py"))
+    return files
+
+
+def known_commands() -> list[str] | None:
+    """Names and aliases of the commands recorded in the cache"""
+    if (data := load()) is None:
+        return None
+    names: list[str] = []
+    for plugin in data["plugins"]:
+        for command in plugin["commands"] or []:
+            names.append(command["name"])
+            names.extend(command["aliases"])
+    return names
+
+
+def register(pluginmanager: "CanaryPluginManager", data: dict[str, Any]) -> None:
+    for record in data["plugins"]:
+        if pluginmanager.is_blocked(record["name"]):
+            continue
+        pluginmanager.register(LazyPlugin(record), record["name"])
+
+
+class LazyPlugin(types.ModuleType):
+    """Stand-in for a plugin module that imports the module when one of its hooks is called"""
+
+    def __init__(self, record: dict[str, Any]) -> None:
+        super().__init__(record["module"])
+        self.__file__ = record["file"]
+        self.__package__ = record["package"]
+        self._record = record
+        self._module: types.ModuleType | None = None
+        for hook in record["hooks"]:
+            if hook["name"] == "canary_addcommand" and record["commands"] is not None:
+                impl = self.make_addcommand(hook["attr"], record["commands"])
+            else:
+                impl = self.make_hookimpl(hook["attr"], hook["opts"])
+            impl.__signature__ = make_signature(hook["argnames"])  # type: ignore[attr-defined]
+            setattr(impl, f"{project_name}_impl", dict(hook["opts"]))
+            setattr(self, hook["attr"], impl)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def load(self) -> types.ModuleType:
+        if self._module is None:
+            logger.debug(f"Importing plugin module {self.__name__}")
+            self._module = importlib.import_module(self.__name__)
+            recorded = {hook["attr"] for hook in self._record["hooks"]}
+            if recorded != hookimpl_attrs(self._module):
+                logger.debug(f"Hooks of {self.__name__} changed, invalidating startup cache")
+                invalidate()
+        return self._module
+
+    def make_hookimpl(self, attr: str, opts: dict[str, Any]):
+        plugin = self
+        if opts.get("wrapper") or opts.get("hookwrapper"):
+
+            def impl(*args, **kwargs):
+                return (yield from getattr(plugin.load(), attr)(*args, **kwargs))
+
+        else:
+
+            def impl(*args, **kwargs):
+                return getattr(plugin.load(), attr)(*args, **kwargs)
+
+        impl.__name__ = impl.__qualname__ = attr
+        return impl
+
+    def make_addcommand(self, attr: str, commands: list[dict[str, Any]]):
+        plugin = self
+
+        def canary_addcommand(parser: "Parser") -> None:
+            for command in commands:
+                lazy = LazyCommand(plugin, attr, command)
+                parser.add_command(lazy, add_help_override=command["add_help_override"])
+
+        return canary_addcommand
+
+
+class LazyCommand(CanarySubcommand):
+    """Stand-in for a subcommand whose module has not been imported.  The command's parser is set
+    up when it is first used and the real command is loaded when the command is executed."""
+
+    def __init__(self, plugin: LazyPlugin, addcommand: str, record: dict[str, Any]) -> None:
+        self._command: CanarySubcommand | None = None
+        self.plugin = plugin
+        self.addcommand = addcommand
+        self.name = record["name"]
+        self.description = record["description"]
+        self.epilog = record["epilog"]
+        self.add_help = record["add_help"]
+        self.aliases = record["aliases"]
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__") or name == "_command":
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def load(self) -> CanarySubcommand:
+        if self._command is None:
+            recorder = CommandRecorder()
+            getattr(self.plugin.load(), self.addcommand)(parser=recorder)
+            for command, _ in recorder.commands:
+                if command.name == self.name:
+                    self._command = command
+                    break
+            else:
+                invalidate()
+                raise ValueError(f"{self.plugin.__name__} no longer defines command {self.name}")
+        return self._command
+
+    def setup_parser(self, parser: "Parser") -> None:
+        parser.defer_setup(lambda: self.load().setup_parser(parser))
+
+    def execute(self, args: Namespace) -> int:
+        return self.load().execute(args)
+
+
+class CommandRecorder:
+    """Parser stand-in passed to ``canary_addcommand`` to collect the commands it adds"""
+
+    def __init__(self) -> None:
+        self.commands: list[tuple[CanarySubcommand, bool]] = []
+
+    def add_command(self, command: CanarySubcommand, add_help_override: bool = False) -> None:
+        self.commands.append((command, add_help_override))
+
+
+def make_signature(argnames: list[str]) -> inspect.Signature:
+    kind = inspect.Parameter.POSITIONAL_OR_KEYWORD
+    return inspect.Signature([inspect.Parameter(name, kind) for name in argnames])
+
+
+def hookimpl_attrs(module: types.ModuleType) -> set[str]:
+    marker = f"{project_name}_impl"
+    attrs = vars(module).items()
+    return {attr for attr, value in attrs if inspect.isroutine(value) and hasattr(value, marker)}
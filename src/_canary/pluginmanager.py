@@ -17,10 +17,16 @@ warnings.simplefilter("once", DeprecationWarning)
 class CanaryPluginManager(pluggy.PluginManager):
     @classmethod
     def factory(cls) -> "CanaryPluginManager":
+        from . import plugincache
+
         self = cls(hookspec.project_name)
         self.add_hookspecs(hookspec)
-        self.register_builtins()
-        self.load_setuptools_entrypoints(hookspec.project_name)
+        if cached := plugincache.load():
+            plugincache.register(self, cached)
+        else:
+            self.register_builtins()
+            self.load_setuptools_entrypoints(hookspec.project_name)
+            plugincache.save(self)
         return self
 
     def register_builtins(self):
@@ -47,7 +53,6 @@ class CanaryPluginManager(pluggy.PluginManager):
         self.register(collect, "builtin.collect")
         self.register(generate, "builtin.generate")
         self.register(gpu_select, "builtin.gpu_select")
-        self.register(filter, "builtin.filter")
         self.register(launcher, "builtin.launcher")
         self.register(runtest, "builtin.runtest")
         self.register(rp_hooks, "builtin.resource_pool")
@@ -1,15 +1,36 @@
 # Copyright NTESS. See COPYRIGHT file for details.
 #
 # SPDX-License-Identifier: MIT
+import os
+import stat
 import tarfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Literal
+from typing import IO
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Iterable
+from typing import NamedTuple
 
 from ... import config
 from ...config.argparsing import Parser
 from ...hookspec import hookimpl
+from ...util import json_helper as json
+from ...util import logging
+from ...util.compression import ChunkedCompressor
+from ...util.compression import Codec
+from ...util.compression import codec_for
 from ...workspace import Session
 
+if TYPE_CHECKING:
+    from ...job import Job
+
+logger = logging.get_logger(__name__)
+
+# Archivers of running sessions, see canary_sessionstart
+archivers: dict[str, "Archiver"] = {}
+
 
 @hookimpl
 def canary_addoption(parser: Parser) -> None:
@@ -18,36 +39,268 @@ def canary_addoption(parser: Parser) -> None:
         metavar="NAME",
         dest="archive_name",
         command="run",
-        help="Archive job artifacts to a tgz archive by this name",
+        help="Archive job artifacts to a tar archive by this name.  Artifacts are archived as "
+        "jobs finish.  The archive is compressed according to the suffix of NAME: "
+        ".tgz/.tar.gz (gzip), .tzst/.tar.zst (zstd), otherwise uncompressed",
+    )
+    parser.add_argument(
+        "--archive-compression",
+        dest="archive_compression",
+        command="run",
+        choices=("none", "gzip", "zstd"),
+        default=None,
+        help="Compress the archive with this codec instead of inferring it from its name",
     )
+    parser.add_argument(
+        "--archive-index",
+        dest="archive_index",
+        command="run",
+        action="store_true",
+        default=False,
+        help="Write the offset of each job's artifacts in the archive to NAME.index.json",
+    )
+
+
+@hookimpl
+def canary_sessionstart(session: Session) -> None:
+    if config.getoption("archive_name") is None:
+        return
+    archiver = Archiver.from_config(session)
+    archiver.start(session)
+    archivers[session.name] = archiver
 
 
 @hookimpl
 def canary_sessionfinish(session: Session) -> None:
-    f = config.getoption("archive_name")
-    if f is None:
+    if config.getoption("archive_name") is None:
         return
-    dest = Path(f)
-    mode: Literal["w:gz", "w"] = "w:gz" if str(dest).endswith((".tgz", ".tar.gz")) else "w"
-    prefix = Path(session.prefix)
-    dest.parent.mkdir(exist_ok=True, parents=True)
-    seen: set[Path] = set()
-    with tarfile.open(dest, mode, dereference=True) as tf:
-        for job in session.jobs:
-            if not job.workspace.dir.exists():
+    archiver = archivers.pop(session.name, None) or Archiver.from_config(session)
+    archiver.finish(session)
+
+
+class Member(NamedTuple):
+    path: str
+    info: tarfile.TarInfo
+    key: tuple[int, int]
+
+
+class Archiver:
+    """Stream the artifacts of a session's jobs into a tar archive.
+
+    Artifacts are globbed and stat'ed concurrently, files reachable by more than one path are
+    archived once (by inode), and the tar stream is compressed in parallel by a
+    ``ChunkedCompressor``.  Each job's artifacts begin a new compressed member, so the optional
+    index can be used to read a single job's artifacts without decompressing the whole archive.
+
+    While the session runs, a background thread archives jobs as they finish.
+
+    """
+
+    def __init__(
+        self,
+        dest: Path,
+        prefix: Path,
+        codec: Codec = "gzip",
+        index: bool = False,
+        workers: int | None = None,
+        interval: float = 1.0,
+    ) -> None:
+        self.dest = dest
+        self.prefix = prefix
+        self.codec = codec
+        self.index = index
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.interval = interval
+        self.dest.parent.mkdir(exist_ok=True, parents=True)
+        self.file: IO[bytes] = open(self.dest, "wb")
+        self.stream = ChunkedCompressor(self.file, codec=codec, workers=self.workers)
+        self.tar = tarfile.open(fileobj=self.stream, mode="w")  # type: ignore[call-overload]
+        self.seen: set[tuple[int, int]] = set()
+        self.archived: set[str] = set()
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        self.thread: threading.Thread | None = None
+
+    @classmethod
+    def from_config(cls, session: Session) -> "Archiver":
+        dest = Path(config.getoption("archive_name"))
+        codec = config.getoption("archive_compression") or codec_for(dest)
+        index = bool(config.getoption("archive_index"))
+        return cls(dest, Path(session.prefix), codec=codec, index=index)
+
+    def start(self, session: Session) -> None:
+        """Archive jobs of ``session`` in the background as they finish"""
+
+        def poll() -> None:
+            pending = list(session.jobs)
+            # A job is archived once it has been seen done on two consecutive polls, so that
+            # its status is not read while the job is being refreshed
+            done: list["Job"] = []
+            while not self.stop.wait(self.interval):
+                try:
+                    self.add(done)
+                    done = [job for job in pending if job.is_done()]
+                    pending = [job for job in pending if job.id not in self.archived]
+                except Exception:
+                    logger.exception("Failed to archive artifacts, deferring to session end")
+                    return
+
+        self.thread = threading.Thread(target=poll, name="canary-archive", daemon=True)
+        self.thread.start()
+
+    def finish(self, session: Session) -> None:
+        """Archive the remaining jobs of ``session`` and close the archive"""
+        self.stop.set()
+        if self.thread is not None:
+            self.thread.join()
+        try:
+            self.add(session.jobs)
+        finally:
+            self.close()
+
+    def add(self, jobs: Iterable["Job"]) -> None:
+        todo = [job for job in jobs if job.id not in self.archived]
+        if not todo:
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as ex:
+            for job, members in zip(todo, ex.map(self.gather, todo)):
+                self.write(job, members)
+
+    def gather(self, job: "Job") -> list[Member]:
+        members: list[Member] = []
+        if not job.workspace.dir.exists():
+            return members
+        for artifact in job.spec.artifacts:
+            if not artifact.active(job.status):
                 continue
-            for artifact in job.spec.artifacts:
-                if not artifact.active(job.status):
+            for path in job.workspace.dir.glob(artifact.pattern):
+                members.extend(scan(path, self.arcname(job, path)))
+        return members
+
+    def arcname(self, job: "Job", path: Path) -> str:
+        if path.is_relative_to(self.prefix):
+            return str(path.relative_to(self.prefix))
+        tmp = job.workspace.dir / path.relative_to(job.spec.file.parent)
+        return str(tmp.relative_to(self.prefix))
+
+    def write(self, job: "Job", members: list[Member]) -> None:
+        with self.lock:
+            if job.id in self.archived:
+                return
+            self.archived.add(job.id)
+            member = self.stream.cut()
+            offset = self.tar.offset
+            names: list[str] = []
+            for m in members:
+                if m.key in self.seen:
                     continue
-                for path in job.workspace.dir.glob(artifact.pattern):
-                    rp = path.resolve()
-                    if rp in seen:
+                self.seen.add(m.key)
+                if m.info.isdir():
+                    self.tar.addfile(m.info)
+                else:
+                    try:
+                        fh = open(m.path, "rb")
+                    except OSError as e:
+                        logger.warning(f"Unable to archive {m.path}: {e}")
                         continue
-                    seen.add(rp)
-                    relpath: Path
-                    if path.is_relative_to(prefix):
-                        relpath = path.relative_to(prefix)
-                    else:
-                        tmp = job.workspace.dir / path.relative_to(job.spec.file.parent)
-                        relpath = tmp.relative_to(prefix)
-                    tf.add(path, arcname=str(relpath), recursive=True)
+                    with fh:
+                        self.tar.addfile(m.info, fh)
+                names.append(m.info.name)
+            if names:
+                self.entries[job.id] = {
+                    "name": job.display_name(),
+                    "member": member,
+                    "offset": offset,
+                    "files": names,
+                }
+
+    def close(self) -> None:
+        with self.lock:
+            try:
+                self.tar.close()
+                self.stream.close()
+            finally:
+                self.file.close()
+            if not self.index:
+                return
+            for entry in self.entries.values():
+                entry["member"] = self.stream.member_offset(entry["member"])
+            data = {"compression": self.codec, "jobs": self.entries}
+            index_file(self.dest).write_text(json.dumps(data, indent=2))
+            logger.debug(f"Wrote archive index to {index_file(self.dest)}")
+
+
+def index_file(archive: Path) -> Path:
+    return archive.with_name(f"{archive.name}.index.json")
+
+
+def scan(path: Path, arcname: str) -> list[Member]:
+    """Return the file and directory members at or below ``path``, following symbolic links"""
+    members: list[Member] = []
+    visited: set[tuple[int, int]] = set()
+    stack: list[tuple[str, str]] = [(str(path), arcname)]
+    while stack:
+        p, a = stack.pop()
+        try:
+            st = os.stat(p)
+        except OSError:
+            continue
+        key = (st.st_dev, st.st_ino)
+        if stat.S_ISDIR(st.st_mode):
+            if key in visited:
+                continue
+            visited.add(key)
+            members.append(Member(p, tarinfo(a, st), key))
+            try:
+                names = sorted(os.listdir(p), reverse=True)
+            except OSError:
+                continue
+            stack.extend((os.path.join(p, name), f"{a}/{name}") for name in names)
+        elif stat.S_ISREG(st.st_mode):
+            members.append(Member(p, tarinfo(a, st), key))
+    return members
+
+
+def tarinfo(arcname: str, st: os.stat_result) -> tarfile.TarInfo:
+    info = tarfile.TarInfo(arcname)
+    info.mode = stat.S_IMODE(st.st_mode)
+    info.uid = st.st_uid
+    info.gid = st.st_gid
+    info.mtime = st.st_mtime
+    if stat.S_ISDIR(st.st_mode):
+        info.type = tarfile.DIRTYPE
+    else:
+        info.size = st.st_size
+    return info
+
+
+def read_job_artifacts(archive: Path, job_id: str) -> dict[str, bytes]:
+    """Read the artifacts of job ``job_id`` from ``archive`` using its index"""
+    import gzip
+
+    from ...util.compression import zstd_decompressor
+
+    data = json.loads(index_file(archive).read_text())
+    entry = data["jobs"][job_id]
+    files: dict[str, bytes] = {}
+    with open(archive, "rb") as fh:
+        fh.seek(entry["member"])
+        stream: IO[bytes] | gzip.GzipFile
+        if data["compression"] == "gzip":
+            stream = gzip.GzipFile(fileobj=fh, mode="rb")
+        elif data["compression"] == "zstd":
+            stream = zstd_decompressor(fh)
+        else:
+            fh.seek(entry["offset"])
+            stream = fh
+        with tarfile.open(fileobj=stream, mode="r|") as tf:
+            wanted = set(entry["files"])
+            for info in tf:
+                if info.name not in wanted:
+                    break
+                if info.isfile():
+                    f = tf.extractfile(info)
+                    assert f is not None
+                    files[info.name] = f.read()
+    return files
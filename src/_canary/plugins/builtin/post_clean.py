@@ -6,11 +6,15 @@ from typing import TYPE_CHECKING
 
 from ... import config
 from ...hookspec import hookimpl
-from ...workspace import Session
-from ...workspace import Workspace
+from ...util import logging
+from ...util.filesystem import remove
 
 if TYPE_CHECKING:
     from ...config.argparsing import Parser
+    from ...job import Job
+    from ...workspace import Session
+
+logger = logging.get_logger(__name__)
 
 
 @hookimpl
@@ -27,6 +31,26 @@ def canary_addoption(parser: "Parser") -> None:
 
 @hookimpl(trylast=True)
 def canary_sessionfinish(session: "Session") -> None:
-    if config.getoption("teardown"):
-        workspace = Workspace.load()
-        workspace.gc()
+    if not config.getoption("teardown"):
+        return
+    for job in session.jobs:
+        if job.status.is_success():
+            teardown(job)
+
+
+def teardown(job: "Job") -> None:
+    """Remove the files created by ``job``, keeping its lock file and captured output so that the
+    job can still be reported on"""
+    keep = {job.lockfile.name, job.stdout, job.stderr}
+    if not job.workspace.dir.exists():
+        return
+    for path in job.workspace.dir.iterdir():
+        if path.name in keep:
+            continue
+        try:
+            if path.is_symlink():
+                path.unlink()
+            else:
+                remove(path)
+        except OSError as e:
+            logger.warning(f"{job}: failed to remove {path}: {e}")
@@ -4,13 +4,13 @@
 
 import io
 import os
+import time
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from ... import config
 from ...hookspec import hookimpl
+from ...queue import RetryPolicy
 from ...util import logging
-from ...util.string import pluralize
 
 if TYPE_CHECKING:
     from ...config.argparsing import Parser
@@ -46,51 +46,35 @@ def canary_addoption(parser: "Parser") -> None:
         group=group,
         help="Require each test to run N times without failing in order to pass",
     )
+    parser.add_argument(
+        "--repeat-backoff",
+        type=float,
+        metavar="T",
+        command="run",
+        group=group,
+        help="Wait T seconds before the first repeat of a test, doubling the wait for each "
+        "further repeat [default: 0]",
+    )
 
 
 @hookimpl(specname="canary_runtest")
-def repeat_until_pass(case: "Job") -> None:
-    if case.status.is_failure() and (count := config.getoption("repeat_until_pass")):
-        i: int = 0
-        while i < count:
-            i += 1
-            rerun_case(case, i)
-            if case.status.is_success():
-                return
-        logger.error(
-            f"{case}: failed to finish successfully after {i} additional {pluralize('attempt', i)}"
-        )
-
-
-@hookimpl(specname="canary_runtest")
-def repeat_after_timeout(case: "Job") -> None:
-    if case.status.is_timeout() and (count := config.getoption("repeat_after_timeout")):
-        i: int = 0
-        while i < count:
-            i += 1
-            rerun_case(case, i)
-            if not case.status.is_timeout():
-                return
-        logger.error(
-            f"{case}: failed to finish without timing out after {i} additional {pluralize('attempt', i)}"
-        )
+def repeat_in_process(case: "Job") -> None:
+    """Repeat ``case`` in the process that ran it.
 
+    Jobs scheduled by the resource queue are repeated by the queue instead, so that each attempt
+    waits its turn and the job's resources are released between attempts.  This hook repeats jobs
+    run by other means, eg, ``canary exec``.
 
-@hookimpl(specname="canary_runtest")
-def repeat_until_fail(case: "Job") -> None:
-    if case.status.is_success() and (count := config.getoption("repeat_until_fail")):
-        i: int = 1
-        while i < count:
-            i += 1
-            rerun_case(case, i)
-            if not case.status.is_success():
-                break
-        else:
-            return
-        n: int = count
-        logger.error(
-            f"{case}: failed to finish successfully {n} {pluralize('time', n)} without failing"
-        )
+    """
+    if case.repeat_in_queue or (policy := RetryPolicy.from_config()) is None:
+        return
+    try:
+        while (reason := policy.reason(case)) is not None:
+            attempt = policy.record(case, reason)
+            time.sleep(policy.delay(attempt))
+            rerun_case(case, attempt - 1)
+    finally:
+        policy.finish(case)
 
 
 def rerun_case(job: "Job", attempt: int) -> None:
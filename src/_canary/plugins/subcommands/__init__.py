@@ -2,58 +2,42 @@
 #
 # SPDX-License-Identifier: MIT
 
-from . import autodoc
-from . import check
-from . import collect
-from . import config
-from . import describe
-from . import docs
-from . import edit
-from . import exec
-from . import fetch
-from . import find
-from . import gc
-from . import help
-from . import info
-from . import init
-from . import location
-from . import log
-from . import query
-from . import rebaseline
-from . import report
-from . import rm
-from . import run
-from . import select
-from . import selection
-from . import status
-from . import tree
-from . import view
+import importlib
+from types import ModuleType
 
-plugins = [
-    autodoc,
-    check,
-    collect,
-    config,
-    describe,
-    docs,
-    edit,
-    exec,
-    fetch,
-    find,
-    gc,
-    help,
-    info,
-    init,
-    location,
-    log,
-    query,
-    rebaseline,
-    report,
-    rm,
-    run,
-    select,
-    selection,
-    status,
-    tree,
-    view,
+# Subcommand modules are imported on demand so that importing one of them, or asking for the
+# names of the builtin commands, does not import all of them
+names = [
+    "autodoc",
+    "check",
+    "collect",
+    "config",
+    "describe",
+    "docs",
+    "edit",
+    "exec",
+    "fetch",
+    "find",
+    "gc",
+    "help",
+    "info",
+    "init",
+    "location",
+    "log",
+    "query",
+    "rebaseline",
+    "report",
+    "rm",
+    "run",
+    "select",
+    "selection",
+    "status",
+    "tree",
+    "view",
 ]
+
+
+def __getattr__(name: str) -> list[ModuleType]:
+    if name == "plugins":
+        return [importlib.import_module(f"{__name__}.{name}") for name in names]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
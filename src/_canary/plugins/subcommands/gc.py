@@ -20,7 +20,7 @@ def canary_addcommand(parser: "Parser") -> None:
 
 class GarbageCollect(CanarySubcommand):
     name = "gc"
-    description = "Garbage collect (remove) files generated by cases with status 'success'"
+    description = "Garbage collect (remove) stale sessions, superseded results, and unused specs"
 
     def setup_parser(self, parser: "Parser") -> None:
         parser.add_argument(
@@ -28,8 +28,14 @@ class GarbageCollect(CanarySubcommand):
             action="store_true",
             help="Show what would be removed by garbage collection, but don't perform deletion",
         )
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=10,
+            help="Retain the result history of this many recent sessions [default: %(default)s]",
+        )
 
     def execute(self, args: argparse.Namespace) -> int:
         workspace = Workspace.load()
-        workspace.gc(dryrun=args.dryrun)
+        workspace.gc(dryrun=args.dryrun, keep=args.keep)
         return 0
@@ -11,14 +11,19 @@ from typing import TYPE_CHECKING
 from typing import Any
 from typing import Iterable
 
+from . import config
 from .job import BaseJob
+from .jobstate import JobPhase
 from .resource_pool.rpool import ResourceUnavailable
 from .util import logging
+from .util.string import pluralize
 from .util.time import hhmmss
 
 if TYPE_CHECKING:
     from .resource_pool.rpool import NodeRequest
     from .resource_pool.rpool import ResourcePool
+    from .status import Category
+    from .status import Outcome
 
 logger = logging.get_logger(__name__)
 
@@ -37,6 +42,10 @@ class HeapSlot:
     cost: float = field(init=False, repr=False)
     job: BaseJob = field(compare=False)
     resources: list["NodeRequest"] = field(compare=False, init=False, repr=False)
+    # Queue generation at which the job was last found not ready
+    deferred_at: int = field(default=-1, compare=False, init=False, repr=False)
+    # Time before which a repeated job waits in the queue, see RetryPolicy.delay
+    not_before: float = field(default=0.0, compare=False, init=False, repr=False)
 
     def __post_init__(self):
         self.cost = -self.job.cost()
@@ -52,13 +61,27 @@ class ResourceQueue:
     """
 
     def __init__(
-        self, lock: threading.Lock, resource_pool: "ResourcePool", jobs: list[BaseJob] | None = None
+        self,
+        lock: threading.Lock,
+        resource_pool: "ResourcePool",
+        jobs: list[BaseJob] | None = None,
+        retry: "RetryPolicy | None" = None,
     ) -> None:
         self.lock = lock
+        self.retry = retry
         self._heap: list[HeapSlot] = []
         self._busy: dict[str, Any] = {}
         self._finished: dict[str, Any] = {}
+        # Running (category, outcome) totals of finished jobs, so that status() does not need to
+        # walk every finished job.  Jobs that were retired before reaching a final state are
+        # counted once they do.
+        self._totals: Counter[tuple["Category", "Outcome"]] = Counter()
+        self._uncounted: dict[str, BaseJob] = {}
+        self._ndone: int = 0
         self.exclusive_job_id: str | None = None
+        # Incremented whenever a job is dispatched or finishes, ie, whenever the readiness of
+        # jobs waiting on other jobs may have changed
+        self.generation: int = 0
         self.rpool = resource_pool
         self.prepared = False
         self.alogger = logging.AdaptiveDebugLogger(__name__)
@@ -83,6 +106,8 @@ class ResourceQueue:
                 raise ValueError(f"{job}: a test should require at least 1 cpu")
             if not self.rpool.accommodates(required):
                 raise ValueError(f"Not enough resources for job {job}")
+            if self.retry is not None:
+                job.repeat_in_queue = True
             slot = HeapSlot(job=job)
             heapq.heappush(self._heap, slot)
             logger.debug(f"Job {job.id[:7]} added to queue with cost {-slot.cost}")
@@ -93,6 +118,7 @@ class ResourceQueue:
                 logger.debug("Queue empty on get()")
                 raise Empty
 
+            now = time.time()
             deferred_slots: list[HeapSlot] = []
             while self._heap:
                 slot = heapq.heappop(self._heap)
@@ -102,15 +128,26 @@ class ResourceQueue:
                     deferred_slots.append(slot)
                     continue
 
+                if slot.not_before > now:
+                    deferred_slots.append(slot)
+                    continue
+
+                if slot.deferred_at == self.generation:
+                    # Nothing has happened since this job was last found not ready
+                    deferred_slots.append(slot)
+                    continue
+
                 job.refresh_readiness()
 
                 if not job.is_runnable():
                     # Job will never by ready
                     logger.debug(f"Job {job.id[:7]} not runnable and removed from queue")
-                    self._finished[job.id] = job
+                    self._retire(job)
                     continue
 
                 if not job.is_ready():
+                    if job.readiness_follows_queue:
+                        slot.deferred_at = self.generation
                     deferred_slots.append(slot)
                     continue
 
@@ -122,6 +159,7 @@ class ResourceQueue:
 
                 job.assign_resources(acquired)
                 self._busy[job.id] = job
+                self.generation += 1
                 if job.exclusive:
                     logger.debug(f"Exclusive job {job.id[:7]} started, exclusive lock obtained")
                     self.exclusive_job_id = job.id
@@ -150,6 +188,29 @@ class ResourceQueue:
             slot = self._heap.pop()
             slot.job.set_status(outcome=status)
 
+    def requeue(self, job: BaseJob) -> bool:
+        """Put the finished ``job`` back in the queue as a new attempt if the retry policy asks
+        for one.  The job's resources are released so that other jobs can use them while the
+        attempt waits its turn.  Returns True if the job was requeued."""
+        if self.retry is None:
+            return False
+        with self.lock:
+            if job.id not in self._busy or (reason := self.retry.reason(job)) is None:
+                return False
+            self._release(self._busy.pop(job.id))
+            attempt = self.retry.record(job, reason)
+            job.state.phase = JobPhase.PENDING
+            job.status.reset()
+            job.timekeeper.reset()
+            slot = HeapSlot(job=job)
+            # Repeats yield to jobs that have not yet run
+            slot.cost /= attempt
+            slot.not_before = time.time() + self.retry.delay(attempt)
+            heapq.heappush(self._heap, slot)
+            self.generation += 1
+            logger.debug(f"Job {job.id[:7]} requeued for attempt {attempt} ({reason})")
+        return True
+
     def done(self, job: BaseJob) -> None:
         try:
             with self.lock:
@@ -157,15 +218,42 @@ class ResourceQueue:
                 if job is None:
                     logger.error(f"queue.done() called for non-busy job {job.id[:7]}")
                     return
-                self._finished[job.id] = job
-                if job.exclusive:
-                    self.exclusive_job_id = None
-                    logger.debug(f"Exclusive job {job.id[:7]} finished, exclusive lock released")
-                self.rpool.checkin(job.free_resources())
+                if self.retry is not None:
+                    self.retry.finish(job)
+                self._retire(job)
+                self._release(job)
                 logger.debug(f"Job {job.id[:7]} marked done")
         except Exception:
             logger.exception(f"Failed to mark {job.id[:7]} as done")
 
+    def _release(self, job: BaseJob) -> None:
+        """Return ``job``'s resources to the pool.  Caller holds the lock"""
+        if job.exclusive:
+            self.exclusive_job_id = None
+            logger.debug(f"Exclusive job {job.id[:7]} finished, exclusive lock released")
+        self.rpool.checkin(job.free_resources())
+
+    def _retire(self, job: BaseJob) -> None:
+        """Move ``job`` to the finished jobs and update the running totals.  Caller holds the lock"""
+        self._finished[job.id] = job
+        self.generation += 1
+        for member in self.members(job):
+            self._ndone += 1
+            if member.state.is_done():
+                self._totals[(member.status.category, member.status.outcome)] += 1
+            else:
+                self._uncounted[member.id] = member
+
+    def _count_stragglers(self) -> None:
+        for job in list(self._uncounted.values()):
+            if job.state.is_done():
+                self._totals[(job.status.category, job.status.outcome)] += 1
+                del self._uncounted[job.id]
+
+    def members(self, job: BaseJob) -> list[BaseJob]:
+        """The jobs counted for queued ``job``.  Queues of job batches count each job in the batch"""
+        return [job]
+
     def jobs(self) -> list[BaseJob]:
         """Return all jobs in queue, busy, and finished."""
         jobs = [slot.job for slot in self._heap]
@@ -173,39 +261,135 @@ class ResourceQueue:
         jobs.extend(self._finished.values())
         return jobs
 
-    def pending(self) -> list[BaseJob]:
-        return [slot.job for slot in self._heap]
+    def pending(self, limit: int | None = None) -> list[BaseJob]:
+        """Jobs waiting in the queue.  If ``limit`` is given, return at most ``limit`` jobs"""
+        return [slot.job for slot in self._heap[:limit]]
+
+    def counts(self) -> "QueueCounts":
+        """Snapshot of the queue's progress.  The cost does not depend on the number of jobs"""
+        with self.lock:
+            self._count_stragglers()
+            return QueueCounts(
+                pending=len(self._heap),
+                busy=len(self._busy),
+                done=self._ndone,
+                totals=dict(self._totals),
+            )
 
     def status(self, start: float | None = None) -> str:
         from .status import Category
-        from .status import Outcome
 
         def sortkey(x):
             n = 0 if x[0] == Category.PASS else 2 if x[0] == Category.FAIL else 1
             return (n, x[1])
 
-        with self.lock:
-            done = len(self._finished)
-            busy = len(self._busy)
-            pending = len(self._heap)
-            total = done + busy + pending
-            totals: Counter[tuple[Category, Outcome]] = Counter()
-            for job in self._finished.values():
-                if job.state.is_done():
-                    key = (job.status.category, job.status.outcome)
-                    totals[key] += 1
-            row: list[str] = []
-            if pending:
-                row.append(f"{busy}/{total} [green]RUNNING[/]")
-            else:
-                row.append(f"{total}/{total} [blue]COMPLETE[/]")
-            for key in sorted(totals, key=sortkey):
-                color = key[0].rich_color()
-                row.append(f"{totals[key]} [{color}]{key[1].name}[/]")
-            if start is not None:
-                duration = hhmmss(time.time() - start)
-                row.append(f"in {duration}")
-            return ", ".join(row)
+        counts = self.counts()
+        total = counts.done + counts.busy + counts.pending
+        row: list[str] = []
+        if counts.pending:
+            row.append(f"{counts.busy}/{total} [green]RUNNING[/]")
+        else:
+            row.append(f"{total}/{total} [blue]COMPLETE[/]")
+        for key in sorted(counts.totals, key=sortkey):
+            color = key[0].rich_color()
+            row.append(f"{counts.totals[key]} [{color}]{key[1].name}[/]")
+        if start is not None:
+            duration = hhmmss(time.time() - start)
+            row.append(f"in {duration}")
+        return ", ".join(row)
+
+
+@dataclass
+class RetryPolicy:
+    """When to repeat a finished job, see the ``--repeat-*`` options.
+
+    ``until_pass`` and ``after_timeout`` allow that many additional attempts of a failed or timed
+    out job, and ``until_fail`` requires that many passing attempts.  The n-th repeat of a job
+    waits ``backoff * 2 ** (n - 1)`` seconds.  The outcome of every attempt is recorded in the
+    job's ``attempts`` measurement.
+
+    """
+
+    until_pass: int = 0
+    after_timeout: int = 0
+    until_fail: int = 0
+    backoff: float = 0.0
+    history: dict[str, list[dict[str, Any]]] = field(default_factory=dict, repr=False)
+
+    def __bool__(self) -> bool:
+        return bool(self.until_pass or self.after_timeout or self.until_fail)
+
+    @classmethod
+    def from_config(cls) -> "RetryPolicy | None":
+        policy = cls(
+            until_pass=config.getoption("repeat_until_pass") or 0,
+            after_timeout=config.getoption("repeat_after_timeout") or 0,
+            until_fail=config.getoption("repeat_until_fail") or 0,
+            backoff=config.getoption("repeat_backoff") or 0.0,
+        )
+        return policy if policy else None
+
+    def reason(self, job: BaseJob) -> str | None:
+        """The reason to repeat ``job``, or None if it is finished"""
+        counts = Counter(record["repeat"] for record in self.history.get(job.id, []))
+        if job.status.is_timeout() and counts["after_timeout"] < self.after_timeout:
+            return "after_timeout"
+        if job.status.is_failure() and counts["until_pass"] < self.until_pass:
+            return "until_pass"
+        if job.status.is_success() and counts["until_fail"] + 1 < self.until_fail:
+            return "until_fail"
+        return None
+
+    def record(self, job: BaseJob, reason: str | None) -> int:
+        """Record the outcome of ``job``'s current attempt and return the number of the next"""
+        records = self.history.setdefault(job.id, [])
+        records.append(
+            {
+                "attempt": len(records) + 1,
+                "repeat": reason,
+                "category": job.status.category.name,
+                "outcome": job.status.outcome.name,
+                "reason": job.status.reason,
+                "duration": job.timekeeper.duration(),
+            }
+        )
+        return len(records) + 1
+
+    def delay(self, attempt: int) -> float:
+        return self.backoff * 2 ** (attempt - 2) if self.backoff > 0 and attempt > 1 else 0.0
+
+    def finish(self, job: BaseJob) -> None:
+        """Attach the attempts of a repeated ``job`` to its measurements once it is done"""
+        if job.id not in self.history:
+            return
+        self.record(job, None)
+        records = self.history.pop(job.id)
+        job.add_measurement("attempts", records)
+        counts = Counter(record["repeat"] for record in records)
+        n = len(records) - 1
+        if counts["until_fail"] and not job.status.is_success():
+            n = self.until_fail
+            logger.error(
+                f"{job}: failed to finish successfully {n} {pluralize('time', n)} without failing"
+            )
+        elif counts["after_timeout"] and job.status.is_timeout():
+            logger.error(
+                f"{job}: failed to finish without timing out after {n} additional "
+                f"{pluralize('attempt', n)}"
+            )
+        elif counts["until_pass"] and job.status.is_failure():
+            logger.error(
+                f"{job}: failed to finish successfully after {n} additional "
+                f"{pluralize('attempt', n)}"
+            )
+
+
+@dataclass(frozen=True)
+class QueueCounts:
+    pending: int
+    busy: int
+    done: int
+    totals: dict[tuple["Category", "Outcome"], int]
 
 
 def truncate(items: Iterable[str]) -> str:
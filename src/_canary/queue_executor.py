@@ -484,6 +484,9 @@ class ResourceQueueExecutor:
 
                 except Empty:
                     self._wait_all(start, session_timeout)
+                    if len(self.queue):
+                        # Jobs finishing while we waited were put back to be repeated
+                        continue
                     break
 
                 except CanaryKill:
@@ -599,27 +602,14 @@ class ResourceQueueExecutor:
                 finally:
                     finished_at = float(payload.get("timestamp", time.time()))
                     slot.on_finish(finished_at)
-                    self.finished[job_id] = slot
-                    self.running.pop(job_id, None)
-                    self.submitted.pop(job_id, None)
-                    self.queue.done(slot.job)
-                    self.notify_listeners(event, slot)
-                    self.busy_workers.pop(wid, None)
-                    self.idle_workers.append(wid)
+                    self._retire_slot(slot, wid)
                 return
 
             if event == "job_timeout":
                 reason = f"Job timed out after {slot.job.total_timeout()} s."
 
                 self._finish_abnormal_slot(slot, outcome="TIMEOUT", reason=reason)
-
-                self.finished[job_id] = slot
-                self.running.pop(job_id, None)
-                self.submitted.pop(job_id, None)
-                self.queue.done(slot.job)
-                self.notify_listeners("job_finished", slot)
-                self.busy_workers.pop(wid, None)
-                self.idle_workers.append(wid)
+                self._retire_slot(slot, wid)
                 return
 
             if event == "job_died":
@@ -636,18 +626,27 @@ class ResourceQueueExecutor:
                         reason += f" (exitcode {exitcode})"
 
                 self._finish_abnormal_slot(slot, outcome="ERROR", reason=reason, code=code)
-
-                self.finished[job_id] = slot
-                self.running.pop(job_id, None)
-                self.submitted.pop(job_id, None)
-                self.queue.done(slot.job)
-                self.notify_listeners("job_finished", slot)
-                self.busy_workers.pop(wid, None)
-                self.idle_workers.append(wid)
+                self._retire_slot(slot, wid)
                 return
 
             logger.warning(f"Unexpected worker payload for {job_id[:7]}: {payload}")
 
+    def _retire_slot(self, slot: ExecutionSlot, wid: int) -> None:
+        """Free the worker of a finished slot and hand the job back to the queue, which either
+        retires it or puts it back in the queue to be repeated"""
+        job_id = slot.job.id
+        self.running.pop(job_id, None)
+        self.submitted.pop(job_id, None)
+        if self.queue.requeue(slot.job):
+            # Listeners are notified when the job's last attempt finishes
+            self.slots_by_id.pop(job_id, None)
+        else:
+            self.finished[job_id] = slot
+            self.queue.done(slot.job)
+            self.notify_listeners("job_finished", slot)
+        self.busy_workers.pop(wid, None)
+        self.idle_workers.append(wid)
+
     def _finish_abnormal_slot(
         self, slot: ExecutionSlot, *, outcome: str, reason: str, code: int = -1
     ) -> None:
@@ -763,7 +762,7 @@ class ResourceQueueExecutor:
 
     def _wait_all(self, start: float, timeout: float) -> None:
         while True:
-            if not self.inflight:
+            if not self.inflight or len(self.queue):
                 break
             if timeout >= 0.0 and time.time() - start > timeout:
                 self._terminate_all(signal.SIGUSR2)
@@ -2,9 +2,11 @@
 #
 # SPDX-License-Identifier: MIT
 import dataclasses
+import queue
 import sys
 import threading
 import time
+from collections import deque
 from collections.abc import Sequence
 from typing import TYPE_CHECKING
 from typing import Any
@@ -36,7 +38,7 @@ class ReporterQueueProtocol(Protocol):
 
     def jobs(self) -> Sequence[BaseJob]: ...
 
-    def pending(self) -> Sequence[BaseJob]: ...
+    def pending(self, limit: int | None = None) -> Sequence[BaseJob]: ...
 
     def status(self, start: float | None = None) -> str: ...
 
@@ -256,8 +258,12 @@ class LiveReporter(Reporter):
         self._stream_handlers: list[logging.builtin_logging.StreamHandler] = []
         self._stop = threading.Event()
         self.refresh_interval = 0.25
+        # Most recently finished jobs, in the order they finished.  Appended to by the scheduler
+        # thread and read by the refresh thread so that the table does not scan every finished job
+        self._recent: deque["ExecutionSlot"] = deque(maxlen=20)
 
     def __enter__(self):
+        self.executor.add_listener(self.on_event)
         self.mute_stream_handlers()
         self.live.__enter__()
         self._thread = threading.Thread(target=self._refresh, daemon=True)
@@ -267,6 +273,7 @@ class LiveReporter(Reporter):
     def __exit__(self, exc_type, exc, tb):
         self._stop.set()
         self._thread.join()
+        self.executor.remove_listener(self.on_event)
         self.live.update(self.final_table() or "", refresh=True)
         self.live.__exit__(exc_type, exc, tb)
         self.unmute_stream_handlers()
@@ -290,6 +297,10 @@ class LiveReporter(Reporter):
             h.removeFilter(self._filter)
         self._stream_handlers.clear()
 
+    def on_event(self, event: str, *args, **kwargs) -> None:
+        if event == "job_finished":
+            self._recent.append(args[0])
+
     def _refresh(self) -> None:
         while not self._stop.is_set():
             if self.executor.inflight:
@@ -320,7 +331,7 @@ class LiveReporter(Reporter):
         max_finished = 5  # hard cap
 
         recent_finished = [
-            s for s in xtor.finished.values() if now - s.job.timekeeper._stopped < decay_window
+            s for s in list(self._recent) if now - s.job.timekeeper._stopped < decay_window
         ]
         recent_finished.sort(key=lambda s: s.job.timekeeper._stopped, reverse=True)
         for slot in recent_finished[:max_finished]:
@@ -340,7 +351,7 @@ class LiveReporter(Reporter):
         # 2) RUNNING (longest-running first for stability)
         # ---------------------------------------------------------
         running = sorted(
-            xtor.running.values(), key=lambda s: s.job.timekeeper.total(), reverse=True
+            list(xtor.running.values()), key=lambda s: s.job.timekeeper.total(), reverse=True
         )
         for slot in running:
             if rows_used >= max_rows:
@@ -353,7 +364,7 @@ class LiveReporter(Reporter):
         # ---------------------------------------------------------
         # 3) SUBMITTED
         # ---------------------------------------------------------
-        submitted = sorted(xtor.submitted.values(), key=lambda s: s.qrank)
+        submitted = sorted(list(xtor.submitted.values()), key=lambda s: s.qrank)
 
         for slot in submitted:
             if rows_used >= max_rows:
@@ -367,7 +378,7 @@ class LiveReporter(Reporter):
         # 4) PENDING
         # ---------------------------------------------------------
         if rows_used < max_rows:
-            for job in xtor.queue.pending():
+            for job in xtor.queue.pending(limit=max_rows - rows_used):
                 if rows_used >= max_rows:
                     break
 
@@ -390,6 +401,19 @@ class EventReporter(Reporter):
 
         self.table = StaticTable()
 
+        # Events are rendered on a separate thread so that formatting and writing rows does not
+        # slow down the scheduler
+        self._events: queue.SimpleQueue[tuple[str, "ExecutionSlot"]] = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self.refresh_interval = 0.1
+        self.handlers: dict[str, Callable[["ExecutionSlot"], None]] = {
+            "job_submitted": self.on_job_submit,
+            "job_staged": self.on_job_stage,
+            "job_started": self.on_job_start,
+            "job_stopped": self.on_job_stop,
+            "job_finished": self.on_job_finish,
+        }
+
         maxnamelen = max(
             (len(s.job.display_name(resolve=self.namefmt == "long")) for s in executor.queue._heap),
             default=len("Job"),
@@ -412,26 +436,37 @@ class EventReporter(Reporter):
     def __enter__(self):
         self.executor.add_listener(self.on_event)
         self.table.print_header()
+        self._thread = threading.Thread(target=self._render, daemon=True)
+        self._thread.start()
         return self
 
     def __exit__(self, exc_type, exc, tb):
-        rprint(self.final_table())
         self.executor.remove_listener(self.on_event)
+        self._stop.set()
+        self._thread.join()
+        self.drain()
+        rprint(self.final_table())
 
     def on_event(self, event: str, *args, **kwargs) -> None:
-        match event:
-            case "job_submitted":
-                self.on_job_submit(args[0])
-            case "job_staged":
-                self.on_job_stage(args[0])
-            case "job_started":
-                self.on_job_start(args[0])
-            case "job_stopped":
-                self.on_job_stop(args[0])
-            case "job_finished":
-                self.on_job_finish(args[0])
-            case _:
+        """Queue the event for the render thread.  Called from the scheduler thread"""
+        if event in self.handlers:
+            self._events.put((event, args[0]))
+
+    def _render(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            self.drain()
+
+    def drain(self) -> None:
+        """Render all queued events"""
+        while True:
+            try:
+                event, slot = self._events.get_nowait()
+            except queue.Empty:
                 return
+            try:
+                self.handlers[event](slot)
+            except Exception:
+                logger.exception(f"Failed to report {event} for job {slot.job.id[:7]}")
 
     def render_event_row(self, slot: "ExecutionSlot", *, status: str, details: str = "") -> Text:
         values = self.row_values_for_slot(slot, self.event_columns, status=status, details=details)
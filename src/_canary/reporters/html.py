@@ -5,6 +5,7 @@
 import argparse
 import dataclasses
 import functools
+import hashlib
 import html
 import http.server
 import os
@@ -12,12 +13,14 @@ from argparse import Namespace
 from importlib import resources
 from pathlib import Path
 from typing import TYPE_CHECKING
+from typing import Iterable
 from typing import TextIO
 
 from .. import config
 from ..hookspec import hookimpl
 from ..util import json_helper as json
 from ..util import logging
+from ..util import multiprocessing as mp
 from ..util.filesystem import mkdirp
 from .reporter import CanaryReporter
 from .reporter import enabled
@@ -33,6 +36,9 @@ logger = logging.get_logger(__name__)
 MANIFEST = "manifest.json"
 REPORTER_PACKAGE = "_canary.reporters"
 
+# Bump when the layout of job pages changes so that existing reports are fully regenerated
+PAGE_FORMAT = 1
+
 TEXT_EXTENSIONS = {
     ".bash",
     ".c",
@@ -67,7 +73,7 @@ TEXT_EXTENSIONS = {
 @dataclasses.dataclass
 class HTMLReportRequest:
     workspace: "Workspace"
-    jobs: list["Job"]
+    jobs: Iterable["Job"]
     output_dir: Path
 
 
@@ -84,6 +90,7 @@ class HTMLReportRecord:
     session: str | None
     workspace: str
     page: str
+    fingerprint: str = ""
 
     @classmethod
     def from_job(cls, job: "Job", reporter: "HTMLReporter") -> "HTMLReportRecord":
@@ -99,6 +106,7 @@ class HTMLReportRecord:
             session=job.workspace.session,
             workspace=str(job.workspace.dir),
             page=f"jobs/{job.id}.html",
+            fingerprint=job_fingerprint(job),
         )
 
 
@@ -165,7 +173,7 @@ class HTMLReportCommand(CanaryReporter):
         from ..workspace import Workspace
 
         workspace = Workspace.load()
-        jobs = workspace.load_jobs()
+        jobs = workspace.iter_jobs()
         output_dir = Path(args.output_dir or "HTML").absolute()
         request = HTMLReportRequest(workspace=workspace, jobs=jobs, output_dir=output_dir)
         HTMLReporter().write(request)
@@ -201,38 +209,93 @@ class HTMLReporter:
 
     group_order = ("Not Run", "Timeout", "Fail", "Diff", "Pass", "Invalid", "Cancelled")
 
+    # Stale jobs are rendered this many at a time so that ``request.jobs`` can be a stream
+    render_batch_size = 1000
+
     def write(self, request: HTMLReportRequest) -> Path:
-        """Update an HTML report in place and return its entry point."""
+        """Update an HTML report in place and return its entry point.
+
+        Only pages of jobs whose fingerprint differs from the one stored in the report manifest
+        are rendered.  Index pages are built from the manifest.
+
+        """
         final_dir = request.output_dir
         jobs_dir = final_dir / "jobs"
         mkdirp(jobs_dir)
 
         records = load_manifest(final_dir)
 
+        stale: list["Job"] = []
+        groups: set[str] = set()
+        rendered = total = 0
         for job in request.jobs:
+            total += 1
             record = HTMLReportRecord.from_job(job, self)
+            previous = records.get(job.id)
+            if previous is not None:
+                if previous.fingerprint == record.fingerprint:
+                    if (final_dir / previous.page).exists():
+                        continue
+                groups.add(previous.group)
+            groups.add(record.group)
             records[job.id] = record
+            stale.append(job)
+            if len(stale) >= self.render_batch_size:
+                rendered += self.render_job_pages(stale, final_dir)
 
-            page = final_dir / record.page
-            mkdirp(page.parent)
-            tmp = page.with_name(f".{page.name}.tmp-{os.getpid()}")
-            try:
-                with open(tmp, "w") as fh:
-                    self.generate_case_file(job, fh)
-                os.replace(tmp, page)
-            except Exception:
-                tmp.unlink(missing_ok=True)
-                raise
-
-            self.generate_file_browser(job, final_dir)
+        rendered += self.render_job_pages(stale, final_dir)
+        if rendered:
+            logger.debug(f"Rendered {rendered} of {total} HTML job pages")
 
         copy_static_assets(final_dir)
-        save_manifest(final_dir, records)
-        self.write_index_files(records, html_dir=final_dir)
+        if rendered or not (final_dir / "index.html").exists():
+            save_manifest(final_dir, records)
+            self.write_index_files(records, html_dir=final_dir, groups=groups)
 
         return final_dir / "index.html"
 
-    def write_index_files(self, records: dict[str, HTMLReportRecord], *, html_dir: Path) -> None:
+    def render_job_pages(self, jobs: list["Job"], html_dir: Path) -> int:
+        """Render the pages of ``jobs`` and empty the list.  Returns the number rendered"""
+        if not jobs:
+            return 0
+        mp.starmap(
+            write_job_pages,
+            [(job, html_dir) for job in jobs],
+            initializer=config.load_snapshot,
+            initargs=(config.snapshot(),),
+        )
+        n = len(jobs)
+        jobs.clear()
+        return n
+
+    def write_job_pages(self, job: "Job", html_dir: Path) -> None:
+        """Write the page and file browser for ``job``"""
+        page = html_dir / "jobs" / f"{job.id}.html"
+        mkdirp(page.parent)
+        tmp = page.with_name(f".{page.name}.tmp-{os.getpid()}")
+        try:
+            with open(tmp, "w") as fh:
+                self.generate_case_file(job, fh)
+            os.replace(tmp, page)
+        except Exception:
+            tmp.unlink(missing_ok=True)
+            raise
+
+        self.generate_file_browser(job, html_dir)
+
+    def write_index_files(
+        self,
+        records: dict[str, HTMLReportRecord],
+        *,
+        html_dir: Path,
+        groups: set[str] | None = None,
+    ) -> None:
+        """Write the summary pages from ``records``.
+
+        If ``groups`` is given, only group pages for those groups (and missing group pages) are
+        rewritten.
+
+        """
         all_records = list(records.values())
 
         totals: dict[str, list[HTMLReportRecord]] = {}
@@ -242,10 +305,10 @@ class HTMLReporter:
         for group in self.group_order:
             file = self.group_file(html_dir, group)
             group_records = totals.get(group, [])
-            if group_records:
-                self.write_group_index_records(group_records, file=file, html_dir=html_dir)
-            else:
+            if not group_records:
                 file.unlink(missing_ok=True)
+            elif groups is None or group in groups or not file.exists():
+                self.write_group_index_records(group_records, file=file, html_dir=html_dir)
 
         total_file = html_dir / "Total.html"
         self.write_all_tests_index_records(totals, file=total_file, html_dir=html_dir)
@@ -829,6 +892,44 @@ document.addEventListener("DOMContentLoaded", () => {
         return html.escape(os.path.relpath(to_file, from_file.parent), quote=True)
 
 
+def write_job_pages(job: "Job", html_dir: Path) -> None:
+    """Process pool entry point for rendering the pages of a single job"""
+    HTMLReporter().write_job_pages(job, html_dir)
+
+
+def job_fingerprint(job: "Job") -> str:
+    """Digest of the inputs to a job's report pages
+
+    The fingerprint covers the job's status, timekeeper, measurements, and location, as well as
+    the size and modification time of its output files.  Job pages are regenerated only when the
+    fingerprint changes.
+
+    """
+    outputs: list[tuple[str, int, int]] = []
+    for name in (job.stdout, job.stderr):
+        if not name:
+            continue
+        try:
+            st = job.workspace.joinpath(name).stat()
+        except OSError:
+            outputs.append((name, -1, -1))
+        else:
+            outputs.append((name, st.st_size, st.st_mtime_ns))
+    state = [
+        PAGE_FORMAT,
+        job.display_name(),
+        job.status.category.value,
+        job.status.outcome.name,
+        job.status.code,
+        job.status.reason or "",
+        str(job.workspace.dir),
+        job.timekeeper,
+        job.measurements,
+        outputs,
+    ]
+    return hashlib.sha256(json.dumps_min(state).encode()).hexdigest()
+
+
 def load_template_text(name: str) -> str:
     return resources.files(REPORTER_PACKAGE).joinpath(f"templates/html/{name}").read_text()
 
@@ -922,7 +1023,11 @@ def copy_static_assets(output_dir: Path) -> None:
     for name in ("canary.svg",):
         src = resources.files(REPORTER_PACKAGE).joinpath(f"templates/html/{name}")
         if src.is_file():
-            (assets_dir / name).write_bytes(src.read_bytes())
+            data = src.read_bytes()
+            dst = assets_dir / name
+            if dst.exists() and dst.read_bytes() == data:
+                continue
+            dst.write_bytes(data)
 
 
 def is_plain_text_file(path: Path, *, max_probe_bytes: int = 8192) -> bool:
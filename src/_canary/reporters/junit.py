@@ -13,6 +13,7 @@ from datetime import datetime
 from pathlib import Path
 from types import SimpleNamespace
 from typing import TYPE_CHECKING
+from typing import Iterable
 
 from .. import config
 from ..hookspec import hookimpl
@@ -40,7 +41,7 @@ class JunitReportRequest:
     """
 
     workspace: "Workspace"
-    jobs: list["Job"]
+    jobs: Iterable["Job"]
     output: Path
 
 
@@ -99,7 +100,7 @@ class JunitReportCommand(CanaryReporter):
         from ..workspace import Workspace
 
         workspace = Workspace.load()
-        jobs = workspace.load_jobs()
+        jobs = workspace.iter_jobs()
         output = Path(args.output).absolute()
         request = JunitReportRequest(workspace=workspace, jobs=jobs, output=output)
         JunitReporter().write(request)
@@ -115,11 +116,10 @@ class JunitReporter:
     def write(self, request: JunitReportRequest) -> Path:
         """Write a JUnit XML report and return the output path."""
         doc = JunitDocument()
-        root = doc.create_testsuite_element(
-            request.jobs, name=get_root_name(), tagname="testsuites"
-        )
+        jobs = list(request.jobs)
+        root = doc.create_testsuite_element(jobs, name=get_root_name(), tagname="testsuites")
 
-        groups = groupby_classname(request.jobs)
+        groups = groupby_classname(jobs)
         for classname, jobs in groups.items():
             suite = doc.create_testsuite_element(jobs, name=classname)
             for job in jobs:
@@ -8,6 +8,7 @@ import os
 from argparse import Namespace
 from pathlib import Path
 from typing import TYPE_CHECKING
+from typing import Iterable
 from typing import TextIO
 
 from .. import config
@@ -32,7 +33,7 @@ MANIFEST = "manifest.json"
 @dataclasses.dataclass
 class MarkdownReportRequest:
     workspace: "Workspace"
-    jobs: list["Job"]
+    jobs: Iterable["Job"]
     output_dir: Path
 
 
@@ -113,7 +114,7 @@ class MarkdownReportCommand(CanaryReporter):
         from ..workspace import Workspace
 
         workspace = Workspace.load()
-        jobs = workspace.load_jobs()
+        jobs = workspace.iter_jobs()
         output_dir = Path(args.output_dir).absolute()
         request = MarkdownReportRequest(workspace=workspace, jobs=jobs, output_dir=output_dir)
         MarkdownReporter().write(request)
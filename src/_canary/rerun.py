@@ -6,6 +6,7 @@ from typing import Callable
 from typing import Iterable
 from typing import Literal
 
+from .changes import ChangeDetector
 from .database import WorkspaceDatabase
 from .jobspec import Mask
 
@@ -62,15 +63,11 @@ def rerun_strategy(fn: Callable[..., set[str]]) -> Callable[..., set[str]]:
 @rerun_strategy
 def changed(db: WorkspaceDatabase, *, tag: str | None = None) -> set[str]:
     """
-    Specs whose file mtime is newer than their latest result.
+    Specs whose test file or assets changed since their latest result.
     """
     pspecs = db.get_partial_specs(tag=tag)
-    ids: set[str] = set()
-    for pspec in pspecs:
-        mtime = pspec.file.stat().st_mtime
-        if pspec.started_at > 0 and mtime > pspec.started_at:
-            ids.add(pspec.id)
-    return ids
+    detector = ChangeDetector(db)
+    return detector.changed((pspec.id, pspec.file, pspec.started_at) for pspec in pspecs)
 
 
 @rerun_strategy
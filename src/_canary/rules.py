@@ -362,10 +362,14 @@ class ResourceCapacityRule(RuntimeRule):
 class RerunRule(RuntimeRule):
     STRATEGIES = ("all", "failed", "not_pass", "not_run", "changed", "ids:...")
 
-    def __init__(self, strategy: str = "not_pass", priority: int = 0) -> None:
+    def __init__(
+        self, strategy: str = "not_pass", priority: int = 0, changed: set[str] | None = None
+    ) -> None:
         super().__init__(priority=priority)
         self.strategy: str
         self._ids: list[str] = []
+        # IDs of changed specs, if determined ahead of time (see changes.ChangeDetector)
+        self._changed = changed
         if strategy.startswith("ids:"):
             self.strategy = "ids"
             self._ids.extend(set(strategy[4:].split(",")))
@@ -392,6 +396,10 @@ class RerunRule(RuntimeRule):
             return RuleOutcome(False, reason="test ID not in [bold]%s[/]" % ", ".join(ids))
         elif self.strategy == "all":
             return RuleOutcome(ok=True)
+        elif self.strategy == "changed" and self._changed is not None:
+            if job.id in self._changed or job.timekeeper._started < 0:
+                return RuleOutcome(ok=True)
+            return RuleOutcome(ok=False, reason="job spec has not changed since last run")
         elif self.strategy == "changed":
             t = job.timekeeper._started
             if t < 0 or job.spec.file.stat().st_mtime > t:
@@ -16,7 +16,9 @@ session timing and return-code aggregation.  The public
 The default ``canary_runtests`` hook implementation, :func:`default_runtests`,
 executes jobs through :class:`~_canary.queue_executor.ResourceQueueExecutor`.
 Jobs are placed into a :class:`~_canary.queue.ResourceQueue` backed by the
-resource pool owned by ``config.resource_manager``.  Completed jobs are reported
+resource pool owned by ``config.resource_manager``.  Jobs to be repeated (see the
+``--repeat-*`` options) are put back into the queue as new attempts by the queue's
+:class:`~_canary.queue.RetryPolicy`.  Completed jobs are reported
 back to the workspace via the executor listener mechanism so result persistence
 and live view updates remain centralized in the parent process.
 
@@ -52,6 +54,7 @@ import rich
 from . import config
 from .hookspec import hookimpl
 from .queue import ResourceQueue
+from .queue import RetryPolicy
 from .util import glyphs
 from .util import logging
 from .util.multiprocessing import SimpleQueue
@@ -134,7 +137,8 @@ def default_runtests(runner: Runner) -> bool:
 
     try:
         rpool = config.resource_manager.get_pool()
-        queue = ResourceQueue(lock=global_lock, resource_pool=rpool)
+        retry = RetryPolicy.from_config()
+        queue = ResourceQueue(lock=global_lock, resource_pool=rpool, retry=retry)
         queue.put(*runner.jobs)  # type: ignore
         queue.prepare()
     except Exception:
@@ -165,32 +169,35 @@ class JobExecutor:
         now = time.time()
         queue.put({"event": "job_submitted", "timestamp": now})
 
-        now = time.time()
-        queue.put({"event": "job_staged", "timestamp": now})
-        try:
-            config.pluginmanager.hook.canary_runteststart(case=job)
-        except Exception as e:
-            mark_broken("setup", e)
-            return
-
-        now = time.time()
-        queue.put({"event": "job_started", "timestamp": now})
-        try:
-            config.pluginmanager.hook.canary_runtest(case=job)
-            job.timekeeper.maybe_stop()
-        except Exception as e:
-            mark_broken("run", e)
-            return
-
-        now = time.time()
-        queue.put({"event": "job_stopped", "timestamp": now})
-        try:
-            config.pluginmanager.hook.canary_runtest_finish(case=job)
-            job.timekeeper.close(at=now)
-            job.save()
-        except Exception as e:
-            logger.debug(f"Failed to teardown {job}", exc_info=e)
-            return
+        # Hooks save the job at each step.  Batch those saves so that the lock file is only
+        # written when the job starts running (see Job.run) and once more when it finishes.
+        with job.batched_saves():
+            now = time.time()
+            queue.put({"event": "job_staged", "timestamp": now})
+            try:
+                config.pluginmanager.hook.canary_runteststart(case=job)
+            except Exception as e:
+                mark_broken("setup", e)
+                return
+
+            now = time.time()
+            queue.put({"event": "job_started", "timestamp": now})
+            try:
+                config.pluginmanager.hook.canary_runtest(case=job)
+                job.timekeeper.maybe_stop()
+            except Exception as e:
+                mark_broken("run", e)
+                return
+
+            now = time.time()
+            queue.put({"event": "job_stopped", "timestamp": now})
+            try:
+                config.pluginmanager.hook.canary_runtest_finish(case=job)
+                job.timekeeper.close(at=now)
+                job.save()
+            except Exception as e:
+                logger.debug(f"Failed to teardown {job}", exc_info=e)
+                return
 
         queue.put({"event": "job_finished", "timestamp": now})
 
@@ -302,6 +302,7 @@ class RuntimeSelector:
                 job.status.reset()
                 job.timekeeper.reset()
                 job.measurements.reset()
+                job.reset_dependency_summary()
         pm.done()
         config.pluginmanager.hook.canary_rtselect_report(selector=self)
         return
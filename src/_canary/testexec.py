@@ -13,6 +13,8 @@ from typing import Any
 from typing import Generator
 
 from .util import logging
+from .util.filesystem import clonefile
+from .util.filesystem import copytree
 from .util.filesystem import force_remove
 
 if TYPE_CHECKING:
@@ -80,13 +82,13 @@ class ExecutionSpace:
         (self.dir / name).unlink(missing_ok=missing_ok)
 
     def copy(self, src: Path, dst: Path | str | None = None) -> None:
-        """Copy the file at ``src`` to this workspace with name ``dst``"""
+        """Copy (or reflink) the file at ``src`` to this workspace with name ``dst``"""
         if src.is_dir():
             return self.copytree(src, dst)
         dest: Path = Path(dst or src.name)
         target: Path = self.dir / dest.name
         target.unlink(missing_ok=True)
-        shutil.copy(src, target)
+        clonefile(src, target)
 
     def copytree(self, src: Path, dst: Path | str | None = None) -> None:
         """Copy the directory at ``src`` to this workspace with name ``dst``."""
@@ -97,7 +99,7 @@ class ExecutionSpace:
         else:
             target.unlink(missing_ok=True)
         target.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copytree(src, target)
+        copytree(src, target)
 
     def link(self, src: Path, dst: Path | str | None = None) -> None:
         """Symlink the file at ``src`` to this workspace with name ``dst``"""
@@ -5,13 +5,14 @@
 import dataclasses
 import io
 import os
+from collections.abc import Sequence
 from pathlib import Path
 from typing import TYPE_CHECKING
 from typing import Any
 from typing import Type
+from typing import overload
 
-from .job import JobState
-from .jobspec import BaselineAction
+from .jobstate import JobState
 from .status import Status
 from .util import json_helper as json
 from .util.paramview import MultiParameters
@@ -19,8 +20,17 @@ from .util.paramview import Parameters
 
 if TYPE_CHECKING:
     from .job import Job
+    from .jobspec import BaselineAction
     from .jobspec import JobSpec
 
+# Written to the job's working directory for the test process.  Unlike testcase.lock, the
+# instance file is flat: dependencies are stored as references to their own instance files and
+# are only loaded when accessed.
+instance_file_name = "testinstance.json"
+
+# Attributes set by the test process are written here and merged by the parent after the run
+attributes_file_name = "testinstance-attributes.json"
+
 
 @dataclasses.dataclass(frozen=True)
 class TestInstance:
@@ -35,7 +45,7 @@ class TestInstance:
     parameters: Parameters
     timeout: float | int | None
     runtime: float | int | None
-    baseline: list[BaselineAction]
+    baseline: list["BaselineAction"]
     sources: dict[str, list[tuple[str, str | None]]]
     work_tree: str
     working_directory: str
@@ -46,7 +56,7 @@ class TestInstance:
     id: str
     returncode: int
     variables: dict[str, str]
-    dependencies: list["TestInstance"]
+    dependencies: "Sequence[TestInstance]"
     ofile: str
     efile: str | None
     lockfile: str
@@ -90,13 +100,13 @@ class TestInstance:
         return len(self.gpu_ids)
 
     def set_attribute(self, **kwargs: Any) -> None:
-        job: Job
-        with open(self.lockfile) as fh:
-            job = json.load(fh)
+        """Set attributes on the test's job.  The attributes are written to a side file that the
+        parent process merges into the job once the test finishes"""
         self.attributes.update(kwargs)
-        job.spec.attributes.update(self.attributes)
-        with open(self.lockfile, "w") as fh:
-            json.dump(job, fh, indent=2)
+        file = Path(self.working_directory) / attributes_file_name
+        attrs: dict[str, Any] = load_attributes(file)
+        attrs.update(kwargs)
+        json.safesave(file, attrs, indent=None)
 
     def get_dependency(self, **params: Any) -> "TestInstance | None":
         for dep in self.dependencies:
@@ -117,6 +127,43 @@ class TestMultiInstance(TestInstance):
         return True
 
 
+class DependencyInstances(Sequence[TestInstance]):
+    """Dependencies of a test instance, loaded from their instance files on first access"""
+
+    def __init__(self, refs: list[dict[str, str]]) -> None:
+        self.refs = refs
+        self.loaded: dict[int, TestInstance] = {}
+
+    def __len__(self) -> int:
+        return len(self.refs)
+
+    @overload
+    def __getitem__(self, index: int) -> TestInstance: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[TestInstance]: ...
+
+    def __getitem__(self, index: int | slice) -> TestInstance | list[TestInstance]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index not in self.loaded:
+            self.loaded[index] = load_instance(self.refs[index]["dir"])
+        return self.loaded[index]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, DependencyInstances):
+            return self.refs == other.refs
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        ids = ", ".join(ref["id"][:7] for ref in self.refs)
+        return f"{self.__class__.__name__}([{ids}])"
+
+
 def get_parameters(spec: "JobSpec") -> dict[str, Any]:
     params: dict[str, Any] = dict(spec.parameters)
     for key in ("cpus", "gpus", "nodes"):
@@ -125,75 +172,117 @@ def get_parameters(spec: "JobSpec") -> dict[str, Any]:
     return params
 
 
-def from_job(job: "Job") -> TestInstance:
-    dependencies: list[TestInstance] = []
-    for dep in job.dependencies:
-        dependencies.append(from_job(dep.job))
-
-    parameters: Parameters
-    cls: Type[TestInstance]
-    if job.spec.attributes.get("multicase"):
-        cls = TestMultiInstance
-        columns: dict[str, list[Any]] = {}
+def instance_record(job: "Job") -> dict[str, Any]:
+    """Flat record of the test instance of ``job``, with dependencies stored by reference"""
+    multicase = bool(job.spec.attributes.get("multicase"))
+    parameters: dict[str, Any]
+    if multicase:
+        parameters = {}
         p = get_parameters(job.dependencies[0].job.spec)
-        keys = set(p)
-        for key in keys:
-            col = columns.setdefault(key, [])
+        for key in set(p):
+            col = parameters.setdefault(key, [])
             for dep in job.dependencies:
                 sp = dep.job.spec
                 val = sp.parameters[key] if key in sp.parameters else sp.meta_parameters[key]
                 col.append(val)
-        parameters = MultiParameters(**columns)
     else:
-        cls = TestInstance
-        parameters = Parameters(**get_parameters(job.spec))
+        parameters = get_parameters(job.spec)
 
     sources: dict[str, list[tuple[str, str | None]]] = {}
     for asset in job.spec.assets:
         sources.setdefault(asset.action, []).append((str(asset.src), asset.dst))
-    start = job.timekeeper._started
-    stop = job.timekeeper._stopped
-    instance = cls(
-        file_root=str(job.spec.file_root),
-        file_path=str(job.spec.file_path),
-        name=job.spec.name,
-        file=os.path.join(str(job.spec.file_root), str(job.spec.file_path)),
-        cpu_ids=job.cpu_ids,
-        gpu_ids=job.gpu_ids,
-        family=job.spec.family,
-        attributes=job.spec.attributes,
-        keywords=job.spec.keywords,
+    return {
+        "multicase": multicase,
+        "file_root": str(job.spec.file_root),
+        "file_path": str(job.spec.file_path),
+        "name": job.spec.name,
+        "file": os.path.join(str(job.spec.file_root), str(job.spec.file_path)),
+        "cpu_ids": job.cpu_ids,
+        "gpu_ids": job.gpu_ids,
+        "family": job.spec.family,
+        "attributes": job.spec.attributes,
+        "keywords": job.spec.keywords,
+        "parameters": parameters,
+        "timeout": job.spec.timeout,
+        "runtime": job.runtime,
+        "baseline": job.spec.baseline,
+        "sources": sources,
+        "work_tree": str(job.workspace.dir),
+        "working_directory": str(job.workspace.dir),
+        "phase": job.state.phase.value,
+        "status": job.status,
+        "start": job.timekeeper._started,
+        "stop": job.timekeeper._stopped,
+        "id": job.spec.id,
+        "returncode": job.status.code,
+        "variables": {key: var for key, var in job.variables.items() if var is not None},
+        "dependencies": [
+            {"id": dep.job.id, "dir": str(dep.job.workspace.dir)} for dep in job.dependencies
+        ],
+        "ofile": job.stdout,
+        "efile": job.stderr,
+        "lockfile": str(job.lockfile),
+    }
+
+
+def from_record(
+    data: dict[str, Any], dependencies: Sequence[TestInstance] | None = None
+) -> TestInstance:
+    cls: Type[TestInstance]
+    parameters: Parameters
+    if data.pop("multicase"):
+        cls = TestMultiInstance
+        parameters = MultiParameters(**data.pop("parameters"))
+    else:
+        cls = TestInstance
+        parameters = Parameters(**data.pop("parameters"))
+    refs = data.pop("dependencies")
+    data["sources"] = {key: [tuple(_) for _ in val] for key, val in data["sources"].items()}
+    return cls(
         parameters=parameters,
-        timeout=job.spec.timeout,
-        runtime=job.runtime,
-        baseline=job.spec.baseline,
-        sources=sources,
-        work_tree=str(job.workspace.dir),  # type: ignore
-        working_directory=str(job.workspace.dir),
-        state=job.state,
-        status=job.status,
-        start=start,
-        stop=stop,
-        id=job.spec.id,
-        returncode=job.status.code,
-        variables={key: var for key, var in job.variables.items() if var is not None},
-        dependencies=dependencies,
-        ofile=job.stdout,
-        efile=job.stderr,
-        lockfile=str(job.workspace.dir / "testcase.lock"),
+        state=JobState(phase=data.pop("phase")),
+        dependencies=DependencyInstances(refs) if dependencies is None else dependencies,
+        **data,
     )
-    return instance
 
 
-def load_instance(
-    arg: Path | str | None, lookup: dict[str, TestInstance] | None = None
-) -> TestInstance:
-    lookup = lookup or {}
+def from_job(job: "Job") -> TestInstance:
+    dependencies = [from_job(dep.job) for dep in job.dependencies]
+    return from_record(instance_record(job), dependencies=dependencies)
+
+
+def dump_instance(job: "Job") -> None:
+    """Write the instance file of ``job`` to its working directory"""
+    json.safesave(job.workspace.joinpath(instance_file_name), instance_record(job), indent=None)
+
+
+def load_attributes(file: Path | str) -> dict[str, Any]:
+    try:
+        with open(file) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def load_instance(arg: Path | str | None) -> TestInstance:
     path = Path(arg or ".").absolute()
-    file = path / "testcase.lock" if path.is_dir() else path
+    if path.is_dir():
+        file = path / instance_file_name
+        if file.exists():
+            with open(file) as fh:
+                return from_record(json.load(fh))
+        file = path / "testcase.lock"
+    else:
+        file = path
     if not file.exists():
         raise LockFileNotFoundError(file.as_posix())
-    job = json.loads(file.read_text())
+    if file.name == instance_file_name:
+        with open(file) as fh:
+            return from_record(json.load(fh))
+    # Workspaces created before instance files were written
+    from .job import load_lockfile
+
+    job = load_lockfile(file)
     return from_job(job)
 
 
@@ -3,10 +3,9 @@
 # SPDX-License-Identifier: MIT
 
 
-import psutil
-
-
 def cpu_count(logical: bool | None = None) -> int:
+    import psutil
+
     from .. import config  # lazy import to avoid circular deps
 
     if logical is None:
@@ -3,11 +3,18 @@
 # SPDX-License-Identifier: MIT
 
 import base64
+import gzip
 import io
 import os
 import tarfile
 import zlib
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO
 from typing import Any
+from typing import Callable
+from typing import Literal
 
 from . import json_helper as json
 
@@ -62,3 +69,151 @@ def compress_file(file: str, kb_to_keep: int | None = None) -> str:
     else:
         txt = io.open(file, errors="ignore").read()
     return compress_str(txt, kb_to_keep=kb_to_keep)
+
+
+Codec = Literal["none", "gzip", "zstd"]
+
+
+def codec_for(path: str | os.PathLike[str]) -> Codec:
+    """Infer the compression codec from the suffix of ``path``"""
+    name = os.fspath(path)
+    if name.endswith((".tgz", ".tar.gz", ".gz")):
+        return "gzip"
+    if name.endswith((".tzst", ".tar.zst", ".zst")):
+        return "zstd"
+    return "none"
+
+
+def zstd_compressor(level: int | None = None) -> Callable[[bytes], bytes]:
+    """Return a function compressing bytes to a single zstd frame.  The standard library's zstd
+    module (Python 3.14+) is preferred, falling back to the ``zstandard`` package"""
+    try:
+        from compression import zstd  # type: ignore[import-not-found]
+
+        return lambda data: zstd.compress(data, level=level)
+    except ImportError:
+        pass
+    try:
+        import zstandard  # type: ignore[import-not-found]
+    except ImportError:
+        raise ValueError("zstd compression requires Python 3.14+ or the zstandard package")
+    local = zstandard.ZstdCompressor(level=3 if level is None else level)
+    return lambda data: local.compress(data)
+
+
+def zstd_decompressor(fileobj: IO[bytes]) -> IO[bytes]:
+    """Return a stream reading the (possibly concatenated) zstd frames of ``fileobj``"""
+    try:
+        from compression import zstd  # type: ignore[import-not-found]
+
+        return zstd.ZstdFile(fileobj, mode="rb")
+    except ImportError:
+        pass
+    try:
+        import zstandard  # type: ignore[import-not-found]
+    except ImportError:
+        raise ValueError("zstd decompression requires Python 3.14+ or the zstandard package")
+    return zstandard.ZstdDecompressor().stream_reader(fileobj, read_across_frames=True)
+
+
+class ChunkedCompressor(io.RawIOBase):
+    """Write-only binary stream compressing its input in independent chunks on a thread pool.
+
+    Each chunk becomes a complete gzip member or zstd frame and members are written to
+    ``fileobj`` in order.  Concatenated members are themselves a valid gzip (or zstd) stream, so
+    the output can be read by any decompressor, and decompression can begin at the start of any
+    member.  ``cut`` ends the current member early, marking a point at which a reader can begin.
+
+    ``tell`` reports the uncompressed position so that the stream can back a ``tarfile.TarFile``.
+
+    """
+
+    def __init__(
+        self,
+        fileobj: IO[bytes],
+        codec: Codec = "gzip",
+        level: int | None = None,
+        chunk_size: int = 1 << 20,
+        workers: int | None = None,
+    ) -> None:
+        super().__init__()
+        self.fileobj = fileobj
+        self.codec = codec
+        self.chunk_size = chunk_size
+        self.compress: Callable[[bytes], bytes]
+        if codec == "gzip":
+            lvl = 6 if level is None else level
+            self.compress = lambda data: gzip.compress(data, compresslevel=lvl, mtime=0)
+        elif codec == "zstd":
+            self.compress = zstd_compressor(level)
+        elif codec == "none":
+            self.compress = bytes
+        else:
+            raise ValueError(f"Unknown compression codec {codec!r}")
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.executor: ThreadPoolExecutor | None = None
+        self.pending: deque[Future[bytes]] = deque()
+        self.buffer = bytearray()
+        self.position = 0
+        self.written = 0
+        #: Compressed offset of each member, in order
+        self.offsets: list[int] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def write(self, data: Any) -> int:
+        if self.closed:
+            raise ValueError("write to closed file")
+        view = memoryview(data).cast("B")
+        self.buffer += view
+        self.position += len(view)
+        while len(self.buffer) >= self.chunk_size:
+            chunk = bytes(self.buffer[: self.chunk_size])
+            del self.buffer[: self.chunk_size]
+            self._submit(chunk)
+        return len(view)
+
+    def cut(self) -> int:
+        """End the current member and return the index of the member that the next byte written
+        will begin.  See ``member_offset``."""
+        if self.buffer:
+            self._submit(bytes(self.buffer))
+            self.buffer.clear()
+        return len(self.offsets) + len(self.pending)
+
+    def member_offset(self, index: int) -> int:
+        """Compressed offset of member ``index``, valid once the member has been written"""
+        return self.offsets[index] if index < len(self.offsets) else self.written
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            self.cut()
+            while self.pending:
+                self._write(self.pending.popleft().result())
+            self.fileobj.flush()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+            super().close()
+
+    def _submit(self, chunk: bytes) -> None:
+        if self.codec == "none":
+            self._write(chunk)
+            return
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        self.pending.append(self.executor.submit(self.compress, chunk))
+        # Bound the memory held by compressed chunks waiting on their predecessors
+        while len(self.pending) > 2 * self.workers or (self.pending and self.pending[0].done()):
+            self._write(self.pending.popleft().result())
+
+    def _write(self, data: bytes) -> None:
+        self.offsets.append(self.written)
+        self.fileobj.write(data)
+        self.written += len(data)
@@ -29,8 +29,25 @@ class Conditional(Generic[T]):
         on_options: list[str] | None = None,
         parameters: dict[str, Any] | None = None,
         keywords: list[str] | None = None,
+        memo: dict[tuple, bool] | None = None,
     ) -> bool:
+        """Does this conditional apply?  If given, ``memo`` holds the results of previous calls.
+        Calls with parameters differing only in parameters the condition does not reference share
+        a result."""
+        key: tuple | None = None
+        if memo is not None:
+            key = (
+                self.when,
+                family,
+                None if on_options is None else tuple(on_options),
+                None if keywords is None else tuple(keywords),
+                self.when.parameter_key(parameters),
+            )
+            if key in memo:
+                return memo[key]
         r = self.when.evaluate(
             testname=family, on_options=on_options, parameters=parameters, keywords=keywords
         )
+        if key is not None:
+            memo[key] = r.value  # type: ignore
         return r.value
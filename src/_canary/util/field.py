@@ -41,11 +41,17 @@ class Field(Generic[T, R]):
         on_options: list[str] | None = None,
         keywords: list[str] | None = None,
         parameters: dict[str, Any] | None = None,
+        memo: dict[tuple, bool] | None = None,
     ) -> R:
+        """Reduce the values whose conditions match.  See ``Conditional.matches`` for ``memo``"""
         active: list[T] = []
         for c in self.items:
             if c.matches(
-                family=family, on_options=on_options, keywords=keywords, parameters=parameters
+                family=family,
+                on_options=on_options,
+                keywords=keywords,
+                parameters=parameters,
+                memo=memo,
             ):
                 active.append(c.value)
         return self.reducer(active)
@@ -15,6 +15,10 @@ import stat
 import tempfile
 import threading
 import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 from contextlib import contextmanager
 from typing import Any
 from typing import Generator
@@ -53,6 +57,7 @@ __all__ = [
     "accessible",
     "samepath",
     "find_work_tree",
+    "find_dirs_containing",
     "clean_out_folder",
 ]
 
@@ -136,6 +141,76 @@ def copyfile(src: str, dst: str) -> None:
     shutil.copy(src, dst)
 
 
+# ioctl request to share the data blocks of one file with another (Linux)
+FICLONE = 0x40049409
+_reflink_unsupported: set[tuple[int, int]] = set()
+
+
+def clonefile(src: PathLike, dst: PathLike, *, follow_symlinks: bool = True) -> PathLike:
+    """Copy file ``src`` to ``dst`` along with its metadata, like ``shutil.copy2``.
+
+    Where the file system supports it, the copy is a reflink: ``dst`` shares the data blocks of
+    ``src`` until either is modified, so the copy costs no I/O however large the file.  Otherwise
+    the data is copied.
+
+    """
+    if follow_symlinks or not os.path.islink(src):
+        try:
+            devices = (os.stat(src).st_dev, os.stat(os.path.dirname(os.path.abspath(dst))).st_dev)
+        except OSError:
+            devices = None
+        if devices is not None and devices not in _reflink_unsupported and reflink(src, dst):
+            shutil.copystat(src, dst, follow_symlinks=follow_symlinks)
+            return dst
+        if devices is not None:
+            _reflink_unsupported.add(devices)
+    return shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+
+
+def reflink(src: PathLike, dst: PathLike) -> bool:
+    """Clone the contents of ``src`` into ``dst``.  Return False if the file system can't"""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            return False
+    return True
+
+
+def copytree(src: PathLike, dst: PathLike, workers: int = 8) -> None:
+    """Copy directory ``src`` to ``dst``, copying files concurrently with ``workers`` threads.
+
+    Like ``shutil.copytree``, symbolic links are followed and the metadata of files and
+    directories is copied.  Directory metadata is copied last, once every file is written, so
+    that read-only source directories can be copied.
+
+    """
+
+    def onerror(e: OSError) -> None:
+        raise e
+
+    src, dst = os.fspath(src), os.fspath(dst)
+    dirs: list[tuple[str, str]] = []
+    futures: list[Future] = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        for dirname, _, filenames in os.walk(src, onerror=onerror, followlinks=True):
+            target = os.path.normpath(os.path.join(dst, os.path.relpath(dirname, src)))
+            os.makedirs(target)
+            dirs.append((dirname, target))
+            for f in filenames:
+                futures.append(
+                    ex.submit(clonefile, os.path.join(dirname, f), os.path.join(target, f))
+                )
+        for future in futures:
+            future.result()
+    for dirname, target in reversed(dirs):
+        shutil.copystat(dirname, target)
+
+
 def movefile(src: str, dst: str) -> None:
     """Move file `src` to `dst`"""
     shutil.move(src, dst)
@@ -328,6 +403,79 @@ def filesize(filename: str, *, units: str | None = None) -> int:
         return size_in_bytes
 
 
+def disk_usage(path: PathLike) -> int:
+    """Return the total size in bytes of the files at or below ``path``.  Symbolic links are
+    counted but not followed."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return 0
+    if not stat.S_ISDIR(st.st_mode):
+        return st.st_size
+    total = 0
+    stack = [os.fspath(path)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total
+
+
+# File systems shared between hosts
+network_filesystems = {
+    "9p",
+    "afs",
+    "beegfs",
+    "ceph",
+    "cifs",
+    "fuse.glusterfs",
+    "fuse.sshfs",
+    "gpfs",
+    "lustre",
+    "nfs",
+    "nfs4",
+    "panfs",
+    "smb3",
+    "smbfs",
+}
+
+
+def filesystem_type(path: PathLike) -> str | None:
+    """Return the type of the file system containing ``path``, or None if it cannot be determined
+    (the mount table is only read on Linux)"""
+    try:
+        with open("/proc/self/mounts") as fh:
+            mounts = fh.read().splitlines()
+    except OSError:
+        return None
+    path = os.path.realpath(path)
+    mountpoint, fstype = "", None
+    for line in mounts:
+        parts = line.split()
+        if len(parts) < 3:
+            continue
+        # Spaces in mount points are escaped as \040
+        mnt = parts[1].replace("\\040", " ")
+        if path != mnt and not path.startswith(mnt.rstrip("/") + "/"):
+            continue
+        if len(mnt) >= len(mountpoint):
+            mountpoint, fstype = mnt, parts[2]
+    return fstype
+
+
+def is_network_filesystem(path: PathLike) -> bool:
+    return filesystem_type(path) in network_filesystems
+
+
 def git_revision(path: str) -> str:
     """Get the git revision at ``path``.  Equivalent to ``git -C path rev-parse HEAD``"""
     from .executable import Executable
@@ -506,6 +654,47 @@ def find_work_tree(start: str | None = None) -> str | None:
     return None
 
 
+def find_dirs_containing(root: PathLike, name: str, workers: int = 8) -> list[pathlib.Path]:
+    """Return directories at or below ``root`` containing a file named ``name``
+
+    Directories are listed concurrently by ``workers`` threads, which hides the per-directory
+    latency of network file systems.  Directories containing ``name`` are not descended into.
+    Symbolic links to directories are checked for ``name`` but not followed further.
+
+    """
+    found: list[pathlib.Path] = []
+
+    def scan(dirname: str) -> list[str]:
+        try:
+            with os.scandir(dirname) as it:
+                entries = list(it)
+        except OSError:
+            return []
+        if any(entry.name == name and entry.is_file() for entry in entries):
+            found.append(pathlib.Path(dirname))
+            return []
+        subdirs: list[str] = []
+        for entry in entries:
+            try:
+                if not entry.is_dir():
+                    continue
+                if not entry.is_symlink():
+                    subdirs.append(entry.path)
+                elif os.path.isfile(os.path.join(entry.path, name)):
+                    found.append(pathlib.Path(entry.path))
+            except OSError:
+                continue
+        return subdirs
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        pending: set[Future] = {ex.submit(scan, os.fspath(root))}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.update(ex.submit(scan, subdir) for subdir in future.result())
+    return sorted(found)
+
+
 def clean_out_folder(folder: str) -> None:
     if os.path.isdir(folder):
         with working_dir(folder):
@@ -3,8 +3,8 @@
 # SPDX-License-Identifier: MIT
 
 import dataclasses
-from graphlib import CycleError
-from graphlib import TopologicalSorter
+import heapq
+from collections import defaultdict
 from typing import Any
 from typing import Callable
 from typing import Generic
@@ -22,10 +22,25 @@ SortKey = Callable[[T], Any]
 
 @dataclasses.dataclass(frozen=True)
 class LevelGraph(Generic[T]):
+    """Items arranged in dependency levels: every item's dependencies are in earlier levels.
+
+    Graphs are immutable.  :meth:`project`, :meth:`add`, and :meth:`remove` derive new graphs
+    from the stored edges and levels of this one, touching only the affected nodes rather than
+    re-sorting the whole graph.
+
+    """
+
     items_by_id: dict[str, T]
     deps_by_id: dict[str, tuple[str, ...]]
     dependents_by_id: dict[str, tuple[str, ...]]
     level_ids: tuple[tuple[str, ...], ...]
+    level_by_id: dict[str, int] = dataclasses.field(default_factory=dict, compare=False, repr=False)
+    sort_key: SortKey[T] | None = dataclasses.field(default=None, compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.level_ids and not self.level_by_id:
+            level_by_id = {i: k for k, level in enumerate(self.level_ids) for i in level}
+            object.__setattr__(self, "level_by_id", level_by_id)
 
     @classmethod
     def empty(cls) -> "LevelGraph[T]":
@@ -53,31 +68,29 @@ class LevelGraph(Generic[T]):
 
         deps_by_id: dict[str, tuple[str, ...]] = {}
 
-        for item in items:
-            item_id = id_fn(item)
-            deps: list[str] = []
+        for item_id, item in items_by_id.items():
+            deps = tuple(deps_fn(item))
 
-            for dep_id in deps_fn(item):
-                if dep_id not in known_ids:
-                    if require_closed:
-                        raise ValueError(f"{item_id}: dependency {dep_id} is not present in graph")
-                    continue
-                deps.append(dep_id)
+            if not known_ids.issuperset(deps):
+                if require_closed:
+                    dep_id = next(d for d in deps if d not in known_ids)
+                    raise ValueError(f"{item_id}: dependency {dep_id} is not present in graph")
+                deps = tuple(d for d in deps if d in known_ids)
 
-            deps_by_id[item_id] = tuple(deps)
+            deps_by_id[item_id] = deps
 
         dependents_by_id = _build_dependents(deps_by_id)
-
-        try:
-            level_ids = _build_levels(deps_by_id, items_by_id=items_by_id, sort_key=sort_key)
-        except CycleError as e:
-            raise ValueError("Dependency cycle detected") from e
+        level_ids, level_by_id = _build_levels(
+            deps_by_id, dependents_by_id, items_by_id=items_by_id, sort_key=sort_key
+        )
 
         return cls(
             items_by_id=items_by_id,
             deps_by_id=deps_by_id,
             dependents_by_id=dependents_by_id,
             level_ids=level_ids,
+            level_by_id=level_by_id,
+            sort_key=sort_key,
         )
 
     @classmethod
@@ -148,6 +161,13 @@ class LevelGraph(Generic[T]):
         require_closed: bool = True,
         sort_key: SortKey[T] | None = None,
     ) -> "LevelGraph[T]":
+        """Return the subgraph of ``ids``, optionally closed over their upstreams/downstreams.
+
+        Levels are derived from this graph's levels in a single pass over the selected nodes, so
+        projecting costs O(selected nodes + edges) plus sorting within levels.  Items within a
+        level are ordered by ``sort_key``, defaulting to the order of this graph.
+
+        """
         selected = set(ids)
 
         if include_upstreams:
@@ -168,40 +188,207 @@ class LevelGraph(Generic[T]):
                         selected.add(user_id)
                         stack.append(user_id)
 
-        items = [self.items_by_id[item_id] for item_id in selected]
+        sort_key = sort_key or self.sort_key
+
+        # Visiting nodes in the order of this graph's levels visits dependencies first
+        by_level: dict[int, list[str]] = defaultdict(list)
+        for item_id in selected:
+            by_level[self.level_by_id[item_id]].append(item_id)
 
-        # Reuse stored deps instead of requiring original dep extraction.
-        return self._from_projected_items(items, require_closed=require_closed, sort_key=sort_key)
+        deps_by_id: dict[str, tuple[str, ...]] = {}
+        dependents_by_id: dict[str, tuple[str, ...]] = {}
+        level_by_id: dict[str, int] = {}
+        shifted = False
+        for k in sorted(by_level):
+            for item_id in by_level[k]:
+                deps = self.deps_by_id[item_id]
+                if not selected.issuperset(deps):
+                    if require_closed:
+                        dep_id = next(d for d in deps if d not in selected)
+                        raise ValueError(
+                            f"{item_id}: dependency {dep_id} is not present in projected graph"
+                        )
+                    deps = tuple(d for d in deps if d in selected)
+                users = self.dependents_by_id[item_id]
+                if not selected.issuperset(users):
+                    users = tuple(u for u in users if u in selected)
+                deps_by_id[item_id] = deps
+                dependents_by_id[item_id] = users
+                level = max(map(level_by_id.__getitem__, deps), default=-1) + 1
+                level_by_id[item_id] = level
+                shifted = shifted or level != k
+
+        items_by_id = {item_id: self.items_by_id[item_id] for item_id in deps_by_id}
+
+        levels: list[tuple[str, ...]] = []
+        if not shifted and sort_key is self.sort_key:
+            # Levels are unchanged, filter this graph's (already ordered) levels when cheaper than
+            # sorting the selection
+            for k in range(len(by_level)):
+                ordered = self.level_ids[k]
+                if len(ordered) <= 4 * len(by_level[k]):
+                    levels.append(tuple(item_id for item_id in ordered if item_id in selected))
+                else:
+                    levels.append(_sort_level(by_level[k], items_by_id, sort_key))
+        else:
+            groups: list[list[str]] = [[] for _ in range(max(level_by_id.values(), default=-1) + 1)]
+            for item_id, k in level_by_id.items():
+                groups[k].append(item_id)
+            levels.extend(_sort_level(group, items_by_id, sort_key) for group in groups)
 
-    def _from_projected_items(
-        self, items: Sequence[T], *, require_closed: bool, sort_key: SortKey[T] | None
+        return LevelGraph(
+            items_by_id=items_by_id,
+            deps_by_id=deps_by_id,
+            dependents_by_id=dependents_by_id,
+            level_ids=tuple(levels),
+            level_by_id=level_by_id,
+            sort_key=sort_key,
+        )
+
+    def add(
+        self, items: Sequence[T], *, id_fn: IdFn[T], deps_fn: DepsFn[T], require_closed: bool = True
     ) -> "LevelGraph[T]":
-        selected_ids = {item_id for item_id, item in self.items_by_id.items() if item in items}
+        """Return a graph with ``items`` added.
 
-        items_by_id = {item_id: self.items_by_id[item_id] for item_id in selected_ids}
+        Items may depend on nodes of this graph or on each other.  Existing nodes cannot gain
+        dependencies, so only the new nodes are leveled and merged into the existing levels.
 
-        deps_by_id: dict[str, tuple[str, ...]] = {}
+        """
+        new_items: dict[str, T] = {}
+        for item in items:
+            item_id = id_fn(item)
+            if item_id in self.items_by_id or item_id in new_items:
+                raise ValueError(f"Duplicate graph node ID: {item_id}")
+            new_items[item_id] = item
 
-        for item_id in selected_ids:
+        new_deps: dict[str, tuple[str, ...]] = {}
+        for item_id, item in new_items.items():
             deps: list[str] = []
-            for dep_id in self.deps_by_id[item_id]:
-                if dep_id not in selected_ids:
+            for dep_id in deps_fn(item):
+                if dep_id not in self.items_by_id and dep_id not in new_items:
                     if require_closed:
-                        raise ValueError(
-                            f"{item_id}: dependency {dep_id} is not present in projected graph"
-                        )
+                        raise ValueError(f"{item_id}: dependency {dep_id} is not present in graph")
                     continue
                 deps.append(dep_id)
-            deps_by_id[item_id] = tuple(deps)
+            new_deps[item_id] = tuple(deps)
 
-        dependents_by_id = _build_dependents(deps_by_id)
-        level_ids = _build_levels(deps_by_id, items_by_id=items_by_id, sort_key=sort_key)
+        deps_by_id = {**self.deps_by_id, **new_deps}
+        dependents: dict[str, list[str]] = {item_id: [] for item_id in new_items}
+        for item_id, dep_ids in new_deps.items():
+            for dep_id in dep_ids:
+                if dep_id not in dependents:
+                    dependents[dep_id] = list(self.dependents_by_id[dep_id])
+                dependents[dep_id].append(item_id)
+        dependents_by_id = dict(self.dependents_by_id)
+        dependents_by_id.update((item_id, tuple(users)) for item_id, users in dependents.items())
+
+        # Level the new nodes in topological order, starting from the levels of their existing
+        # dependencies
+        pending = {
+            item_id: sum(1 for dep_id in dep_ids if dep_id in new_items)
+            for item_id, dep_ids in new_deps.items()
+        }
+        level_by_id = dict(self.level_by_id)
+        ready = [item_id for item_id, count in pending.items() if count == 0]
+        added: dict[int, list[str]] = defaultdict(list)
+        while ready:
+            item_id = ready.pop()
+            level = max((level_by_id[dep_id] + 1 for dep_id in new_deps[item_id]), default=0)
+            level_by_id[item_id] = level
+            added[level].append(item_id)
+            for user_id in dependents[item_id]:
+                pending[user_id] -= 1
+                if pending[user_id] == 0:
+                    ready.append(user_id)
+        if sum(len(level) for level in added.values()) != len(new_items):
+            raise ValueError("Dependency cycle detected")
+
+        items_by_id = {**self.items_by_id, **new_items}
+        levels = list(self.level_ids)
+        levels.extend(() for _ in range(max(added, default=-1) + 1 - len(levels)))
+        for k, item_ids in added.items():
+            levels[k] = _merge_level(levels[k], item_ids, items_by_id, self.sort_key)
+
+        return LevelGraph(
+            items_by_id=items_by_id,
+            deps_by_id=deps_by_id,
+            dependents_by_id=dependents_by_id,
+            level_ids=tuple(levels),
+            level_by_id=level_by_id,
+            sort_key=self.sort_key,
+        )
+
+    def remove(self, ids: Iterable[str], *, require_closed: bool = True) -> "LevelGraph[T]":
+        """Return a graph with ``ids`` removed.
+
+        If ``require_closed`` is ``False``, dependents of removed nodes are kept, and only those
+        whose level drops as a result, and their dependents, are moved.
+
+        """
+        removed = set(ids)
+        for item_id in removed:
+            if item_id not in self.items_by_id:
+                raise ValueError(f"{item_id} is not present in graph")
+
+        orphaned: set[str] = set()
+        for item_id in removed:
+            for user_id in self.dependents_by_id[item_id]:
+                if user_id not in removed:
+                    if require_closed:
+                        raise ValueError(f"{user_id}: dependency {item_id} removed from graph")
+                    orphaned.add(user_id)
+
+        items_by_id = {k: v for k, v in self.items_by_id.items() if k not in removed}
+        deps_by_id = {k: v for k, v in self.deps_by_id.items() if k not in removed}
+        dependents_by_id = {k: v for k, v in self.dependents_by_id.items() if k not in removed}
+        level_by_id = {k: v for k, v in self.level_by_id.items() if k not in removed}
+        for item_id in orphaned:
+            deps_by_id[item_id] = tuple(d for d in deps_by_id[item_id] if d not in removed)
+        for item_id in removed:
+            for dep_id in self.deps_by_id[item_id]:
+                if dep_id not in removed:
+                    users = dependents_by_id[dep_id]
+                    dependents_by_id[dep_id] = tuple(u for u in users if u not in removed)
+
+        # Lower orphaned nodes, and then their dependents, in level order so that each node is
+        # visited after all of its dependencies have settled
+        heap = [(level_by_id[item_id], item_id) for item_id in orphaned]
+        heapq.heapify(heap)
+        queued = set(orphaned)
+        moved: dict[str, int] = {}
+        while heap:
+            _, item_id = heapq.heappop(heap)
+            level = max((level_by_id[dep_id] + 1 for dep_id in deps_by_id[item_id]), default=0)
+            if level == level_by_id[item_id]:
+                continue
+            moved[item_id] = level_by_id[item_id]
+            level_by_id[item_id] = level
+            for user_id in dependents_by_id[item_id]:
+                if user_id not in queued:
+                    queued.add(user_id)
+                    heapq.heappush(heap, (level_by_id[user_id], user_id))
+
+        touched = {self.level_by_id[item_id] for item_id in removed} | set(moved.values())
+        levels = list(self.level_ids)
+        for k in touched:
+            levels[k] = tuple(i for i in levels[k] if i not in removed and i not in moved)
+        added: dict[int, list[str]] = defaultdict(list)
+        for item_id in moved:
+            added[level_by_id[item_id]].append(item_id)
+        for k, item_ids in added.items():
+            levels[k] = _merge_level(levels[k], item_ids, items_by_id, self.sort_key)
+
+        level_ids = tuple(level for level in levels if level)
+        if len(level_ids) != len(levels):
+            level_by_id = {i: k for k, level in enumerate(level_ids) for i in level}
 
         return LevelGraph(
             items_by_id=items_by_id,
             deps_by_id=deps_by_id,
             dependents_by_id=dependents_by_id,
             level_ids=level_ids,
+            level_by_id=level_by_id,
+            sort_key=self.sort_key,
         )
 
     def _validate_level_ids(self, level_ids: tuple[tuple[str, ...], ...]) -> None:
@@ -241,24 +428,52 @@ def _build_dependents(deps_by_id: dict[str, tuple[str, ...]]) -> dict[str, tuple
 
 def _build_levels(
     deps_by_id: dict[str, tuple[str, ...]],
+    dependents_by_id: dict[str, tuple[str, ...]],
     *,
     items_by_id: dict[str, T],
     sort_key: SortKey[T] | None,
-) -> tuple[tuple[str, ...], ...]:
-    sorter = TopologicalSorter(deps_by_id)
-    sorter.prepare()
-
+) -> tuple[tuple[tuple[str, ...], ...], dict[str, int]]:
+    """Assign each node to the level one past its deepest dependency (Kahn's algorithm)"""
+    pending = {item_id: len(dep_ids) for item_id, dep_ids in deps_by_id.items()}
+    ready = [item_id for item_id, count in pending.items() if count == 0]
+    level_by_id: dict[str, int] = {}
     levels: list[tuple[str, ...]] = []
 
-    while sorter.is_active():
-        ready = list(sorter.get_ready())
+    while ready:
+        following: list[str] = []
+        for item_id in ready:
+            level_by_id[item_id] = len(levels)
+            for user_id in dependents_by_id[item_id]:
+                pending[user_id] -= 1
+                if pending[user_id] == 0:
+                    following.append(user_id)
+        levels.append(_sort_level(ready, items_by_id, sort_key))
+        ready = following
+
+    if len(level_by_id) != len(deps_by_id):
+        raise ValueError("Dependency cycle detected")
+
+    return tuple(levels), level_by_id
 
-        if sort_key is not None:
-            ready.sort(key=lambda item_id: sort_key(items_by_id[item_id]))
-        else:
-            ready.sort()
 
-        levels.append(tuple(ready))
-        sorter.done(*ready)
+def _sort_level(
+    item_ids: list[str], items_by_id: dict[str, T], sort_key: SortKey[T] | None
+) -> tuple[str, ...]:
+    if sort_key is None:
+        return tuple(sorted(item_ids))
+    return tuple(sorted(item_ids, key=lambda item_id: sort_key(items_by_id[item_id])))
 
-    return tuple(levels)
+
+def _merge_level(
+    level: tuple[str, ...],
+    item_ids: list[str],
+    items_by_id: dict[str, T],
+    sort_key: SortKey[T] | None,
+) -> tuple[str, ...]:
+    """Merge ``item_ids`` into the already ordered ``level``"""
+    new = _sort_level(item_ids, items_by_id, sort_key)
+    if not level:
+        return new
+    if sort_key is None:
+        return tuple(heapq.merge(level, new))
+    return tuple(heapq.merge(level, new, key=lambda item_id: sort_key(items_by_id[item_id])))
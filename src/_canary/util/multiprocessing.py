@@ -93,14 +93,13 @@ def initialize() -> None:
         return
     start_method: str = recommended_start_method()
     multiprocessing.set_start_method(start_method, force=True)
-    p = multiprocessing.Process(target=_noop)
-    p.start()
-    p.join()
-    _initialized = True
-
+    if start_method == "forkserver":
+        # Launch the server now, while the process environment is pristine, without waiting for
+        # it to come up.  Commands that never start a process don't pay for it.
+        from multiprocessing import forkserver
 
-def _noop():
-    pass
+        forkserver.ensure_running()
+    _initialized = True
 
 
 class SimpleQueue(multiprocessing.queues.SimpleQueue):
@@ -5,25 +5,33 @@
 import os
 import re
 import sys
+from functools import cache
 from io import StringIO
+from typing import TYPE_CHECKING
 
-from rich.console import Console
-from rich.text import Text
+if TYPE_CHECKING:
+    from rich.console import Console
 
 # Mapping from color arguments to values for logging.set_color
 color_when_values = {"always": True, "auto": None, "never": False}
 _force_color: bool | None = color_when_values.get(os.getenv("COLOR_WHEN", "auto"))
 
-# Reuse consoles to avoid overhead
-_COLOR_CONSOLE = Console(
-    file=StringIO(),
-    force_terminal=True,
-    color_system="truecolor",
-    width=10_000,
-    legacy_windows=False,
-)
 
-_PLAIN_CONSOLE = Console(file=StringIO(), force_terminal=False, color_system=None, width=10_000)
+@cache
+def _console(color: bool) -> "Console":
+    """Consoles are reused to avoid overhead, and created on first use so that importing this
+    module does not import rich"""
+    from rich.console import Console
+
+    if color:
+        return Console(
+            file=StringIO(),
+            force_terminal=True,
+            color_system="truecolor",
+            width=10_000,
+            legacy_windows=False,
+        )
+    return Console(file=StringIO(), force_terminal=False, color_system=None, width=10_000)
 
 
 def set_color_when(when):
@@ -75,8 +83,10 @@ def colorize(message: str, *, color: bool | None = None) -> str:
     else:
         use_color = sys.stdin.isatty()
 
+    from rich.text import Text
+
     # Reset buffers
-    console = _COLOR_CONSOLE if use_color else _PLAIN_CONSOLE
+    console = _console(use_color)
     buffer = console.file
     buffer.seek(0)
     buffer.truncate(0)
@@ -5,7 +5,7 @@
 import json
 import os
 import subprocess
-from importlib import metadata as im
+from functools import cache
 
 DIST_NAME = "canary-wm"
 
@@ -23,6 +23,8 @@ def is_editable(dist_name: str = DIST_NAME) -> bool:
     Best-effort PEP 610 editable detection via direct_url.json.
     Returns False if unavailable.
     """
+    from importlib import metadata as im
+
     try:
         dist = im.distribution(dist_name)
     except im.PackageNotFoundError:
@@ -122,11 +124,14 @@ def _parse_dist_version(v: str) -> tuple[int, int, int, str]:
     return major, minor, micro, local
 
 
+@cache
 def get_version_info() -> tuple[int, int, int, str]:
     """
     For non-editable installs: returns metadata version triplet and local (if any).
     For editable installs: uses metadata triplet, but local becomes 'g<sha>[.dirty]'.
     """
+    from importlib import metadata as im
+
     base = im.version(DIST_NAME)
     major, minor, micro, local = _parse_dist_version(base)
 
@@ -141,7 +146,10 @@ def get_version_info() -> tuple[int, int, int, str]:
     return major, minor, micro, local
 
 
+@cache
 def get_version() -> str:
+    from importlib import metadata as im
+
     major, minor, micro, local = get_version_info()
     v = f"{major}.{minor}.{micro}"
 
@@ -20,6 +20,7 @@ from typing import cast
 from . import config
 from .job import Job
 from .util import logging
+from .util.filesystem import find_dirs_containing
 from .util.filesystem import force_remove
 
 if TYPE_CHECKING:
@@ -33,6 +34,8 @@ ViewMode = Literal["symlink", "hardlink", "copy"]
 
 logger = logging.get_logger(__name__)
 
+lockfile_name = "testcase.lock"
+
 
 @dataclasses.dataclass
 class ViewSettings:
@@ -229,6 +232,40 @@ class ResultsView:
         elif self.settings.mode == "copy":
             shutil.copytree(source, dest, dirs_exist_ok=True, symlinks=False)
 
+    def find_job_ids(self, path: str | os.PathLike[str]) -> list[str] | None:
+        """Return IDs of the jobs at or below ``path`` using the view manifest
+
+        ``path`` may also point inside of a job's directory, in which case that job's ID is
+        returned.  No directories are traversed.  Returns ``None`` if ``path`` is not in this
+        view, if the manifest cannot be read, or if no entries match.
+
+        """
+        rel = self.relpath(path)
+        if rel is None or not self.manifest_file.exists():
+            return None
+        try:
+            manifest = self.load_manifest()
+        except (OSError, json.JSONDecodeError):
+            return None
+        if rel == ".":
+            return list(manifest.entries) or None
+        ids: list[str] = []
+        for job_id, entry in manifest.entries.items():
+            view_path = Path(entry.view_path).as_posix()
+            if view_path == rel or view_path.startswith(f"{rel}/"):
+                ids.append(job_id)
+            elif rel.startswith(f"{view_path}/"):
+                ids.append(job_id)
+        return ids or None
+
+    def relpath(self, path: str | os.PathLike[str]) -> str | None:
+        """Return ``path`` relative to the view directory, or ``None`` if not in the view"""
+        p = Path(os.path.abspath(path))
+        for dir in {self.root.absolute() / self.settings.name, self.dir}:
+            if p.is_relative_to(dir):
+                return p.relative_to(dir).as_posix()
+        return None
+
     @property
     def manifest_file(self) -> Path:
         return self.dir / ".canary-view.json"
@@ -323,6 +360,24 @@ class ResultsView:
             force_remove(path)
 
 
+def scan_job_ids(path: str | os.PathLike[str]) -> list[str]:
+    """Find IDs of the jobs at or below ``path`` by scanning for their lock files
+
+    This is the slow path used when the view manifest and the database cannot answer the query,
+    e.g., for stale views or for directories outside of the view.  Only the spec ID is read from
+    each lock file; the job itself is not reconstructed.
+
+    """
+    ids: list[str] = []
+    for dir in find_dirs_containing(Path(path), lockfile_name):
+        try:
+            with open(dir / lockfile_name) as fh:
+                ids.append(json.load(fh)["spec"]["id"])
+        except (OSError, KeyError, TypeError, json.JSONDecodeError):
+            logger.debug(f"Skipping unreadable lock file in {dir}")
+    return ids
+
+
 @dataclasses.dataclass
 class ViewManager:
     """Live manager for maintaining the session results view.
@@ -7,8 +7,10 @@ import fnmatch
 import io
 import json
 import os
+import re
 import sys
 import tokenize
+from functools import cached_property
 from string import Template
 from typing import AbstractSet
 from typing import Any
@@ -163,6 +165,31 @@ class When:
         _when_cache[input] = self
         return self
 
+    @cached_property
+    def names(self) -> frozenset[str]:
+        """Every identifier appearing in this object's expressions.  Parameters (and substitutions
+        of them) are referenced by name, so these are the only parameters the result depends on"""
+        expressions = (
+            self.option_expr,
+            self.keyword_expr,
+            self.parameter_expr,
+            self.testname_expr,
+            self.platform_expr,
+        )
+        return frozenset(name for expr in expressions if expr for name in _ident.findall(expr))
+
+    def parameter_key(self, parameters: dict[str, Any] | None) -> tuple | None:
+        """The projection of ``parameters`` on the parameters this object depends on.  Evaluating
+        with parameters having the same key gives the same value."""
+        if parameters is None:
+            return None
+        names = self.names
+        return tuple(
+            (key, repr(parameters[key]))
+            for key in sorted(parameters)
+            if key in names or key.upper() in names
+        )
+
     def evaluate_platform_expression(self, **kwds: str) -> str | None:
         assert self.platform_expr is not None
         string = safe_substitute(self.platform_expr, **kwds)
@@ -275,6 +302,7 @@ class When:
 
 
 _when_cache: dict[str | None, When] = {}
+_ident = re.compile(r"[A-Za-z_]\w*")
 
 
 @dataclasses.dataclass
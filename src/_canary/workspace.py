@@ -27,9 +27,11 @@ import datetime
 import fnmatch
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import TYPE_CHECKING
 from typing import Any
+from typing import Iterator
 
 import yaml
 
@@ -38,6 +40,7 @@ from . import jobspec
 from . import rules
 from . import select
 from . import version
+from .changes import ChangeDetector
 from .collect import Collector
 from .database import WorkspaceDatabase
 from .error import StopExecution
@@ -53,12 +56,16 @@ from .testexec import ExecutionSpace
 from .util import json_helper as json
 from .util import logging
 from .util.filesystem import async_rmtree
+from .util.filesystem import disk_usage
 from .util.filesystem import force_remove
+from .util.filesystem import remove
 from .util.filesystem import write_directory_tag
 from .util.names import unique_random_name
 from .view import ResultsView
 from .view import ViewManager
 from .view import ViewSettings
+from .view import lockfile_name
+from .view import scan_job_ids
 
 if TYPE_CHECKING:
     from .database import ResultListener
@@ -421,7 +428,12 @@ class Workspace:
         jobs = self.construct_jobs(specs, session_dir)
         selector = select.RuntimeSelector(jobs, workspace=self.root)
         selector.add_rule(rules.ResourceCapacityRule())
-        selector.add_rule(rules.RerunRule(strategy=only))
+        detector = ChangeDetector(self.db)
+        changed: set[str] | None = None
+        if only == "changed":
+            started = ((job.id, job.spec.file, job.timekeeper._started) for job in jobs)
+            changed = detector.changed(started)
+        selector.add_rule(rules.RerunRule(strategy=only, changed=changed))
         if timeout := config.get_timeout_option("session"):
             if fac := config.get_timeout_option("multiplier"):
                 timeout *= fac
@@ -447,6 +459,9 @@ class Workspace:
             ready.append(job)
 
         s = Session(name=session_dir.name, prefix=session_dir, jobs=ready)
+        if self.canary_level == 0 and detector.enabled(only):
+            # Remember the state of each job's inputs so later runs can tell if they changed
+            detector.record(job.spec for job in ready)
         if not reuse_session:
             config.pluginmanager.hook.canary_sessionstart(session=s)
             s.save()
@@ -485,6 +500,11 @@ class Workspace:
             config.pluginmanager.hook.canary_sessionfinish(session=s)
             s.save()
         self.register_latest_session(s)
+        if self.canary_level == 0:
+            # Archive the results of old sessions so the result history stays small
+            self.db.compact()
+        # Done writing: closing the database switches it back to a rollback journal
+        self.db.close()
         return s
 
     def register_latest_session(self, session: Session) -> None:
@@ -755,36 +775,79 @@ class Workspace:
         for spec in graph.topo_order():
             if mine := latest.get(spec.id):
                 deps = [Dependency(job=lookup[d.spec.id], when=d.when) for d in spec.dependencies]
-                space = ExecutionSpace(
-                    root=self.sessions_dir / mine["session"],
-                    path=Path(mine["workspace"]),
-                    session=mine["session"],
-                )
-                job = Job(spec=spec, workspace=space, dependencies=deps)
-                job.status = mine["status"]
-                job.timekeeper = mine["timekeeper"]
-                job.measurements = mine["measurements"]
-                job.state = mine["state"]
-                lookup[spec.id] = job
+                lookup[spec.id] = self.job_from_result(spec, mine, dependencies=deps)
         if ids:
             return [job for job in lookup.values() if job.id in ids]
         return list(lookup.values())
 
+    def iter_jobs(self, batch_size: int = 1000) -> Iterator[Job]:
+        """Streams the latest result of every job as a lightweight, read-only record.
+
+        Unlike :meth:`load_jobs`, the dependency graph is not constructed: records are not linked
+        to the jobs they depend on and are read from the database ``batch_size`` at a time, so
+        memory use does not grow with the size of the workspace.  Use :meth:`load_jobs` when
+        dependency links are needed.
+
+        Args:
+            batch_size: Number of database rows to read at a time.
+
+        Yields:
+            Job records, ordered by file path and name.
+        """
+        for batch in self.db.iter_results(batch_size=batch_size):
+            for result, data in batch:
+                yield self.job_from_result(json.loads(data), result)
+
+    def job_from_result(
+        self, spec: "JobSpec", result: dict[str, Any], dependencies: list[Dependency] | None = None
+    ) -> Job:
+        """Reconstructs a Job from its spec and a result row returned by the database."""
+        space = ExecutionSpace(
+            root=self.sessions_dir / result["session"],
+            path=Path(result["workspace"]),
+            session=result["session"],
+        )
+        job = Job(spec=spec, workspace=space, dependencies=dependencies)
+        job.status = result["status"]
+        job.timekeeper = result["timekeeper"]
+        job.measurements = result["measurements"]
+        job.state = result["state"]
+        return job
+
     def select_from_view(self, path: Path) -> list["JobSpec"]:
-        """Identifies JobSpecs based on 'testcase.lock' files found in the view.
+        """Identifies JobSpecs of the jobs at or below ``path`` in the view.
 
         Args:
-            path: The directory path to scan for lock files.
+            path: The view directory to select from.
 
         Returns:
             A list of corresponding JobSpecs.
         """
-        ids: list[str] = []
-        for file in path.rglob("*/testcase.lock"):
-            job = json.loads(file.read_text())
-            ids.append(job.spec.id)
-        resolved = self.db.load_specs(ids=ids)
-        return resolved
+        ids = self.find_specids_in_view(path)
+        if not ids:
+            return []
+        return self.db.load_specs(ids=ids)
+
+    def find_specids_in_view(self, path: str | os.PathLike[str]) -> list[str]:
+        """Finds IDs of the jobs at or below ``path``.
+
+        The view manifest is consulted first, then the view paths stored in the database.  Only
+        if neither knows about ``path`` is the directory tree scanned for lock files.
+
+        Args:
+            path: A directory (or job directory) in the view.
+
+        Returns:
+            A list of spec IDs.
+        """
+        if view := self.latest_view():
+            if (ids := view.find_job_ids(path)) is not None:
+                return ids
+            if (rel := view.relpath(path)) is not None:
+                prefixes = ["%"] if rel == "." else [rel, f"{rel}/%"]
+                if ids := self.db.select_from_view(prefixes):
+                    return ids
+        return scan_job_ids(path)
 
     def remove_tag(self, tag: str) -> bool:
         """Deletes a selection tag from the database.
@@ -881,45 +944,79 @@ class Workspace:
             return self.db.load_specs()
         return self.db.load_specs_by_tagname(tag)
 
-    def gc(self, dryrun: bool = False) -> None:
-        """Garbage collects old result directories, keeping only the latest per job.
+    def gc(self, dryrun: bool = False, keep: int = 10, workers: int = 8) -> "GarbageCollection":
+        """Removes results and files that are no longer reachable from the workspace's latest state.
+
+        Session directories holding no latest result are removed, as are the directories of
+        results superseded by a later session.  Results of all but the ``keep`` most recent sessions
+        are dropped (the latest result of each spec is always retained), specs no longer referenced
+        by a selection are dropped, and the database is vacuumed.
 
         Args:
             dryrun: If True, only log what would be removed without actually deleting.
-        """
-        raise NotImplementedError
-
-        def mtime(path: Path):
-            return path.stat().st_mtime
+            keep: Number of recent sessions whose result history is retained.
+            workers: Number of threads removing directories.
 
+        Returns:
+            A summary of what was (or, if dryrun, would be) removed.
+        """
         logger.info(f"Garbage collecting {self.root}")
-        latest: dict[str, Job] = {}
-        view: dict[str, tuple[str, str]] = {}
-        to_remove: list[Job] = []
-        for session in self.sessions():
-            for job in session.jobs:
-                if job.id not in latest:
-                    latest[job.id] = job
-                elif mtime(latest[job.id].workspace.dir) > mtime(job.workspace.dir):
-                    to_remove.append(latest[job.id])
-                    latest[job.id] = job
-                else:
+        stats = GarbageCollection()
+        latest, stale = self.db.get_result_dirs()
+        live_sessions = {session for session, _ in latest}
+        if (ref := self.refs_dir / "latest").exists():
+            live_sessions.add(Path(ref.read_text().strip()).name)
+
+        # Directories of the latest results, and their ancestors, must survive
+        protected: set[Path] = set()
+        for session, path in latest:
+            dir = self.sessions_dir / session / path
+            protected.add(dir)
+            protected.update(dir.parents)
+
+        to_remove: list[Path] = []
+        removing: set[Path] = set()
+        if self.sessions_dir.exists():
+            for entry in sorted(self.sessions_dir.iterdir()):
+                if not entry.is_dir() or entry.name in live_sessions or session_in_progress(entry):
                     continue
-                ws_dir = latest[job.id].workspace.dir
-                relpath = ws_dir.relative_to(session.work_dir)
-                view[job.id] = (str(session.work_dir), str(relpath))
-        try:
-            for job in to_remove:
-                logger.info(f"gc: removing {job}::{job.workspace.dir}")
-                if not dryrun:
-                    job.workspace.remove()
-        finally:
-            logger.info(f"Garbage collected {len(to_remove)} test jobs")
-            if not dryrun:
-                view_entries: dict[Path, list[Path]] = {}
-                for root, path in view.values():
-                    view_entries.setdefault(Path(root), []).append(Path(path))
-                self.update_view(view_entries)
+                to_remove.append(entry)
+                stats.sessions += 1
+        for session, path in sorted(stale):
+            if session not in live_sessions:
+                continue
+            dir = self.sessions_dir / session / path
+            if dir in protected or removing.intersection(dir.parents) or not dir.exists():
+                continue
+            to_remove.append(dir)
+            removing.add(dir)
+            stats.directories += 1
+
+        def reclaim(path: Path) -> int:
+            size = disk_usage(path)
+            if dryrun:
+                logger.info(f"gc: would remove {path}")
+                return size
+            logger.debug(f"gc: removing {path}")
+            try:
+                remove(path)
+            except OSError as e:
+                logger.warning(f"gc: failed to remove {path}: {e}")
+                return 0
+            return size
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+            stats.bytes += sum(ex.map(reclaim, to_remove))
+
+        stats.results, stats.specs = self.db.prune(keep=keep, dryrun=dryrun)
+        if not dryrun:
+            stats.bytes += self.db.vacuum()
+        logger.info(
+            f"Garbage collected {stats.sessions} sessions, {stats.directories} job directories, "
+            f"{stats.results} results, and {stats.specs} specs "
+            f"({stats.bytes / 1024**2:.1f} MB {'reclaimable' if dryrun else 'reclaimed'})"
+        )
+        return stats
 
     def find(self, *, job: str | None = None, spec: str | None = None) -> Any:
         """Locates a Job or JobSpec in the workspace.
@@ -955,16 +1052,20 @@ class Workspace:
                 return self.load_jobs([id])[0]
             except IndexError:
                 raise ValueError(f"{id}: no matching test job found in {self.root}")
-        # Do the full (slow) lookup
-        candidates: list[Job] = []
-        jobs = self.load_jobs()
-        for job in jobs:
-            if job.spec.matches(root):
-                return job
-            elif job.spec.matches(root, fuzzy=True):
-                candidates.append(job)
-        if candidates:
-            return candidates[0]
+        if ids := self.find_specids_at_path(root):
+            if len(ids) == 1 and (jobs := self.load_jobs(ids)):
+                return jobs[0]
+        # Match against specs and only reconstruct the job that matched
+        exact: list[str] = []
+        fuzzy: list[str] = []
+        for spec in self.db.load_specs():
+            if spec.matches(root):
+                exact.append(spec.id)
+            elif spec.matches(root, fuzzy=True):
+                fuzzy.append(spec.id)
+        for id in exact + fuzzy:
+            if jobs := self.load_jobs([id]):
+                return jobs[0]
         raise ValueError(f"{root}: no matching test job found in {self.root}")
 
     def find_jobspec(self, root: str) -> "JobSpec":
@@ -985,6 +1086,9 @@ class Workspace:
                 return self.db.load_specs([id])[0]
             except IndexError:
                 raise ValueError(f"{id}: no matching spec found in {self.root}")
+        if ids := self.find_specids_at_path(root):
+            if len(ids) == 1 and (specs := self.db.load_specs(ids)):
+                return specs[0]
         # Do the full (slow) lookup
         specs = self.db.load_specs()
         for spec in specs:
@@ -992,6 +1096,27 @@ class Workspace:
                 return spec
         raise ValueError(f"{root}: no matching spec found in {self.root}")
 
+    def find_specids_at_path(self, root: str | os.PathLike[str]) -> list[str]:
+        """Finds IDs of the jobs whose directories contain ``root``, without a full scan.
+
+        Args:
+            root: A path in the view or a job's execution directory.
+
+        Returns:
+            A list of spec IDs, empty if ``root`` is not a job path.
+        """
+        path = Path(root)
+        if not path.exists():
+            return []
+        if self.relative_to_view(path) is not None:
+            return self.find_specids_in_view(path)
+        for dir in (path, *path.absolute().parents):
+            if (dir / lockfile_name).is_file():
+                return scan_job_ids(dir)
+            if dir == self.sessions_dir or dir == self.root:
+                break
+        return []
+
     def find_specids(self, ids: list[str]) -> list[str | None]:
         """Resolves a list of potentially partial IDs or names to full spec IDs.
 
@@ -1038,6 +1163,26 @@ class Workspace:
                 logger.exception(f"Failed to update live view for job {job.id}")
 
 
+@dataclasses.dataclass
+class GarbageCollection:
+    """Counts of what ``Workspace.gc`` removed"""
+
+    sessions: int = 0
+    directories: int = 0
+    results: int = 0
+    specs: int = 0
+    bytes: int = 0
+
+
+def session_in_progress(path: Path) -> bool:
+    """Is the session at ``path`` still running?  A session's lock records when it finished."""
+    try:
+        data = Session.load_lock_data(path)
+    except (OSError, ValueError):
+        return False
+    return data.get("finished_on") == datetime.datetime.min.isoformat()
+
+
 class WorkspaceExistsError(Exception):
     """Raised when attempting to create a workspace in a directory that already exists."""
 
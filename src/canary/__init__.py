@@ -1,79 +1,143 @@
 # Copyright NTESS. See COPYRIGHT file for details.
 #
 # SPDX-License-Identifier: MIT
+"""The public canary API.
+
+Only the few names a running test needs (``get_instance``, the test exceptions, and
+``directives``) are imported with the package.  Everything else is imported on first access so
+that ``import canary`` stays cheap in test processes.
+
+"""
 
 import argparse
 import atexit
+import importlib
 from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
 
-import schema
-
-import _canary.config as config
-import _canary.enums as enums
-import _canary.status as status
-from _canary import version as _v
-from _canary.collect import Collector
-from _canary.config.argparsing import Parser
-from _canary.config.config import Config
-from _canary.enums import centered_parameter_space
-from _canary.enums import list_parameter_space
-from _canary.enums import random_parameter_space
 from _canary.error import TestDiffed
 from _canary.error import TestFailed
 from _canary.error import TestSkipped
-from _canary.generate import Generator
-from _canary.generator import AbstractSpecGenerator
-from _canary.hookspec import hookimpl
-from _canary.hookspec import hookspec
-from _canary.ir import DependencySelector
-from _canary.ir import JobSpecIR
-from _canary.job import BaseJob
-from _canary.job import Job
-from _canary.jobspec import Artifact
-from _canary.jobspec import Asset
-from _canary.jobspec import JobSpec
-from _canary.jobspec import Mask
-from _canary.launcher import Launcher
-from _canary.launcher import SubprocessLauncher
-from _canary.main import console_main
-from _canary.pluginmanager import CanaryPluginManager
-from _canary.plugins.types import CanarySubcommand
-from _canary.reporters.reporter import CanaryReporter
-from _canary.rules import Rule
-from _canary.rules import RuleOutcome
-from _canary.rules import RuntimeRule
-from _canary.runtest import Runner
-from _canary.select import RuntimeSelector
-from _canary.select import Selector
-from _canary.testcase import TestCase
 from _canary.testinst import LockFileNotFoundError
 from _canary.testinst import MissingTestInstance
 from _canary.testinst import TestInstance
 from _canary.testinst import TestMultiInstance
-from _canary.util import _difflib as difflib
-from _canary.util import filesystem
 from _canary.util import logging
-from _canary.util import module
-from _canary.util import rich as color
-from _canary.util import shell
-from _canary.util import string
-from _canary.util import time
-from _canary.util.executable import Executable
-from _canary.view import ViewSettings
-from _canary.workspace import NotAWorkspaceError
-from _canary.workspace import Session
-from _canary.workspace import Workspace
 
 from . import directives
 from . import patterns
 
+if TYPE_CHECKING:
+    import schema
+
+    import _canary.config as config
+    import _canary.enums as enums
+    import _canary.status as status
+    from _canary.collect import Collector
+    from _canary.config.argparsing import Parser
+    from _canary.config.config import Config
+    from _canary.enums import centered_parameter_space
+    from _canary.enums import list_parameter_space
+    from _canary.enums import random_parameter_space
+    from _canary.generate import Generator
+    from _canary.generator import AbstractSpecGenerator
+    from _canary.generator import AbstractSpecGenerator as AbstractTestGenerator
+    from _canary.hookspec import hookimpl
+    from _canary.hookspec import hookspec
+    from _canary.ir import DependencySelector
+    from _canary.ir import JobSpecIR
+    from _canary.job import BaseJob
+    from _canary.job import Job
+    from _canary.jobspec import Artifact
+    from _canary.jobspec import Asset
+    from _canary.jobspec import JobSpec
+    from _canary.jobspec import JobSpec as ResolvedSpec
+    from _canary.jobspec import Mask
+    from _canary.launcher import Launcher
+    from _canary.launcher import SubprocessLauncher
+    from _canary.main import console_main
+    from _canary.pluginmanager import CanaryPluginManager
+    from _canary.plugins.types import CanarySubcommand
+    from _canary.reporters.reporter import CanaryReporter
+    from _canary.rules import Rule
+    from _canary.rules import RuleOutcome
+    from _canary.rules import RuntimeRule
+    from _canary.runtest import Runner
+    from _canary.select import RuntimeSelector
+    from _canary.select import Selector
+    from _canary.testcase import TestCase
+    from _canary.util import _difflib as difflib
+    from _canary.util import filesystem
+    from _canary.util import module
+    from _canary.util import rich as color
+    from _canary.util import shell
+    from _canary.util import string
+    from _canary.util import time
+    from _canary.util.executable import Executable
+    from _canary.version import version
+    from _canary.version import version_info
+    from _canary.view import ViewSettings
+    from _canary.workspace import NotAWorkspaceError
+    from _canary.workspace import Session
+    from _canary.workspace import Workspace
+
 get_logger = logging.get_logger
 
-version = _v.version
-version_info = _v.version_info
-ResolvedSpec = JobSpec
-AbstractTestGenerator = AbstractSpecGenerator
-del _v
+# name -> (module, attribute).  A module is exported when the attribute is None.
+_lazy_attrs: dict[str, tuple[str, str | None]] = {
+    "schema": ("schema", None),
+    "config": ("_canary.config", None),
+    "enums": ("_canary.enums", None),
+    "status": ("_canary.status", None),
+    "Collector": ("_canary.collect", "Collector"),
+    "Parser": ("_canary.config.argparsing", "Parser"),
+    "Config": ("_canary.config.config", "Config"),
+    "centered_parameter_space": ("_canary.enums", "centered_parameter_space"),
+    "list_parameter_space": ("_canary.enums", "list_parameter_space"),
+    "random_parameter_space": ("_canary.enums", "random_parameter_space"),
+    "Generator": ("_canary.generate", "Generator"),
+    "AbstractSpecGenerator": ("_canary.generator", "AbstractSpecGenerator"),
+    "AbstractTestGenerator": ("_canary.generator", "AbstractSpecGenerator"),
+    "hookimpl": ("_canary.hookspec", "hookimpl"),
+    "hookspec": ("_canary.hookspec", "hookspec"),
+    "DependencySelector": ("_canary.ir", "DependencySelector"),
+    "JobSpecIR": ("_canary.ir", "JobSpecIR"),
+    "BaseJob": ("_canary.job", "BaseJob"),
+    "Job": ("_canary.job", "Job"),
+    "Artifact": ("_canary.jobspec", "Artifact"),
+    "Asset": ("_canary.jobspec", "Asset"),
+    "JobSpec": ("_canary.jobspec", "JobSpec"),
+    "ResolvedSpec": ("_canary.jobspec", "JobSpec"),
+    "Mask": ("_canary.jobspec", "Mask"),
+    "Launcher": ("_canary.launcher", "Launcher"),
+    "SubprocessLauncher": ("_canary.launcher", "SubprocessLauncher"),
+    "console_main": ("_canary.main", "console_main"),
+    "CanaryPluginManager": ("_canary.pluginmanager", "CanaryPluginManager"),
+    "CanarySubcommand": ("_canary.plugins.types", "CanarySubcommand"),
+    "CanaryReporter": ("_canary.reporters.reporter", "CanaryReporter"),
+    "Rule": ("_canary.rules", "Rule"),
+    "RuleOutcome": ("_canary.rules", "RuleOutcome"),
+    "RuntimeRule": ("_canary.rules", "RuntimeRule"),
+    "Runner": ("_canary.runtest", "Runner"),
+    "RuntimeSelector": ("_canary.select", "RuntimeSelector"),
+    "Selector": ("_canary.select", "Selector"),
+    "TestCase": ("_canary.testcase", "TestCase"),
+    "difflib": ("_canary.util._difflib", None),
+    "filesystem": ("_canary.util.filesystem", None),
+    "module": ("_canary.util.module", None),
+    "color": ("_canary.util.rich", None),
+    "shell": ("_canary.util.shell", None),
+    "string": ("_canary.util.string", None),
+    "time": ("_canary.util.time", None),
+    "Executable": ("_canary.util.executable", "Executable"),
+    "version": ("_canary.version", "version"),
+    "version_info": ("_canary.version", "version_info"),
+    "ViewSettings": ("_canary.view", "ViewSettings"),
+    "NotAWorkspaceError": ("_canary.workspace", "NotAWorkspaceError"),
+    "Session": ("_canary.workspace", "Session"),
+    "Workspace": ("_canary.workspace", "Workspace"),
+}
 
 
 __all__ = [
@@ -124,7 +188,6 @@ __all__ = [
     "color",
     "difflib",
     "filesystem",
-    "graph",
     "module",
     "shell",
     "string",
@@ -171,7 +234,7 @@ def get_instance(arg_path: Path | str | None = None) -> TestInstance | MissingTe
         return MissingTestInstance(arg_path)
 
 
-def get_job(arg_path: Path | str | None = None) -> Job | None:
+def get_job(arg_path: Path | str | None = None) -> "Job | None":
     from _canary.job import load_job_from_file
 
     try:
@@ -185,10 +248,17 @@ def get_job(arg_path: Path | str | None = None) -> Job | None:
 get_testcase = get_job
 
 
-def __getattr__(name):
+def __getattr__(name: str) -> Any:
     import _canary
 
-    if name == "FILE_SCANNING":
+    if name in _lazy_attrs:
+        modname, attr = _lazy_attrs[name]
+        value = importlib.import_module(modname)
+        if attr is not None:
+            value = getattr(value, attr)
+        globals()[name] = value
+        return value
+    elif name == "FILE_SCANNING":
         return _canary.FILE_SCANNING
     elif name == "test":
         test = type("Test", (), {"instance": get_instance()})()
@@ -98,14 +98,18 @@ The ``when`` expression recognizes the following conditions:
 # the particular test.                                                                            #
 # ----------------------------------------------------------------------------------------------- #
 
+from typing import TYPE_CHECKING
 from typing import Any
 from typing import Sequence
+from typing import Union
 
 from _canary import enums
-from _canary.ir import DependencySelector
+
+if TYPE_CHECKING:
+    from _canary.ir import DependencySelector
 
 WhenType = str | dict[str, str]
-DependencyType = str | dict[str, Any] | DependencySelector
+DependencyType = Union[str, dict[str, Any], "DependencySelector"]
 
 
 def artifact(file: str, *, when: WhenType | None = None, save_on: str = "always") -> None:
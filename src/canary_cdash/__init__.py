@@ -15,10 +15,6 @@ from typing import Generator
 import canary
 from _canary.util.string import csvsplit
 
-from .cdash_html_summary import cdash_summary
-from .gitlab_issue_generator import create_issues_from_failed_tests
-from .xmlreporter import CDashXMLReporter
-
 
 @canary.hookimpl
 def canary_reporter() -> canary.CanaryReporter:
@@ -147,6 +143,29 @@ class CDashReporter(canary.CanaryReporter):
         parser.add_argument(
             "--done", action="store_true", default=False, help="Post Done.xml to the build."
         )
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            dest="workers",
+            type=int,
+            default=4,
+            metavar="N",
+            help="Upload N files concurrently [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--retries",
+            type=int,
+            default=3,
+            metavar="N",
+            help="Retry failed uploads N times with exponential backoff [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--no-resume",
+            dest="resume",
+            action="store_false",
+            default=True,
+            help="Upload all files, even those previously accepted by CDash for this build",
+        )
         parser.add_argument("files", nargs="*", help="XML files to post")
 
     def setup_summary_parser(self, parser: "canary.Parser") -> None:
@@ -222,6 +241,8 @@ class CDashReporter(canary.CanaryReporter):
         )
 
     def run_create(self, args: Namespace) -> None:
+        from .xmlreporter import CDashXMLReporter
+
         reporter: CDashXMLReporter = CDashXMLReporter.from_workspace(dest=args.dest)
 
         if args.f:
@@ -249,13 +270,16 @@ class CDashReporter(canary.CanaryReporter):
         )
 
     def run_post(self, args: Namespace) -> None:
+        from .xmlreporter import CDashXMLReporter
+
         cdash_url = args.cdash_url
         cdash_project = args.cdash_project
         done = args.done or False
         files = list(args.files or [])
+        opts = {"workers": args.workers, "retries": args.retries, "resume": args.resume}
 
         if files:
-            url = CDashXMLReporter.post(cdash_url, cdash_project, *files, done=done)
+            url = CDashXMLReporter.post(cdash_url, cdash_project, *files, done=done, **opts)
             # Write URL to stdout so tools can do:
             #   cdash_url=$(canary report cdash post ...)
             sys.stdout.write(f"{url}\n")
@@ -267,10 +291,12 @@ class CDashReporter(canary.CanaryReporter):
         if not files:
             raise ValueError("canary report cdash post: no xml files to post")
 
-        url = reporter.post(cdash_url, cdash_project, *files, done=done)
+        url = reporter.post(cdash_url, cdash_project, *files, done=done, **opts)
         sys.stdout.write(f"{url}\n")
 
     def run_summary(self, args: Namespace) -> None:
+        from .cdash_html_summary import cdash_summary
+
         cdash_summary(
             url=args.cdash_url,
             project=args.cdash_project,
@@ -281,6 +307,8 @@ class CDashReporter(canary.CanaryReporter):
         )
 
     def run_make_gitlab_issues(self, args: Namespace) -> None:
+        from .gitlab_issue_generator import create_issues_from_failed_tests
+
         create_issues_from_failed_tests(
             access_token=args.access_token,
             cdash_url=args.cdash_url,
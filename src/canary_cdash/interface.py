@@ -3,6 +3,7 @@
 # SPDX-License-Identifier: MIT
 
 import hashlib
+import http.client
 import json
 import os
 import re
@@ -18,7 +19,8 @@ from urllib.request import urlopen
 
 import canary
 from _canary.util.executable import Executable
-from _canary.util.filesystem import force_remove
+
+from . import upload
 
 logger = canary.get_logger(__name__)
 
@@ -115,38 +117,14 @@ class server:
 
     @staticmethod
     def put(url, file):
-
-        def _get_text(doc, tag):
-            if els := doc.getElementsByTagName(tag):
-                return get_text(els[0])
-            return None
-
-        with no_proxy():
-            # Proxy settings must be turned off to submit to CDash
-            curl = Executable("curl")
-            curl.add_default_args("-v", "-L")
-            args = ["--upload-file", file, url]
-            efile = "cdash-put-err.txt"
-            payload = {"status": "NA", "message": None, "buildid": None}
-            try:
-                with open(efile, "w") as fh:
-                    result = curl(*args, output=str, error=fh)
-                doc = dom.parseString(result.get_output())
-                payload["status"] = _get_text(doc, "status")
-                payload["buildid"] = _get_text(doc, "buildId")
-            except xml.parsers.expat.ExpatError as e:
-                payload["message"] = e.args[0]
-            finally:
-                if payload["status"] == "NA":
-                    m = payload["message"]
-                    logger.error(f"Failed to upload {os.path.basename(file)}: {m}")
-                elif payload["status"] != "OK":
-                    m = payload["message"] = _get_text(doc, "message")
-                    lines = "\n    ".join([_.rstrip() for _ in open(efile).readlines()])
-                    logger.error(f"Failed to upload {os.path.basename(file)}: {m}\n    {lines}")
-                if not canary.config.get("debug"):
-                    force_remove(efile)
-            return payload
+        """PUT ``file`` to ``url`` and return the CDash response status, message, and build ID"""
+        try:
+            payload = upload.put(url, file)
+        except (OSError, http.client.HTTPException, upload.UploadError) as e:
+            payload = {"status": "NA", "message": str(e), "buildid": None}
+        if payload["status"] != "OK":
+            logger.error(f"Failed to upload {os.path.basename(file)}: {payload['message']}")
+        return payload
 
     @staticmethod
     def get(url, raw=False):
@@ -0,0 +1,122 @@
+# Copyright NTESS. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import http.server
+import json
+import os
+import threading
+
+import pytest
+
+from canary_cdash import upload
+from canary_cdash.xmlreporter import CDashXMLReporter
+
+site_xml = """\
+<?xml version="1.0" ?>
+<Site BuildName="build" BuildStamp="20260101-0000-Experimental" Name="site" Generator="canary">
+  <Testing/>
+</Site>
+"""
+
+
+class CDashStandIn(http.server.ThreadingHTTPServer):
+    """Minimal stand-in for CDash's submit.php"""
+
+    def __init__(self, fail: dict[str, int] | None = None) -> None:
+        super().__init__(("127.0.0.1", 0), CDashHandler)
+        self.fail = dict(fail or {})
+        self.received: list[str] = []
+        self.connections: set[int] = set()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class CDashHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_PUT(self):
+        server: CDashStandIn = self.server  # type: ignore
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        name = body.decode().splitlines()[-1].split()[1]
+        with server.lock:
+            server.connections.add(id(self.connection))
+            if server.fail.get(name, 0) > 0:
+                server.fail[name] -= 1
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            server.received.append(name)
+        text = b"<cdash><status>OK</status><message/><buildId>42</buildId></cdash>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml")
+        self.send_header("Content-Length", str(len(text)))
+        self.end_headers()
+        self.wfile.write(text)
+
+
+@pytest.fixture
+def cdash():
+    def factory(fail=None):
+        server = CDashStandIn(fail=fail)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        servers.append(server)
+        return server
+
+    servers: list[CDashStandIn] = []
+    yield factory
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def write_files(dest, n):
+    files = []
+    for i in range(n):
+        file = os.path.join(dest, f"Test-{i}.xml")
+        with open(file, "w") as fh:
+            fh.write(f"{site_xml}<!-- Test-{i}.xml -->\n")
+        files.append(file)
+    return files
+
+
+def test_upload_parallel_and_retry(tmpdir, cdash):
+    server = cdash(fail={"Test-3.xml": 2})
+    files = write_files(tmpdir.strpath, 8)
+    url = CDashXMLReporter.post(server.url, "project", *files, workers=2, retries=3)
+    assert url == f"{server.url}/buildSummary.php?buildid=42"
+    assert sorted(server.received) == sorted(os.path.basename(f) for f in files)
+    # Connections are reused: at most one per worker
+    assert len(server.connections) <= 2
+
+
+def test_upload_resume(tmpdir, cdash):
+    server = cdash(fail={"Test-1.xml": 10})
+    files = write_files(tmpdir.strpath, 3)
+    CDashXMLReporter.post(server.url, "project", *files, workers=1, retries=0)
+    assert sorted(server.received) == ["Test-0.xml", "Test-2.xml"]
+    manifest = os.path.join(tmpdir.strpath, upload.manifest_name)
+    with open(manifest) as fh:
+        entries = json.load(fh)["entries"]
+    assert entries[files[0]]["status"] == "OK"
+    assert entries[files[0]]["buildid"] == "42"
+    assert entries[files[1]]["status"] != "OK"
+
+    # Resume: only the file that was not accepted is uploaded again
+    server.fail.clear()
+    server.received.clear()
+    CDashXMLReporter.post(server.url, "project", *files, workers=2, retries=0)
+    assert server.received == ["Test-1.xml"]
+
+    # Without resume, everything is uploaded
+    server.received.clear()
+    CDashXMLReporter.post(server.url, "project", *files, workers=2, retries=0, resume=False)
+    assert sorted(server.received) == ["Test-0.xml", "Test-1.xml", "Test-2.xml"]
@@ -0,0 +1,296 @@
+# Copyright NTESS. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: MIT
+"""Native HTTP upload of CDash XML files.
+
+Files are ``PUT`` to ``submit.php`` over persistent (keep-alive) connections, one per worker
+thread and host.  Transient failures (connection errors, HTTP 429 and 5xx) are retried with
+exponential backoff.  Accepted uploads are recorded in a manifest next to the uploaded files so
+that an interrupted ``canary report cdash post`` resumes where it stopped.
+"""
+
+import datetime
+import hashlib
+import http.client
+import os
+import threading
+import time
+import xml.dom.minidom as dom
+import xml.parsers.expat
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from urllib.parse import urlencode
+from urllib.parse import urljoin
+from urllib.parse import urlsplit
+
+import canary
+from _canary.util import json_helper as json
+
+logger = canary.get_logger(__name__)
+
+manifest_name = ".cdash-upload.json"
+retryable_http_status = (408, 429, 500, 502, 503, 504)
+redirect_http_status = (301, 302, 303, 307, 308)
+
+
+class UploadError(Exception):
+    """Raised for upload failures that may succeed if retried"""
+
+
+class ConnectionPool:
+    """Keep one persistent HTTP connection per (thread, host)"""
+
+    def __init__(self, timeout: float = 60.0) -> None:
+        self.timeout = timeout
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.connections: list[http.client.HTTPConnection] = []
+
+    def get(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        cache: dict[tuple[str, str], http.client.HTTPConnection]
+        cache = self.local.__dict__.setdefault("connections", {})
+        key = (scheme, netloc)
+        if key not in cache:
+            conn: http.client.HTTPConnection
+            if scheme == "https":
+                conn = http.client.HTTPSConnection(netloc, timeout=self.timeout)
+            elif scheme == "http":
+                conn = http.client.HTTPConnection(netloc, timeout=self.timeout)
+            else:
+                raise ValueError(f"Unsupported URL scheme {scheme!r}")
+            cache[key] = conn
+            with self.lock:
+                self.connections.append(conn)
+        return cache[key]
+
+    def discard(self, scheme: str, netloc: str) -> None:
+        cache = self.local.__dict__.get("connections", {})
+        if conn := cache.pop((scheme, netloc), None):
+            conn.close()
+
+    def close(self) -> None:
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections.clear()
+
+
+class UploadManifest:
+    """Record of files accepted by CDash for a given build
+
+    The manifest maps the absolute path of each uploaded file to its sha256 checksum, the CDash
+    status, and the build ID returned by the server.  Entries are only reused if the file and the
+    submission target (url, project, site, build name, and build stamp) are unchanged.
+
+    """
+
+    version = 1
+
+    def __init__(self, path: str, target: dict[str, str]) -> None:
+        self.path = path
+        self.target = target
+        self.lock = threading.Lock()
+        self.entries: dict[str, dict[str, Any]] = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path) as fh:
+                    data = json.load(fh)
+            except (OSError, json.JSONDecodeError):
+                logger.warning(f"Ignoring unreadable upload manifest {self.path}")
+            else:
+                if data.get("version") == self.version and data.get("target") == self.target:
+                    self.entries.update(data.get("entries", {}))
+
+    def accepted(self, file: str, sha256: str) -> dict[str, Any] | None:
+        entry = self.entries.get(os.path.abspath(file))
+        if entry and entry.get("sha256") == sha256 and entry.get("status") == "OK":
+            return entry
+        return None
+
+    def record(self, file: str, sha256: str, payload: dict[str, Any]) -> None:
+        with self.lock:
+            self.entries[os.path.abspath(file)] = {
+                "sha256": sha256,
+                "status": payload["status"],
+                "buildid": payload["buildid"],
+                "uploaded_on": datetime.datetime.now().isoformat(),
+            }
+            data = {"version": self.version, "target": self.target, "entries": self.entries}
+            json.safesave(self.path, data, indent=2)
+
+    @property
+    def buildid(self) -> str | None:
+        for entry in self.entries.values():
+            if entry.get("status") == "OK" and entry.get("buildid"):
+                return entry["buildid"]
+        return None
+
+
+class Uploader:
+    """Upload files to a CDash project
+
+    Args:
+      baseurl: The base CDash URL
+      project: The CDash project name
+      sitename: The CDash site name
+      buildname: The CDash build name
+      buildstamp: The CDash build stamp
+      workers: Number of concurrent uploads
+      retries: Number of times a failed upload is retried
+      backoff: Initial delay, in seconds, between retries.  The delay doubles after each attempt
+      timeout: Socket timeout, in seconds
+      manifest: Path to the upload manifest.  If ``None``, uploads are not recorded
+
+    """
+
+    def __init__(
+        self,
+        baseurl: str,
+        project: str,
+        *,
+        sitename: str,
+        buildname: str,
+        buildstamp: str,
+        workers: int = 4,
+        retries: int = 3,
+        backoff: float = 1.0,
+        timeout: float = 60.0,
+        manifest: str | None = None,
+    ) -> None:
+        self.baseurl = baseurl.rstrip("/")
+        self.project = project
+        self.sitename = sitename
+        self.buildname = buildname
+        self.buildstamp = buildstamp
+        self.workers = max(1, workers)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.pool = ConnectionPool(timeout=timeout)
+        self.manifest: UploadManifest | None = None
+        if manifest is not None:
+            target = {
+                "url": self.baseurl,
+                "project": project,
+                "site": sitename,
+                "build": buildname,
+                "stamp": buildstamp,
+            }
+            self.manifest = UploadManifest(manifest, target)
+
+    def submit_url(self) -> str:
+        params = {
+            "project": self.project,
+            "build": self.buildname,
+            "site": self.sitename,
+            "stamp": self.buildstamp,
+        }
+        return f"{self.baseurl}/submit.php?{urlencode(params)}"
+
+    def upload(self, *files: str) -> list[dict[str, Any]]:
+        """Upload ``files`` concurrently and return the CDash payload for each, in order"""
+        try:
+            if self.workers == 1 or len(files) == 1:
+                return [self.upload_one(file) for file in files]
+            with ThreadPoolExecutor(max_workers=self.workers) as ex:
+                return list(ex.map(self.upload_one, files))
+        finally:
+            self.pool.close()
+
+    def upload_one(self, file: str) -> dict[str, Any]:
+        sha256 = checksum(file)
+        if self.manifest is not None:
+            if entry := self.manifest.accepted(file, sha256):
+                logger.info(f"Skipping {os.path.basename(file)}: previously accepted by CDash")
+                return {"status": "OK", "message": None, "buildid": entry["buildid"]}
+        url = self.submit_url()
+        logger.info(f"Uploading {os.path.basename(file)} to {url}")
+        payload: dict[str, Any] = {"status": "NA", "message": None, "buildid": None}
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            try:
+                payload = put(url, file, pool=self.pool)
+                break
+            except (OSError, http.client.HTTPException, UploadError) as e:
+                payload["message"] = str(e)
+                if attempt == self.retries:
+                    break
+                logger.debug(f"Upload of {file} failed ({e}), retrying in {delay:.1f} s")
+                time.sleep(delay)
+                delay *= 2
+        if payload["status"] != "OK":
+            logger.error(f"Failed to upload {os.path.basename(file)}: {payload['message']}")
+        if self.manifest is not None:
+            self.manifest.record(file, sha256, payload)
+        return payload
+
+
+def put(
+    url: str, file: str, pool: ConnectionPool | None = None, redirects: int = 5
+) -> dict[str, Any]:
+    """PUT ``file`` to ``url`` and parse the CDash response
+
+    Redirects are followed.  Transient failures raise :class:`UploadError` or ``OSError`` so that
+    the caller may retry.
+
+    """
+    own_pool = pool is None
+    pool = pool or ConnectionPool()
+    try:
+        for _ in range(redirects + 1):
+            parts = urlsplit(url)
+            path = parts.path or "/"
+            if parts.query:
+                path = f"{path}?{parts.query}"
+            conn = pool.get(parts.scheme, parts.netloc)
+            try:
+                with open(file, "rb") as fh:
+                    headers = {"Content-Length": str(os.fstat(fh.fileno()).st_size)}
+                    conn.request("PUT", path, body=fh, headers=headers)
+                response = conn.getresponse()
+                text = response.read()
+            except (OSError, http.client.HTTPException):
+                # The server may have closed an idle keep-alive connection
+                pool.discard(parts.scheme, parts.netloc)
+                raise
+            if response.getheader("Connection", "").lower() == "close":
+                pool.discard(parts.scheme, parts.netloc)
+            if response.status in redirect_http_status and response.getheader("Location"):
+                url = urljoin(url, response.getheader("Location"))
+                continue
+            if response.status in retryable_http_status:
+                raise UploadError(f"HTTP {response.status} {response.reason}")
+            if response.status >= 400:
+                message = f"HTTP {response.status} {response.reason}"
+                return {"status": "ERROR", "message": message, "buildid": None}
+            return parse_response(text)
+        raise UploadError(f"Too many redirects uploading {os.path.basename(file)}")
+    finally:
+        if own_pool:
+            pool.close()
+
+
+def parse_response(text: bytes | str) -> dict[str, Any]:
+    def _get_text(doc, tag):
+        if els := doc.getElementsByTagName(tag):
+            return "".join(n.data for n in els[0].childNodes if n.nodeType == n.TEXT_NODE).strip()
+        return None
+
+    payload: dict[str, Any] = {"status": "NA", "message": None, "buildid": None}
+    try:
+        doc = dom.parseString(text)
+    except xml.parsers.expat.ExpatError as e:
+        payload["message"] = e.args[0]
+        return payload
+    payload["status"] = _get_text(doc, "status")
+    payload["buildid"] = _get_text(doc, "buildId")
+    if payload["status"] != "OK":
+        payload["message"] = _get_text(doc, "message")
+    return payload
+
+
+def checksum(file: str, block_size: int = 2**20) -> str:
+    hasher = hashlib.sha256()
+    with open(file, "rb") as fh:
+        while data := fh.read(block_size):
+            hasher.update(data)
+    return hasher.hexdigest()
@@ -11,12 +11,15 @@ import time
 import xml.dom.minidom as xdom
 from typing import IO
 from typing import Any
+from typing import Callable
+from typing import Iterable
 
 import canary
 from _canary.util.compression import targz_compress
 from _canary.util.string import truncate_middle
 
 from . import interface
+from . import upload
 
 logger = canary.get_logger(__name__)
 
@@ -35,15 +38,17 @@ class CDashXMLReporter:
     @classmethod
     def from_workspace(cls, dest: str | None = None) -> "CDashXMLReporter":
         workspace: canary.Workspace = canary.Workspace.load()
-        jobs = workspace.load_jobs()
-        if not jobs:
-            raise ValueError(f"No results found in {workspace.root}")
         if dest is None:
             view = workspace.latest_view()
             dest = str((workspace.sessions_dir if view is None else view.dir) / "CDASH")
         self = cls(dest=dest)
-        for job in jobs:
-            self.data.add_job(job)
+        # Jobs are streamed from the database: this pass only gathers the session's time span and
+        # status, jobs are read again, one chunk at a time, when the XML files are written
+        for job in workspace.iter_jobs():
+            self.data.add_job(job, keep=False)
+        if not len(self.data):
+            raise ValueError(f"No results found in {workspace.root}")
+        self.data.source = workspace.iter_jobs
         return self
 
     def create(
@@ -72,7 +77,7 @@ class CDashXMLReporter:
         unique_subproject_labels: set[str] = set(subproject_labels or [])
         if label_sets := canary.config.pluginmanager.hook.canary_cdash_labels_for_subproject():
             unique_subproject_labels.update([_ for ls in label_sets for _ in ls if ls])
-        for job in self.data.jobs:
+        for job in self.data:
             if label := canary.config.pluginmanager.hook.canary_cdash_subproject_label(case=job):
                 unique_subproject_labels.add(label)
         if unique_subproject_labels:
@@ -81,10 +86,10 @@ class CDashXMLReporter:
         if chunk_size is None:
             chunk_size = 500
         if chunk_size > 0:  # type: ignore
-            for jobs in chunked(self.data.jobs, chunk_size):
+            for jobs in chunked(self.data, chunk_size):
                 self.write_test_xml(jobs, subproject_labels=subproject_labels)
         elif chunk_size < 0:  # type: ignore
-            self.write_test_xml(self.data.jobs, subproject_labels=subproject_labels)
+            self.write_test_xml(list(self.data), subproject_labels=subproject_labels)
         else:
             raise ValueError("chunk_size must be a positive integer or -1")
         self.write_notes_xml()
@@ -129,21 +134,42 @@ class CDashXMLReporter:
         return buildstamp
 
     @staticmethod
-    def post(url: str, project: str, *files: str, done: bool = False) -> str | None:
+    def post(
+        url: str,
+        project: str,
+        *files: str,
+        done: bool = False,
+        workers: int = 4,
+        retries: int = 3,
+        resume: bool = True,
+    ) -> str | None:
+        """Post ``files`` to CDash
+
+        Files are uploaded concurrently by ``workers`` threads.  Files accepted by CDash are
+        recorded in an upload manifest in the directory of the first file.  If ``resume`` is
+        ``True``, files previously accepted for the same build are not uploaded again.
+
+        """
         if not files:
             raise ValueError("No files to post")
-        server = interface.server(url, project)
         ns = CDashXMLReporter.read_site_info(files[0])
-        upload_errors = 0
-        buildid = None
-        for file in files:
-            logger.info(f"Posting {file} to {url}")
-            payload = server.upload(
-                filename=file, sitename=ns.site, buildname=ns.buildname, buildstamp=ns.buildstamp
-            )
-            buildid = buildid or payload["buildid"]
-            upload_error = 0 if payload["status"] == "OK" else 1
-            upload_errors += upload_error
+        manifest = os.path.join(os.path.dirname(os.path.abspath(files[0])), upload.manifest_name)
+        if not resume:
+            canary.filesystem.force_remove(manifest)
+        uploader = upload.Uploader(
+            url,
+            project,
+            sitename=ns.site,
+            buildname=ns.buildname,
+            buildstamp=ns.buildstamp,
+            workers=workers,
+            retries=retries,
+            manifest=manifest,
+        )
+        logger.info(f"Posting {len(files)} files to {url}")
+        payloads = uploader.upload(*files)
+        upload_errors = sum(1 for payload in payloads if payload["status"] != "OK")
+        buildid = next((p["buildid"] for p in payloads if p["buildid"]), None)
         if upload_errors:
             logger.warning(f"{upload_errors} files failed to upload to CDash")
         if buildid is None:
@@ -154,6 +180,7 @@ class CDashXMLReporter:
                     doc = CDashXMLReporter.create_done_document(buildid, time.time())
                     CDashXMLReporter.dump_xml(doc, fh)
                 CDashXMLReporter.validate_xml(fh.name, schema="Done.xsd")
+                server = interface.server(url, project)
                 payload = server.upload(
                     filename=fh.name,
                     sitename=ns.site,
@@ -466,7 +493,14 @@ def unique_file(dirname: str, filename: str, ext: str) -> str:
 
 
 def chunked(seq, size):
-    return (seq[pos : pos + size] for pos in range(0, len(seq), size))
+    chunk = []
+    for item in seq:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
 
 class TestData:
@@ -474,14 +508,16 @@ class TestData:
         self.start: float = sys.maxsize
         self.stop: float = -1
         self.status: int = 0
+        self.count: int = 0
         self.jobs: list["canary.Job"] = []
+        # If set, jobs are read from ``source`` each time they are iterated over
+        self.source: Callable[[], Iterable["canary.Job"]] | None = None
 
     def __len__(self):
-        return len(self.jobs)
+        return self.count
 
     def __iter__(self):
-        for job in self.jobs:
-            yield job
+        yield from (self.jobs if self.source is None else self.source())
 
     def update_status(self, job: "canary.Job") -> None:
         if job.status.is_success():
@@ -491,7 +527,7 @@ class TestData:
         else:
             self.status |= 2**2
 
-    def add_job(self, job: "canary.Job") -> None:
+    def add_job(self, job: "canary.Job", keep: bool = True) -> None:
         if job.timekeeper._started > 0 and job.timekeeper._finished > 0:
             start = job.timekeeper._started
             finish = job.timekeeper._finished
@@ -500,4 +536,6 @@ class TestData:
             if finish > self.stop:
                 self.stop = finish
         self.update_status(job)
-        self.jobs.append(job)
+        self.count += 1
+        if keep:
+            self.jobs.append(job)
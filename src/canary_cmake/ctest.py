@@ -2,6 +2,8 @@
 #
 # SPDX-License-Identifier: MIT
 
+import functools
+import hashlib
 import io
 import json
 import os
@@ -16,6 +18,7 @@ import schema
 import canary
 from _canary.generator import AbstractTestGenerator
 from _canary.status import Status
+from _canary.util import json_helper
 
 warning_cache: set[str] = set()
 
@@ -119,18 +122,21 @@ class CTestTestGenerator(AbstractTestGenerator):
             for fixture_name in spec.attributes["fixtures"]["cleanup"]:
                 cleanup_fixtures.setdefault(fixture_name, []).append(spec)
 
+        # Ids of each spec's dependencies, kept in step with spec.dependencies
+        depends_on: dict[int, set[str]] = {
+            id(spec): {dep.spec.id for dep in spec.dependencies} for spec in specs
+        }
+
         for spec in specs:
             for fixture_name in spec.attributes["fixtures"]["required"]:
-                if fixture_name in setup_fixtures:
-                    for fixture in setup_fixtures[fixture_name]:
-                        if fixture not in [_.spec for _ in spec.dependencies]:
-                            dep = SpecDependency(spec=fixture, when="on_success")
-                            spec.dependencies.append(dep)
-                if fixture_name in cleanup_fixtures:
-                    for fixture in cleanup_fixtures[fixture_name]:
-                        if spec not in [_.spec for _ in spec.dependencies]:
-                            dep = SpecDependency(spec=spec, when="on_success")
-                            fixture.dependencies.append(dep)
+                for fixture in setup_fixtures.get(fixture_name, []):
+                    if fixture.id not in depends_on[id(spec)]:
+                        spec.dependencies.append(SpecDependency(spec=fixture, when="on_success"))
+                        depends_on[id(spec)].add(fixture.id)
+                for fixture in cleanup_fixtures.get(fixture_name, []):
+                    if spec.id not in depends_on[id(fixture)]:
+                        fixture.dependencies.append(SpecDependency(spec=spec, when="on_success"))
+                        depends_on[id(fixture)].add(spec.id)
 
     def resolve_inter_dependencies(self, irs: list["canary.JobSpecIR"]) -> list["canary.JobSpec"]:
         from _canary.generate import resolve
@@ -442,6 +448,143 @@ def parse_np(args: list[str]) -> int | None:
 
 
 def load(file: str) -> dict[str, Any]:
+    """Use ctest --show-only, reusing the tests of CTestTestfile.cmake files that have not changed
+    since the last call.
+
+    The cache records, for every CTestTestfile.cmake reachable from ``file`` through ``subdirs``,
+    its mtime and size, its subdirectories, the mtime and size of the files it includes (test lists
+    written at build time by ``gtest_discover_tests`` and friends), and the tests it defines.
+    Only the topmost directories whose files changed are queried again.
+
+    """
+    ctest = canary.filesystem.which("ctest", required=True)
+    assert ctest is not None
+
+    root = os.path.abspath(file)
+    key = {"version": ctest_cache_version, "ctest": ctest_version(ctest)}
+    key["config"] = canary.config.getoption("canary_cmake_ctest_config")
+    cached: dict[str, Any] = {}
+    cache = ctest_cache_file(root)
+    if cache is not None and cache.exists():
+        try:
+            with open(cache) as fh:
+                data = json.load(fh)
+            if all(data.get(k) == v for k, v in key.items()):
+                cached = data["files"]
+        except Exception as e:
+            logger.debug(f"Failed to read ctest cache {cache}: {e}")
+
+    files = ctest_file_tree(root, cached)
+    stale = [f for f, entry in files.items() if "tests" not in entry]
+    for f in stale:
+        if any(is_subdir(f, other) for other in stale if other != f):
+            continue
+        # Tests defined in f and below are replaced by a fresh query of f
+        subtree = [g for g in files if g == f or is_subdir(g, f)]
+        for g in subtree:
+            files[g]["tests"] = {}
+        for name, test in query(f).items():
+            defined_in = next((g for g in subtree if name in files[g]["names"]), f)
+            files[defined_in]["tests"][name] = test
+
+    tests: dict[str, Any] = {}
+    for f, entry in files.items():
+        for name, test in entry["tests"].items():
+            tests[name] = dict(test, file=root)
+    logger.debug(f"Loaded ctest tests from {file} ({len(stale)} of {len(files)} files changed)")
+    if stale and cache is not None:
+        try:
+            json_helper.safesave(cache, {**key, "files": files}, indent=None)
+        except OSError as e:
+            logger.debug(f"Failed to write ctest cache {cache}: {e}")
+    return tests
+
+
+ctest_cache_version = 2
+
+
+def ctest_cache_file(file: str) -> Path | None:
+    """The discovery cache of the ctest file ``file``.  Caches are kept in
+    ``$XDG_CACHE_HOME/canary/ctest``; set ``CANARY_CTEST_CACHE`` to a directory to move them, or
+    to ``0`` to disable caching."""
+    var = os.getenv("CANARY_CTEST_CACHE")
+    if var is not None and var.lower() in ("0", "no", "off", "false"):
+        return None
+    digest = hashlib.sha256(os.path.realpath(file).encode()).hexdigest()[:16]
+    if var:
+        return Path(var) / f"{digest}.json"
+    root = os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return Path(root) / "canary" / "ctest" / f"{digest}.json"
+
+
+@functools.cache
+def ctest_version(ctest: str) -> str:
+    out = subprocess.check_output([ctest, "--version"]).decode("utf-8")
+    return out.splitlines()[0].strip() if out.strip() else ""
+
+
+def ctest_file_tree(file: str, cached: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """Return the CTestTestfile.cmake files reachable from ``file``, in the order ctest visits them.
+    Entries of ``cached`` are reused for files whose mtime and size, and those of the files they
+    include, have not changed.  Files including a path that cannot be resolved are always rescanned
+    """
+    files: dict[str, dict[str, Any]] = {}
+    stack = [file]
+    while stack:
+        f = stack.pop()
+        if f in files or not os.path.exists(f):
+            continue
+        st = os.stat(f)
+        entry = cached.get(f)
+        if (
+            entry is None
+            or [entry["mtime_ns"], entry["size"]] != [st.st_mtime_ns, st.st_size]
+            or entry["includes"] is None
+            or any(file_stamp(i) != stamp for i, stamp in entry["includes"].items())
+        ):
+            with open(f) as fh:
+                names, subdirs, includes = scan_ctestfile(fh.read())
+            dirname = os.path.dirname(f)
+            subdirs = [os.path.join(dirname, d, "CTestTestfile.cmake") for d in subdirs]
+            entry = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "subdirs": subdirs}
+            entry["names"] = names
+            if any("${" in i for i in includes):
+                entry["includes"] = None
+            else:
+                paths = [os.path.join(dirname, i) for i in includes]
+                entry["includes"] = {i: file_stamp(i) for i in paths}
+        files[f] = entry
+        stack.extend(reversed(entry["subdirs"]))
+    return files
+
+
+def scan_ctestfile(text: str) -> tuple[list[str], list[str], list[str]]:
+    """Names of the tests added by, and the subdirectories listed and files included in, a
+    CTestTestfile.cmake"""
+    names = [next(g for g in m.groups()[1:] if g is not None) for m in add_test.finditer(text)]
+    subdirs = [m.group(1) or m.group(2) for m in subdirs_command.finditer(text)]
+    includes = [m.group(1) or m.group(2) for m in include_command.finditer(text)]
+    return names, subdirs, includes
+
+
+def file_stamp(file: str) -> list[int] | None:
+    try:
+        st = os.stat(file)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+add_test = re.compile(r'(?im)^\s*add_test\(\s*(?:\[(=*)\[(.*?)\]\1\]|"([^"]*)"|([^\s)"]+))')
+subdirs_command = re.compile(r'(?im)^\s*subdirs\(\s*(?:"([^"]*)"|([^\s)"]+))\s*\)')
+include_command = re.compile(r'(?im)^\s*include\(\s*(?:"([^"]*)"|([^\s)"]+))')
+
+
+def is_subdir(file: str, parent: str) -> bool:
+    return file.startswith(os.path.dirname(parent) + os.path.sep)
+
+
+def query(file: str) -> dict[str, Any]:
     """Use ctest --show-only"""
     tests: dict[str, Any] = {}
     logger.debug(f"Loading ctest tests from {file}")
@@ -248,6 +248,66 @@ set_tests_properties(dbOnly dbWithFoo createDB setupUsers cleanupDB PROPERTIES R
         assert set([_.spec.id for _ in cleanup_foo.dependencies]) == {foo_only.id, db_with_foo.id}
 
 
+@pytest.mark.skipif(which("cmake") is None, reason="cmake not on PATH")
+def test_load_requeries_only_changed_ctestfiles(tmpdir, monkeypatch):
+    import canary_cmake.ctest as ctest
+
+    monkeypatch.setenv("CANARY_CTEST_CACHE", os.path.join(tmpdir.strpath, "cache"))
+    queried: list[str] = []
+    query = ctest.query
+    monkeypatch.setattr(ctest, "query", lambda f: queried.append(f) or query(f))
+    with working_dir(os.path.join(tmpdir.strpath, "build"), create=True):
+        root = os.path.abspath("CTestTestfile.cmake")
+        sub = os.path.abspath("sub/CTestTestfile.cmake")
+        with open(root, "w") as fh:
+            fh.write('add_test([=[a]=] "ls")\nsubdirs("sub")\n')
+        mkdirp("sub")
+        with open(sub, "w") as fh:
+            fh.write('add_test(b "ls")\n')
+
+        assert list(ctest.load(root)) == ["a", "b"]
+        assert queried == [root]
+        assert list(ctest.load(root)) == ["a", "b"]
+        assert queried == [root]
+
+        with open(sub, "w") as fh:
+            fh.write('add_test(b "ls")\nadd_test("c" "ls")\n')
+        tests = ctest.load(root)
+        assert list(tests) == ["a", "b", "c"]
+        assert queried == [root, sub]
+        assert tests["c"]["file"] == root
+        assert len(os.listdir(os.path.join(tmpdir.strpath, "cache"))) == 1
+
+
+@pytest.mark.skipif(which("cmake") is None, reason="cmake not on PATH")
+def test_load_requeries_ctestfiles_whose_includes_changed(tmpdir, monkeypatch):
+    import canary_cmake.ctest as ctest
+
+    monkeypatch.setenv("CANARY_CTEST_CACHE", os.path.join(tmpdir.strpath, "cache"))
+    queried: list[str] = []
+    query = ctest.query
+    monkeypatch.setattr(ctest, "query", lambda f: queried.append(f) or query(f))
+    with working_dir(os.path.join(tmpdir.strpath, "build"), create=True):
+        root = os.path.abspath("CTestTestfile.cmake")
+        # Like the test lists written at build time by gtest_discover_tests
+        tests = os.path.abspath("unit_tests.cmake")
+        with open(root, "w") as fh:
+            fh.write(f'if(EXISTS "{tests}")\n  include("{tests}")\nelse()\n')
+            fh.write('  add_test(unit_NOT_BUILT "ls")\nendif()\n')
+
+        assert list(ctest.load(root)) == ["unit_NOT_BUILT"]
+        with open(tests, "w") as fh:
+            fh.write('add_test(unit.a "ls")\n')
+        assert list(ctest.load(root)) == ["unit.a"]
+        assert list(ctest.load(root)) == ["unit.a"]
+        assert queried == [root, root]
+
+        with open(tests, "w") as fh:
+            fh.write('add_test(unit.a "ls")\nadd_test(unit.b "ls")\n')
+        assert list(ctest.load(root)) == ["unit.a", "unit.b"]
+        assert queried == [root, root, root]
+
+
 class Hook:
     def __init__(self, pool):
         self.pool = pool
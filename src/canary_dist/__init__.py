@@ -5,14 +5,13 @@ import argparse
 import json
 import os
 from pathlib import Path
+from typing import TYPE_CHECKING
 from typing import Any
 
 import canary
 
-from .batchexec import HPCConnectDistRunner
-from .conductor import DistributedPoolConductor
-from .executor import DistributedPoolExecutor
-from .status import print_resource_pool_status
+if TYPE_CHECKING:
+    from .batchexec import HPCConnectDistRunner
 
 logger = canary.get_logger(__name__)
 
@@ -23,6 +22,8 @@ def canary_cmdline_modifyargs(parser: "canary.Parser", args: argparse.Namespace)
     command = getattr(args, "command", None)
     subcommand = getattr(args, "dist_cmd", None)
     if command == "dist" and subcommand in ("run", "status"):
+        from .conductor import DistributedPoolConductor
+
         DistributedPoolConductor.validate_and_set_defaults(args)
 
 
@@ -31,6 +32,9 @@ class Distributed(canary.CanarySubcommand):
     description = "Manage testing across a distributed pool of machines"
 
     def setup_parser(self, parser: "canary.Parser") -> None:
+        from .conductor import DistributedPoolConductor
+        from .executor import DistributedPoolExecutor
+
         subparsers = parser.add_subparsers(metavar="", dest="dist_cmd", title="subcommands")
 
         p = subparsers.add_parser("status", help="Show the status of machines in pool")
@@ -43,6 +47,10 @@ class Distributed(canary.CanarySubcommand):
         DistributedPoolExecutor.setup_parser(p)
 
     def execute(self, args):
+        from .conductor import DistributedPoolConductor
+        from .executor import DistributedPoolExecutor
+        from .status import print_resource_pool_status
+
         if args.dist_cmd == "status":
             server = getattr(args, "dist_server_url", None)
             assert server is not None
@@ -115,4 +123,7 @@ def fill_dist_resource_pool(server_url: str) -> dict[str, Any]:
     from .adapter import DistributedResourcePoolAdapter
 
     dpool = DistributedResourcePoolAdapter(server_url=server_url)
-    return dpool.to_resource_pool()
+    try:
+        return dpool.to_resource_pool()
+    finally:
+        dpool.close()
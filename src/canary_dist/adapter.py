@@ -2,14 +2,11 @@
 #
 # SPDX-License-Identifier: MIT
 
-import getpass
-import json
-import os
-import subprocess
+import threading
+import time
 from collections import Counter
 from typing import IO
 from typing import Any
-from urllib.parse import urlencode
 
 import yaml
 
@@ -18,6 +15,9 @@ from _canary.resource_pool.rpool import NodeRequest
 from _canary.resource_pool.rpool import Outcome
 from _canary.resource_pool.rpool import ResourceUnavailable
 
+from .client import HTTPClient
+from .client import HTTPError
+
 logger = canary.get_logger(__name__)
 
 
@@ -47,15 +47,32 @@ class DistributedResourcePoolAdapter:
         }
 
     Checkin uses the allocation metadata to release the server-side transaction.
+
+    Requests are sent with an in-process :class:`~canary_dist.client.HTTPClient`.  Server state is
+    cached for ``state_ttl`` seconds and invalidated by checkouts and checkins.  Checkins are queued
+    and released in the background, using the server's batched ``/checkin/batch`` endpoint when
+    it is available; pending checkins are always sent before the next checkout.  Checkins the
+    server did not accept are raised as :class:`CheckinError` by :meth:`flush` and :meth:`close`.
     """
 
-    def __init__(self, *, server_url: str) -> None:
+    def __init__(self, *, server_url: str, client: Any = None, state_ttl: float = 2.0) -> None:
         if "://" not in server_url:
             server_url = f"http://{server_url}"
 
         self.server_url = server_url.rstrip("/")
+        self.client = client or HTTPClient(self.server_url)
+        self.state_ttl = state_ttl
         self.resource_counts: dict[str, dict[str, int]] = {}
         self.resource_types: list[str] = []
+        self._state: tuple[float, dict[str, Any]] | None = None
+        self._last_rx = -1.0
+        self._batch_endpoints: dict[str, bool] = {}
+        self._pending_checkins: list[str] = []
+        self._checkin_cv = threading.Condition()
+        self._checkins_in_flight = 0
+        self._failed_checkins: list[str] = []
+        self._checkin_thread: threading.Thread | None = None
+        self._closing = False
         self.update_resource_counts()
 
     def __repr__(self) -> str:
@@ -140,9 +157,18 @@ class DistributedResourcePoolAdapter:
         data = self.current_state()
         yaml.dump(data, file, default_flow_style=False)
 
-    def current_state(self) -> dict[str, Any]:
-        p = self.curl("/status", method="GET")
-        return self.parse_json_response(p)
+    def current_state(self, max_age: float | None = None) -> dict[str, Any]:
+        """Return the server state, reusing a copy fetched less than ``max_age`` seconds ago"""
+        max_age = self.state_ttl if max_age is None else max_age
+        now = time.monotonic()
+        if self._state is not None and now - self._state[0] < max_age:
+            return self._state[1]
+        data = self.request("/status", method="GET")
+        self._state = (now, data)
+        return data
+
+    def invalidate_state(self) -> None:
+        self._state = None
 
     def max_count(self, type: str) -> int:
         return max((counts.get(type, 0) for counts in self.resource_counts.values()), default=0)
@@ -153,8 +179,7 @@ class DistributedResourcePoolAdapter:
             resources = _single_node_resources(case.required_resources())
         except ResourceUnavailable as e:
             return Outcome(False, reason=str(e))
-        p = self.curl("/accommodates", data={"resources": resources})
-        data = self.parse_json_response(p)
+        data = self.request("/accommodates", data={"resources": resources})
         return Outcome(data["accommodates"], reason=data["reason"])
 
     def accommodates(self, case: canary.TestCase) -> Outcome:
@@ -210,20 +235,31 @@ class DistributedResourcePoolAdapter:
                 "resources": {...}
             }
         """
-        # Run the health check first to check in expired checkouts.
-        self.curl("/rx")
-
+        self.prepare_checkout()
+        request_data = self._checkout_request(request, **kwds)
+        data = self.request("/checkout", data=request_data)
+        self.invalidate_state()
+        return self._allocation(data)
+
+    def prepare_checkout(self) -> None:
+        """Release pending checkins and, at most once per ``state_ttl``, run the server's health
+        check so that expired checkouts are checked in."""
+        self._wait_for_checkins()
+        now = time.monotonic()
+        if now - self._last_rx >= self.state_ttl:
+            self.request("/rx")
+            self._last_rx = now
+
+    def _checkout_request(self, request: list[NodeRequest], **kwds: Any) -> dict[str, Any]:
         tags = canary.config.getoption("dist_tags") or None
         groups = self._current_groups()
         timeout: float = kwds.get("timeout", 60.0 * 30.0)
 
         # The distributed server does not support multi-node submission.
         resources = _single_node_resources(request)
-        request_data = {"resources": resources, "timeout": timeout, "tags": tags, "groups": groups}
-
-        p = self.curl("/checkout", data=request_data)
-        data = self.parse_json_response(p)
+        return {"resources": resources, "timeout": timeout, "tags": tags, "groups": groups}
 
+    def _allocation(self, data: dict[str, Any]) -> dict[str, Any]:
         if not data["success"]:
             raise ResourceUnavailable(data["message"])
 
@@ -242,52 +278,125 @@ class DistributedResourcePoolAdapter:
         }
 
     def checkin(self, allocation: dict[str, Any]) -> None:
-        """Release a server-side distributed resource allocation."""
+        """Queue the release of a server-side distributed resource allocation.
+
+        Checkins are sent by a background thread; call :meth:`flush` to wait for them.
+        """
         metadata = allocation.get("metadata", {})
         transaction_id = metadata.get("transaction_id")
 
         if not transaction_id:
             raise ValueError("Distributed allocation is missing metadata.transaction_id")
 
-        p = self.curl("/checkin", data={"transaction_id": transaction_id})
-        data = self.parse_json_response(p)
-
-        if not data["success"]:
-            logger.error(f"Failed to checkin resources for {transaction_id}")
-
-    def curl(
-        self, endpoint: str, method: str = "POST", data: Any = None, **parameters: str
-    ) -> subprocess.CompletedProcess:
-        url = f"{self.server_url}{endpoint}"
-
-        if parameters:
-            querystrings = urlencode(parameters)
-            url += f"?{querystrings}"
-
-        args = ["curl", "-s", "-g", "--fail-with-body"]
-        args.extend(["-X", method])
-        args.extend(["-H", f"X-User: {getpass.getuser()}"])
-        args.extend(["-H", f"X-Host: {os.uname().nodename}"])
-        args.append(url)
-
-        if data is not None:
-            args.extend(["-H", "Content-Type: application/json"])
-            payload = json.dumps(data, separators=(",", ":"), indent=None)
-            args.extend(["-d", payload])
-
-        return subprocess.run(args, capture_output=True, text=True)
+        with self._checkin_cv:
+            if self._closing:
+                raise RuntimeError(f"{self!r} is closed")
+            self._pending_checkins.append(transaction_id)
+            if self._checkin_thread is None:
+                self._checkin_thread = threading.Thread(target=self._checkin_loop, daemon=True)
+                self._checkin_thread.start()
+            self._checkin_cv.notify_all()
+
+    def flush(self) -> None:
+        """Wait until all queued checkins have been sent.
+
+        Raises:
+          CheckinError: if the server did not accept one or more of the checkins sent since the
+            last call to ``flush``.
+        """
+        self._wait_for_checkins()
+        with self._checkin_cv:
+            failed, self._failed_checkins = self._failed_checkins, []
+        if failed:
+            raise CheckinError(failed)
 
-    def parse_json_response(self, p: subprocess.CompletedProcess) -> Any:
-        if p.returncode != 0:
-            message = (p.stderr or p.stdout or "").strip()
-            if not message:
-                message = f"curl failed with return code {p.returncode}"
-            raise RuntimeError(message)
+    def close(self) -> None:
+        """Send pending checkins, stop the checkin thread, and close the server connections.
 
+        Raises:
+          CheckinError: if the server did not accept one or more checkins.
+        """
+        self._wait_for_checkins()
+        with self._checkin_cv:
+            self._closing = True
+            self._checkin_cv.notify_all()
+        if self._checkin_thread is not None:
+            self._checkin_thread.join()
+            self._checkin_thread = None
+        self.client.close()
+        self.flush()
+
+    def _wait_for_checkins(self) -> None:
+        with self._checkin_cv:
+            while self._pending_checkins or self._checkins_in_flight:
+                self._checkin_cv.wait()
+
+    def _checkin_loop(self) -> None:
+        while True:
+            with self._checkin_cv:
+                while not self._pending_checkins and not self._closing:
+                    self._checkin_cv.wait()
+                if not self._pending_checkins:
+                    return
+                transaction_ids = self._pending_checkins
+                self._pending_checkins = []
+                self._checkins_in_flight = len(transaction_ids)
+            failed = transaction_ids
+            try:
+                failed = self._send_checkins(transaction_ids)
+            except Exception:
+                logger.exception(f"Failed to checkin resources for {', '.join(transaction_ids)}")
+            finally:
+                self.invalidate_state()
+                with self._checkin_cv:
+                    self._failed_checkins.extend(failed)
+                    self._checkins_in_flight = 0
+                    self._checkin_cv.notify_all()
+
+    def _send_checkins(self, transaction_ids: list[str]) -> list[str]:
+        """Release ``transaction_ids`` and return the ones the server did not accept"""
+        failed: list[str] = []
+        if len(transaction_ids) > 1:
+            try:
+                data = self._batch_request("/checkin/batch", {"transaction_ids": transaction_ids})
+            except BatchUnsupported:
+                pass
+            else:
+                results = data.get("results", {})
+                failed.extend(id for id in transaction_ids if not results.get(id, False))
+                for id in failed:
+                    logger.error(f"Failed to checkin resources for {id}")
+                return failed
+        for i, transaction_id in enumerate(transaction_ids):
+            try:
+                data = self.request("/checkin", data={"transaction_id": transaction_id})
+            except Exception:
+                logger.exception(f"Failed to checkin resources for {transaction_id}")
+                return failed + transaction_ids[i:]
+            if not data["success"]:
+                logger.error(f"Failed to checkin resources for {transaction_id}")
+                failed.append(transaction_id)
+        return failed
+
+    def _batch_request(self, endpoint: str, data: Any) -> Any:
+        """Send ``data`` to a batched endpoint, raising BatchUnsupported if the server lacks it"""
+        if self._batch_endpoints.get(endpoint) is False:
+            raise BatchUnsupported(endpoint)
         try:
-            return json.loads(p.stdout)
-        except json.JSONDecodeError as exc:
-            raise RuntimeError(f"Server returned non-JSON response: {p.stdout!r}") from exc
+            response = self.request(endpoint, data=data)
+        except HTTPError as e:
+            if e.status not in (404, 405, 501):
+                raise
+            logger.debug(f"{self.server_url}{endpoint} not available, using unbatched requests")
+            self._batch_endpoints[endpoint] = False
+            raise BatchUnsupported(endpoint) from None
+        self._batch_endpoints[endpoint] = True
+        return response
+
+    def request(
+        self, endpoint: str, method: str = "POST", data: Any = None, **parameters: str
+    ) -> Any:
+        return self.client.request(endpoint, method=method, data=data, **parameters)
 
     def max_capacity_by_type(self) -> dict[str, int]:
         """Return max eligible per-machine capacity by resource type.
@@ -329,6 +438,18 @@ class DistributedResourcePoolAdapter:
         return None
 
 
+class BatchUnsupported(Exception):
+    """The server does not provide a batched endpoint"""
+
+
+class CheckinError(RuntimeError):
+    """Raised when the server did not release one or more distributed allocations"""
+
+    def __init__(self, transaction_ids: list[str]) -> None:
+        super().__init__(f"Failed to checkin resources for {', '.join(transaction_ids)}")
+        self.transaction_ids = transaction_ids
+
+
 def _with_node(
     resources: dict[str, list[dict[str, Any]]], node: str
 ) -> dict[str, list[dict[str, Any]]]:
@@ -0,0 +1,135 @@
+# Copyright NTESS. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: MIT
+"""In-process HTTP client for the distributed resource-pool server.
+
+Requests are sent over persistent (keep-alive) connections taken from a small, thread-safe pool
+so that checkouts and checkins issued from many worker threads do not each pay for a new
+process and TCP handshake.
+"""
+
+import getpass
+import http.client
+import json
+import os
+import queue
+import socket
+import threading
+from typing import Any
+from urllib.parse import urlencode
+from urllib.parse import urlsplit
+
+import canary
+
+logger = canary.get_logger(__name__)
+
+
+class HTTPError(RuntimeError):
+    """Raised when the server responds with an HTTP error status"""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class HTTPClient:
+    """JSON-over-HTTP client with a pool of persistent connections
+
+    Args:
+      server_url: The base server URL, e.g. ``http://host:port``
+      timeout: Socket timeout, in seconds
+      pool_size: Maximum number of idle connections kept open
+
+    """
+
+    def __init__(self, server_url: str, timeout: float = 60.0, pool_size: int = 8) -> None:
+        parts = urlsplit(server_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme {parts.scheme!r}")
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.idle: queue.LifoQueue[http.client.HTTPConnection] = queue.LifoQueue(pool_size)
+        self.headers = {
+            "X-User": getpass.getuser(),
+            "X-Host": os.uname().nodename,
+            "Accept": "application/json",
+        }
+        self.lock = threading.Lock()
+        self.opened = 0
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.scheme}://{self.netloc}{self.prefix})"
+
+    def request(
+        self, endpoint: str, method: str = "POST", data: Any = None, **parameters: str
+    ) -> Any:
+        """Send a request to ``endpoint`` and return the decoded JSON response"""
+        path = f"{self.prefix}{endpoint}"
+        if parameters:
+            path += f"?{urlencode(parameters)}"
+        headers = dict(self.headers)
+        body: bytes | None = None
+        if data is not None:
+            body = json.dumps(data, separators=(",", ":"), indent=None).encode()
+            headers["Content-Type"] = "application/json"
+        # A pooled connection may have been closed by the server while idle.  Requests are retried
+        # once on a fresh connection in that case, but only if the request could not have reached
+        # the server: once a checkout or checkin has been sent, resending it could allocate or
+        # release resources twice.  Idempotent GET requests are always safe to retry.
+        for attempt in range(2):
+            conn, reused = self.acquire()
+            sent = False
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                sent = True
+                response = conn.getresponse()
+                text = response.read()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                if reused and attempt == 0 and (not sent or method == "GET"):
+                    continue
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self.release(conn)
+            break
+        if response.status >= 400:
+            message = text.decode(errors="replace").strip()
+            raise HTTPError(response.status, message or f"HTTP {response.status} {response.reason}")
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise RuntimeError(f"Server returned non-JSON response: {text!r}") from exc
+
+    def acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        try:
+            return self.idle.get_nowait(), True
+        except queue.Empty:
+            pass
+        conn: http.client.HTTPConnection
+        if self.scheme == "https":
+            conn = http.client.HTTPSConnection(self.netloc, timeout=self.timeout)
+        else:
+            conn = http.client.HTTPConnection(self.netloc, timeout=self.timeout)
+        # Requests are small and latency bound: do not let Nagle's algorithm hold them back
+        conn.connect()
+        conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.lock:
+            self.opened += 1
+        return conn, False
+
+    def release(self, conn: http.client.HTTPConnection) -> None:
+        try:
+            self.idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
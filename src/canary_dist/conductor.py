@@ -126,8 +126,11 @@ class DistributedPoolConductor:
         executor = DistExecutor()
         max_workers = canary.config.getoption("workers") or -1
 
-        with ResourceQueueExecutor(queue, executor, max_workers=max_workers) as ex:
-            ex.run(backend=self.backend.name)
+        try:
+            with ResourceQueueExecutor(queue, executor, max_workers=max_workers) as ex:
+                ex.run(backend=self.backend.name)
+        finally:
+            self.dpool.close()
 
         return True
 
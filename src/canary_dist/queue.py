@@ -18,7 +18,7 @@ class ResourceQueue(queue.ResourceQueue):
         with self.lock:
             if batch.id not in self._busy:
                 raise RuntimeError(f"Job {batch} is not running")
-            self._finished[batch.id] = self._busy.pop(batch.id)
+            self._retire(self._busy.pop(batch.id))
             if batch.exclusive:
                 self.exclusive_job_id = None
                 logger.debug(f"Exclusive job {batch.id} finished, exclusive lock released")
@@ -2,8 +2,8 @@
 #
 # SPDX-License-Identifier: MIT
 
-import subprocess
 from typing import Any
+from typing import cast
 
 import pytest
 
@@ -20,22 +20,28 @@ def counted_node_request(**counts: int) -> NodeRequest:
     return req
 
 
-class FakeAdapter(DistributedResourcePoolAdapter):
-    def __init__(self, *, responses: dict[str, dict[str, Any]]) -> None:
-        self.server_url = "http://server"
+class FakeClient:
+    def __init__(self, responses: dict[str, dict[str, Any]]) -> None:
         self.responses = responses
         self.requests: list[tuple[str, str, Any, dict[str, str]]] = []
-        self.resource_counts: dict[str, dict[str, int]] = {}
-        self.resource_types: list[str] = []
 
-    def curl(
+    def request(
         self, endpoint: str, method: str = "POST", data: Any = None, **parameters: str
-    ) -> subprocess.CompletedProcess:
+    ) -> Any:
         self.requests.append((endpoint, method, data, parameters))
-        payload = self.responses.get(endpoint, {"success": True})
-        return subprocess.CompletedProcess(
-            args=["curl"], returncode=0, stdout=__import__("json").dumps(payload), stderr=""
-        )
+        if endpoint == "/status":
+            return self.responses.get(endpoint, {"success": True, "database": {}})
+        return self.responses.get(endpoint, {"success": True})
+
+    def close(self) -> None:
+        pass
+
+
+class FakeAdapter(DistributedResourcePoolAdapter):
+    def __init__(self, *, responses: dict[str, dict[str, Any]]) -> None:
+        super().__init__(server_url="http://server", client=FakeClient(responses), state_ttl=0.0)
+        self.requests = cast(FakeClient, self.client).requests
+        self.requests.clear()
 
 
 def test_with_node_adds_node_to_flat_server_resources():
@@ -190,6 +196,7 @@ def test_checkin_uses_transaction_id():
     allocation = {"metadata": {"transaction_id": "tx-1"}, "resources": {}}
 
     adapter.checkin(allocation)
+    adapter.flush()
 
     assert adapter.requests == [("/checkin", "POST", {"transaction_id": "tx-1"}, {})]
 
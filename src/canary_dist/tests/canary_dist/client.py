@@ -0,0 +1,212 @@
+# Copyright NTESS. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import http.client
+import http.server
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from _canary.resource_pool.rpool import NodeRequest
+from canary_dist.adapter import CheckinError
+from canary_dist.adapter import DistributedResourcePoolAdapter
+from canary_dist.client import HTTPClient
+from canary_dist.client import HTTPError
+
+
+class PoolStandIn(http.server.ThreadingHTTPServer):
+    """Minimal stand-in for the distributed resource-pool server"""
+
+    def __init__(self, cpus: int = 64, batch: bool = True) -> None:
+        super().__init__(("127.0.0.1", 0), PoolHandler)
+        self.cpus = cpus
+        self.batch = batch
+        self.held: dict[str, int] = {}
+        self.transactions = 0
+        self.requests: list[str] = []
+        self.connections: set[int] = set()
+        self.dropped: set[str] = set()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, endpoint: str) -> int:
+        return self.requests.count(endpoint)
+
+    def state(self) -> dict:
+        free = self.cpus - sum(self.held.values())
+        cpus = [{"id": str(i), "slots": int(i < free)} for i in range(self.cpus)]
+        machine = {"hostname": "host-a", "state": "online", "resources": {"cpus": cpus}}
+        return {"success": True, "database": {"machines": [machine]}}
+
+    def checkout(self, data: dict) -> dict:
+        slots = sum(r["slots"] for r in data["resources"])
+        if sum(self.held.values()) + slots > self.cpus:
+            return {"success": False, "message": "resources unavailable"}
+        self.transactions += 1
+        id = f"tx-{self.transactions}"
+        self.held[id] = slots
+        resources = {"cpus": [{"id": "0", "slots": slots}]}
+        return {"success": True, "hostname": "host-a", "transaction_id": id, "resources": resources}
+
+    def handle(self, method: str, endpoint: str, data: dict | None) -> tuple[int, dict]:
+        data = data or {}
+        with self.lock:
+            self.requests.append(endpoint)
+            if endpoint == "/status" and method == "GET":
+                return 200, self.state()
+            elif endpoint == "/rx":
+                return 200, {"success": True}
+            elif endpoint == "/checkout":
+                return 200, self.checkout(data)
+            elif endpoint == "/checkin":
+                return 200, {"success": self.held.pop(data["transaction_id"], None) is not None}
+            elif endpoint == "/checkin/batch" and self.batch:
+                ids = data["transaction_ids"]
+                return 200, {"results": {id: self.held.pop(id, None) is not None for id in ids}}
+            return 404, {"message": f"{endpoint} not found"}
+
+
+class PoolHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def respond(self, method: str) -> None:
+        server: PoolStandIn = self.server  # type: ignore
+        server.connections.add(id(self.connection))
+        data = None
+        if length := int(self.headers.get("Content-Length") or 0):
+            data = json.loads(self.rfile.read(length))
+        status, payload = server.handle(method, self.path, data)
+        if self.path in server.dropped:
+            # Act on the request but hang up instead of responding
+            self.close_connection = True
+            return
+        text = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(text)))
+        self.end_headers()
+        self.wfile.write(text)
+
+    def do_GET(self):
+        self.respond("GET")
+
+    def do_POST(self):
+        self.respond("POST")
+
+
+@pytest.fixture
+def pool_server():
+    def factory(**kwds):
+        server = PoolStandIn(**kwds)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        servers.append(server)
+        return server
+
+    servers: list[PoolStandIn] = []
+    yield factory
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def cpus(n: int) -> list[NodeRequest]:
+    req = NodeRequest()
+    req.add("cpus", n)
+    return [req]
+
+
+def test_client_reuses_connections(pool_server):
+    server = pool_server()
+    client = HTTPClient(server.url, pool_size=4)
+    for _ in range(20):
+        assert client.request("/rx") == {"success": True}
+    assert client.opened == 1
+    assert len(server.connections) == 1
+    with pytest.raises(HTTPError) as e:
+        client.request("/missing")
+    assert e.value.status == 404
+    client.close()
+
+
+def test_client_does_not_resend_posts(pool_server):
+    server = pool_server()
+    client = HTTPClient(server.url)
+    assert client.request("/rx") == {"success": True}
+    # The server acted on a POST whose response was lost: it must not be sent again
+    server.dropped.add("/checkout")
+    with pytest.raises(http.client.RemoteDisconnected):
+        client.request("/checkout", data={"resources": [{"type": "cpus", "slots": 1}]})
+    assert server.count("/checkout") == 1
+    assert len(server.held) == 1
+    client.close()
+
+
+def test_adapter_caches_state(pool_server, monkeypatch):
+    monkeypatch.setattr("canary.config.getoption", lambda name, default=None: None)
+    server = pool_server(cpus=8)
+    adapter = DistributedResourcePoolAdapter(server_url=server.url, state_ttl=60.0)
+    adapter.to_resource_pool()
+    assert adapter.max_capacity_by_type()["cpus"] == 8
+    assert not adapter.empty()
+    assert server.count("/status") == 1
+    allocation = adapter.checkout(cpus(2))
+    adapter.update_resource_counts()
+    assert adapter.resource_counts == {"host-a": {"cpus": 6}}
+    assert server.count("/status") == 2
+    adapter.checkin(allocation)
+    adapter.close()
+    assert server.held == {}
+
+
+@pytest.mark.parametrize("batch", [True, False])
+def test_adapter_concurrent_checkout_checkin(pool_server, monkeypatch, batch):
+    monkeypatch.setattr("canary.config.getoption", lambda name, default=None: None)
+    server = pool_server(cpus=64, batch=batch)
+    adapter = DistributedResourcePoolAdapter(server_url=server.url)
+
+    def work(_):
+        allocation = adapter.checkout(cpus(1))
+        adapter.checkin(allocation)
+
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        list(ex.map(work, range(200)))
+    adapter.close()
+
+    assert server.held == {}
+    assert server.count("/checkout") == 200
+    # Connections are pooled rather than opened per request
+    assert len(server.connections) <= 16
+    # The health check is rate limited instead of run before every checkout
+    assert server.count("/rx") < 200
+    if batch:
+        assert server.count("/checkin") + server.count("/checkin/batch") < 200
+
+
+@pytest.mark.parametrize("batch", [True, False])
+def test_adapter_reports_failed_checkins(pool_server, monkeypatch, batch):
+    monkeypatch.setattr("canary.config.getoption", lambda name, default=None: None)
+    server = pool_server(cpus=8, batch=batch)
+    adapter = DistributedResourcePoolAdapter(server_url=server.url)
+    allocations = [adapter.checkout(cpus(1)) for _ in range(3)]
+    server.held.pop("tx-2")
+    for allocation in allocations:
+        adapter.checkin(allocation)
+    thread = adapter._checkin_thread
+    with pytest.raises(CheckinError) as e:
+        adapter.close()
+    assert e.value.transaction_ids == ["tx-2"]
+    assert server.held == {}
+    assert thread is not None and not thread.is_alive()
+    with pytest.raises(RuntimeError):
+        adapter.checkin(allocations[0])
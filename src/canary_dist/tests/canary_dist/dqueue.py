@@ -24,6 +24,9 @@ class FakeBatch:
     def __init__(self, allocation: dict[str, Any]) -> None:
         self._allocation = allocation
 
+    def __iter__(self):
+        return iter([])
+
     def free_resources(self) -> dict[str, Any]:
         allocation = self._allocation
         self._allocation = {"metadata": {}, "resources": {}}
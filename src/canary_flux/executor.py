@@ -2,7 +2,10 @@
 #
 # SPDX-License-Identifier: MIT
 
+import heapq
+import itertools
 import os
+import queue
 import sys
 import time
 from dataclasses import dataclass
@@ -153,8 +156,8 @@ class FluxReporterQueue:
     def jobs(self) -> list[FluxJob]:
         return list(self._jobs)
 
-    def pending(self) -> list[FluxJob]:
-        return [job for job in self._jobs if job.id in self._pending_ids]
+    def pending(self, limit: int | None = None) -> list[FluxJob]:
+        return [job for job in self._jobs if job.id in self._pending_ids][:limit]
 
     def mark_submitted(self, job: FluxJob) -> None:
         self._pending_ids.discard(job.id)
@@ -254,6 +257,35 @@ class FluxDirectExecutor:
         self.futures: dict[Any, str] = {}
         self.slots_by_id: dict[str, ExecutionSlot] = {}
 
+        # Flux future callbacks run on hpc_connect's monitor threads.  They only post
+        # (event, job_id, future) here; the events are handled on the scheduling thread.
+        self.events: queue.SimpleQueue[tuple[str, str, Any]] = queue.SimpleQueue()
+        # Futures that cannot report completion through a callback and must be polled
+        self.unwatched: dict[Any, str] = {}
+        self.poll_interval: float = 0.25
+        self._last_refresh: float = -1.0
+
+        # Readiness is tracked with reverse dependencies: each pending job counts its
+        # unfinished upstreams, and a finishing job only updates its own dependents.
+        self.dependents: dict[str, list[str]] = {}
+        self.waiting_on: dict[str, int] = {}
+        self.candidates: list[tuple[float, int, str]] = []
+        self._order = itertools.count()
+        self.blocked: list[canary.Job] = []
+        for job in runner.jobs:
+            count = 0
+            for dep in job.dependencies:
+                upstream = dep.job
+                if upstream.id in self.pending or not upstream.is_done():
+                    self.dependents.setdefault(upstream.id, []).append(job.id)
+                    count += 1
+            self.waiting_on[job.id] = count
+            job.refresh_readiness()
+            if job.state.is_done():
+                self.blocked.append(job)
+            elif count == 0:
+                self._add_candidate(job)
+
         self.live_reporting = self._should_live_report()
         self.max_concurrent_jobs = int(canary.config.getoption("workers") or -1)
 
@@ -300,9 +332,9 @@ class FluxDirectExecutor:
                 while self.pending or self.futures:
                     progress = False
 
+                    progress |= self._finalize_blocked_jobs()
                     progress |= self._submit_ready_jobs(submitter)
                     progress |= self._poll_finished()
-                    progress |= self._finalize_blocked_jobs()
 
                     self._refresh_running_jobs()
 
@@ -311,7 +343,8 @@ class FluxDirectExecutor:
                             self._finalize_stuck_pending_jobs()
                             break
 
-                        time.sleep(0.25)
+                        # Block until Flux reports the next event rather than sleeping
+                        self._poll_finished(timeout=self.poll_interval)
 
                     if (self.time_limit > 0) and (self.started_on + self.time_limit < time.time()):
                         raise TimeoutError("Session time has expired")
@@ -322,30 +355,60 @@ class FluxDirectExecutor:
 
         return 0
 
-    def _ready_jobs(self) -> list[canary.Job]:
+    def _add_candidate(self, job: canary.Job) -> None:
+        # Negative cost so that heapq pops high-cost jobs first
+        heapq.heappush(self.candidates, (-job.cost(), next(self._order), job.id))
+
+    def _release_dependents(self, job_id: str) -> None:
+        """Update the jobs waiting on ``job_id``, which has just finished"""
+        for dependent_id in self.dependents.pop(job_id, []):
+            self.waiting_on[dependent_id] -= 1
+            job = self.pending.get(dependent_id)
+            if job is None:
+                continue
+            # refresh_readiness marks the job BLOCKED if this upstream violated its criteria
+            job.refresh_readiness()
+            if job.state.is_done():
+                self.blocked.append(job)
+            elif self.waiting_on[dependent_id] == 0:
+                self._add_candidate(job)
+
+    def _ready_jobs(self, limit: int | None = None) -> list[canary.Job]:
+        """Remove and return up to ``limit`` jobs that can be dispatched now, high-cost jobs first.
+        Only jobs whose upstreams have all finished are examined."""
         ready: list[canary.Job] = []
+        held: list[tuple[float, int, str]] = []
+
+        while self.candidates and (limit is None or len(ready) < limit):
+            entry = heapq.heappop(self.candidates)
+            job = self.pending.get(entry[2])
+            if job is None:
+                continue
 
-        for job in list(self.pending.values()):
             job.refresh_readiness()
 
             # refresh_readiness may mark dependency-failed jobs DONE/BLOCKED.
-            if job.state.is_done() or not job.is_runnable():
+            if job.state.is_done():
+                self.blocked.append(job)
+            elif not job.is_runnable():
                 continue
-
-            if job.is_ready():
+            elif job.is_ready():
                 ready.append(job)
+            else:
+                held.append(entry)
 
-        # Match existing behavior loosely: high-cost jobs first.
-        ready.sort(key=lambda job: job.cost(), reverse=True)
+        for entry in held:
+            heapq.heappush(self.candidates, entry)
         return ready
 
     def _submit_ready_jobs(self, submitter: Any) -> bool:
         submitted_any = False
 
-        for job in self._ready_jobs():
-            if not self._can_submit_more():
-                break
+        limit = None
+        if self.max_concurrent_jobs > 0:
+            limit = max(0, self.max_concurrent_jobs - len(self.futures))
 
+        for job in self._ready_jobs(limit=limit):
             # Remove before submit so we do not double-submit if callbacks/logging
             # re-enter or if loop iterations are fast.
             self.pending.pop(job.id, None)
@@ -372,19 +435,16 @@ class FluxDirectExecutor:
             self.futures[future] = job.id
             submitted_any = True
 
-            try:
-                future.add_jobstart_callback(
-                    lambda fut, job_id=job.id: self._mark_flux_started_by_id(job_id)
-                )
-            except AttributeError:
-                pass
-
-            try:
-                future.add_jobid_callback(
-                    lambda fut, job_id=job.id: self._record_flux_jobid(job_id, fut.jobid)
+            for event in ("jobstart", "jobid", "done"):
+                try:
+                    add_callback = getattr(future, f"add_{event}_callback")
+                except AttributeError:
+                    if event == "done":
+                        self.unwatched[future] = job.id
+                    continue
+                add_callback(
+                    lambda fut, event=event, job_id=job.id: self.events.put((event, job_id, fut))
                 )
-            except AttributeError:
-                pass
 
         return submitted_any
 
@@ -392,11 +452,6 @@ class FluxDirectExecutor:
         root = self.runner.workspace.cache_dir / "canary-flux" / self.runner.session / "jobs"
         return root / job.id
 
-    def _can_submit_more(self) -> bool:
-        if self.max_concurrent_jobs <= 0:
-            return True
-        return len(self.futures) < self.max_concurrent_jobs
-
     def _hpc_jobspec(self, job: canary.Job) -> Any:
         import hpc_connect
 
@@ -517,35 +572,58 @@ class FluxDirectExecutor:
             logger.debug("Failed to queue submission-failed job %s", job.id[:7], exc_info=True)
 
         self.notify_listeners("job_finished", slot)
+        self._release_dependents(job.id)
 
-    def _poll_finished(self) -> bool:
+    def _poll_finished(self, timeout: float = 0.0) -> bool:
+        """Handle the Flux events posted since the last call, waiting up to ``timeout`` seconds
+        for the first one.  Returns True if any job finished."""
         finished_any = False
 
-        for future, job_id in list(self.futures.items()):
-            if not future.done():
-                continue
+        events: list[tuple[str, str, Any]] = []
+        try:
+            events.append(
+                self.events.get(timeout=timeout) if timeout > 0 else self.events.get_nowait()
+            )
+            while True:
+                events.append(self.events.get_nowait())
+        except queue.Empty:
+            pass
 
-            finished_any = True
-            self.futures.pop(future, None)
+        for future, job_id in list(self.unwatched.items()):
+            if future.done():
+                self.unwatched.pop(future, None)
+                events.append(("done", job_id, future))
 
-            rc: int | None = None
-            exc: BaseException | None = None
-            proc_info: dict[str, Any] = {}
+        for event, job_id, future in events:
+            if event == "jobstart":
+                self._mark_flux_started_by_id(job_id)
+            elif event == "jobid":
+                self._record_flux_jobid(job_id, future.jobid)
+            elif future in self.futures:
+                finished_any = True
+                self._reap(future, job_id)
 
-            try:
-                rc = future.result()
-            except BaseException as e:
-                exc = e
-            else:
-                try:
-                    proc_info = future.proc_info(timeout=0)
-                except Exception as e:
-                    proc_info = {"exception": repr(e)}
-                    logger.debug("Failed to read proc_info for %s", job_id[:7], exc_info=True)
+        return finished_any
 
-            self._mark_finished(job_id, rc=rc, exc=exc, proc_info=proc_info)
+    def _reap(self, future: Any, job_id: str) -> None:
+        self.futures.pop(future, None)
 
-        return finished_any
+        rc: int | None = None
+        exc: BaseException | None = None
+        proc_info: dict[str, Any] = {}
+
+        try:
+            rc = future.result()
+        except BaseException as e:
+            exc = e
+        else:
+            try:
+                proc_info = future.proc_info(timeout=0)
+            except Exception as e:
+                proc_info = {"exception": repr(e)}
+                logger.debug("Failed to read proc_info for %s", job_id[:7], exc_info=True)
+
+        self._mark_finished(job_id, rc=rc, exc=exc, proc_info=proc_info)
 
     def _cancel_remaining(self) -> None:
         for future, job_id in list(self.futures.items()):
@@ -554,6 +632,7 @@ class FluxDirectExecutor:
             except Exception:
                 logger.debug("Failed to cancel Flux future for %s", job_id[:7], exc_info=True)
         self.futures.clear()
+        self.unwatched.clear()
 
     def _should_live_report(self) -> bool:
         style = canary.config.getoption("console_style") or {}
@@ -575,15 +654,11 @@ class FluxDirectExecutor:
     def _finalize_blocked_jobs(self) -> bool:
         finalized_any = False
 
-        for job in list(self.pending.values()):
-            job.refresh_readiness()
-
-            if not job.state.is_done():
+        while self.blocked:
+            job = self.blocked.pop()
+            if self.pending.pop(job.id, None) is None:
                 continue
 
-            # Expected path: refresh_readiness marked it BLOCKED.
-            self.pending.pop(job.id, None)
-
             self._qrank += 1
             now = time.time()
 
@@ -611,6 +686,7 @@ class FluxDirectExecutor:
                 logger.debug("Failed to queue blocked job %s", job.id[:7], exc_info=True)
 
             self.notify_listeners("job_finished", slot)
+            self._release_dependents(job.id)
             finalized_any = True
 
         return finalized_any
@@ -719,6 +795,7 @@ class FluxDirectExecutor:
         # did workspace.db.queue.put(job). Parent-side queueing here would duplicate
         # result writes.
         self.notify_listeners("job_finished", slot)
+        self._release_dependents(job.id)
 
     def _record_flux_timing(
         self, job: canary.Job, flux_job: FluxJob, *, proc_info: dict[str, Any] | None = None
@@ -841,6 +918,11 @@ class FluxDirectExecutor:
             json.dump(data, fh, indent=2, sort_keys=True)
 
     def _refresh_running_jobs(self) -> None:
+        # Each refresh reads every running job's lock file, so do it at most once per interval
+        now = time.monotonic()
+        if now - self._last_refresh < self.poll_interval:
+            return
+        self._last_refresh = now
         for slot in list(self.running.values()):
             flux_job = cast(FluxJob, slot.job)
             job = flux_job.inner
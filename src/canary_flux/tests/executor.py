@@ -353,3 +353,123 @@ def test_mark_finished_records_flux_timing_and_overhead(monkeypatch, tmp_path):
     assert overhead["return_seconds"] == 3.0
     assert overhead["return_after_inner_stop_seconds"] == 4.0
     assert overhead["total_external_seconds"] == 4.0
+
+
+class MockFluxFuture:
+    """Like hpc_connect futures, callbacks added after their event has happened run immediately"""
+
+    def __init__(self, name):
+        import threading
+
+        self.jobid = f"f{name}"
+        self.callbacks = {}
+        self.happened = set()
+        self.lock = threading.Lock()
+
+    def add_callback(self, event, fn):
+        with self.lock:
+            if event not in self.happened:
+                self.callbacks[event] = fn
+                return
+        fn(self)
+
+    def add_jobstart_callback(self, fn):
+        self.add_callback("start", fn)
+
+    def add_jobid_callback(self, fn):
+        self.add_callback("jobid", fn)
+
+    def add_done_callback(self, fn):
+        self.add_callback("done", fn)
+
+    def fire(self, event):
+        with self.lock:
+            self.happened.add(event)
+            fn = self.callbacks.pop(event, None)
+        if fn is not None:
+            fn(self)
+
+    def done(self):
+        return "done" in self.happened
+
+    def result(self, timeout=None):
+        return 0
+
+    def proc_info(self, timeout=None):
+        return {}
+
+    def cancel(self):
+        return False
+
+
+class MockFluxHandle:
+    """Stand-in for a Flux submission manager: a single monitor thread starts and completes each
+    submitted job, firing the future's callbacks like hpc_connect's job-event watch"""
+
+    def __init__(self):
+        import queue
+        import threading
+
+        self.submitted = queue.SimpleQueue()
+        self.events = []
+        self.thread = threading.Thread(target=self.monitor, daemon=True)
+        self.thread.start()
+
+    def submit(self, spec, exclusive=False):
+        future = MockFluxFuture(spec.name)
+        self.events.append(("submit", spec.name))
+        self.submitted.put(future)
+        return future
+
+    def monitor(self):
+        while True:
+            future = self.submitted.get()
+            if future is None:
+                return
+            future.fire("start")
+            future.fire("jobid")
+            self.events.append(("done", future.jobid[1:]))
+            future.fire("done")
+
+
+def test_run_throughput_with_mock_flux_handle(monkeypatch, tmp_path):
+    import contextlib
+
+    import hpc_connect
+
+    config = FakeConfig()
+    config.values["workers"] = 64
+    monkeypatch.setattr(ex.canary, "config", config)
+    monkeypatch.setattr(ex, "EventReporter", lambda xtor: contextlib.nullcontext())
+
+    # 2000 chains of 10 jobs, each job depending on the previous job of its chain
+    jobs: list[FakeJob] = []
+    for i in range(20_000):
+        deps = [SimpleNamespace(job=jobs[-1], when=None)] if i % 10 else []
+        jobs.append(FakeJob(f"j{i}", deps=deps, workspace_root=tmp_path))
+
+    handle = MockFluxHandle()
+    backend = SimpleNamespace(submission_manager=lambda: handle)
+    monkeypatch.setattr(hpc_connect, "get_backend", lambda name: backend)
+
+    runner = FakeRunner(jobs, tmp_path)
+    xtor = ex.FluxDirectExecutor(cast(Any, runner))
+    monkeypatch.setattr(xtor, "_hpc_jobspec", lambda job: SimpleNamespace(name=job.id))
+    monkeypatch.setattr(xtor, "_sync_view_on_finish", lambda event, slot: None)
+
+    start = time.monotonic()
+    try:
+        xtor.run()
+    finally:
+        handle.submitted.put(None)
+    elapsed = time.monotonic() - start
+
+    assert len(xtor.finished) == 20_000
+    assert not xtor.pending and not xtor.futures
+    assert all(job.state.is_done() for job in jobs)
+    position = {event: i for i, event in enumerate(handle.events)}
+    for i in range(20_000):
+        if i % 10:
+            assert position[("done", f"j{i - 1}")] < position[("submit", f"j{i}")]
+    # Polling every 0.25 s would need at least 20000 / 64 passes, ie, over a minute
+    assert elapsed < 30.0
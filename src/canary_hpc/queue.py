@@ -4,7 +4,6 @@
 
 import heapq
 import time
-from collections import Counter
 from typing import TypeAlias
 
 import canary
@@ -27,6 +26,9 @@ class ResourceQueue(queue.ResourceQueue):
                 heapq.heappush(self._heap, slot)
                 logger.debug(f"Job {batch.id} added to queue with cost {-slot.cost}")
 
+    def members(self, job: BaseJob) -> list[BaseJob]:
+        return list(job)  # type: ignore
+
     def jobs(self) -> list[BaseJob]:
         jobs: list[BaseJob] = [job for slot in self._heap for job in slot.job]  # type: ignore
         jobs.extend([job for batch in self._busy.values() for job in batch])
@@ -43,27 +45,21 @@ class ResourceQueue(queue.ResourceQueue):
                 return 2, o
             return 1, o
 
+        counts = self.counts()
         with self.lock:
-            done = sum([len(_) for _ in self._finished.values()])
             busy = sum([len(_) for _ in self._busy.values()])
             pending = sum([len(_.job) for _ in self._heap])  # type: ignore
-            total = done + busy + pending
-            totals: Counter[key_type] = Counter()
-            job: canary.Job
-            for batch in self._finished.values():
-                for job in batch:
-                    if job.state.is_done():
-                        key = (job.status.category, job.status.outcome)
-                        totals[key] += 1
-            row: list[str] = []
-            if busy:
-                row.append(f"{busy}/{total} [green]RUNNING[/]")
-            else:
-                row.append(f"{total}/{total} [blue]COMPLETE[/]")
-            for key in sorted(totals, key=sortkey):
-                color = key[0].rich_color()
-                row.append(f"{totals[key]} [{color}]{key[1].name}[/]")
-            if start is not None:
-                duration = hhmmss(time.time() - start)
-                row.append(f"in {duration}")
-            return ", ".join(row)
+        total = counts.done + busy + pending
+        totals = counts.totals
+        row: list[str] = []
+        if busy:
+            row.append(f"{busy}/{total} [green]RUNNING[/]")
+        else:
+            row.append(f"{total}/{total} [blue]COMPLETE[/]")
+        for key in sorted(totals, key=sortkey):
+            color = key[0].rich_color()
+            row.append(f"{totals[key]} [{color}]{key[1].name}[/]")
+        if start is not None:
+            duration = hhmmss(time.time() - start)
+            row.append(f"in {duration}")
+        return ", ".join(row)
@@ -1,12 +1,14 @@
 # Copyright NTESS. See COPYRIGHT file for details.
 #
 # SPDX-License-Identifier: MIT
+import ast
 import errno
 import glob
 import inspect
 import os
 import re
 import sys
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
 from string import Template
@@ -14,7 +16,10 @@ from typing import TYPE_CHECKING
 from typing import Any
 from typing import Callable
 from typing import ClassVar
+from typing import Generator
+from typing import Iterable
 from typing import Literal
+from typing import NoReturn
 from typing import Sequence
 
 from _canary import enums
@@ -28,6 +33,7 @@ from _canary.jobspec import BaselineCopyAction
 from _canary.jobspec import BaselineScriptAction
 from _canary.jobspec import Mask
 from _canary.paramset import ParameterSet
+from _canary.paramset import ParameterSpace
 from _canary.status import Outcome
 from _canary.third_party.monkeypatch import monkeypatch
 from _canary.util import logging
@@ -191,6 +197,21 @@ class PYTModel:
 
         self.command: list[str] = [sys.executable, self.path.name]
 
+        # Results of evaluating conditions and expanding source globs, see memoize()
+        self.memo: dict[tuple, bool] | None = None
+        self.globs: dict[str, list[Path]] | None = None
+
+    @contextmanager
+    def memoize(self) -> Generator[None, None, None]:
+        """Within this block, the result of evaluating each condition is reused for all parameter
+        combinations that agree on the parameters the condition references, and each source glob
+        is expanded once."""
+        self.memo, self.globs = {}, {}
+        try:
+            yield
+        finally:
+            self.memo = self.globs = None
+
     def option_expressions(self) -> list[str]:
         option_expressions: set[str] = set()
         for _, attr in vars(self).items():
@@ -276,7 +297,9 @@ class PYTModel:
         meta_parameters: dict[str, Any] | None = None,
         on_options: list[str] | None = None,
     ) -> str | None:
-        id_spec = self.id.eval(family=family, parameters=parameters, on_options=on_options)
+        id_spec = self.id.eval(
+            family=family, parameters=parameters, on_options=on_options, memo=self.memo
+        )
         if id_spec is None:
             return None
 
@@ -354,14 +377,12 @@ class PYTModel:
     # ----------------------------- getters -----------------------------
 
     def get_families(self, on_options: list[str] | None = None) -> list[str]:
-        names = self.families.eval(on_options=on_options)
+        names = self.families.eval(on_options=on_options, memo=self.memo)
         return names or [self.name]
 
-    def get_parameters(
-        self, family: str, on_options: list[str] | None = None
-    ) -> list[dict[str, Any]]:
-        psets = self.parameter_sets.eval(family=family, on_options=on_options)
-        return ParameterSet.combine(psets)
+    def get_parameters(self, family: str, on_options: list[str] | None = None) -> ParameterSpace:
+        psets = self.parameter_sets.eval(family=family, on_options=on_options, memo=self.memo)
+        return ParameterSpace(psets)
 
     def get_keywords(
         self,
@@ -369,7 +390,9 @@ class PYTModel:
         parameters: dict[str, Any] | None = None,
         on_options: list[str] | None = None,
     ) -> list[str]:
-        return self.keywords.eval(family=family, parameters=parameters, on_options=on_options)
+        return self.keywords.eval(
+            family=family, parameters=parameters, on_options=on_options, memo=self.memo
+        )
 
     def get_timeout(
         self,
@@ -377,7 +400,9 @@ class PYTModel:
         parameters: dict[str, Any] | None = None,
         on_options: list[str] | None = None,
     ) -> float | None:
-        return self.timeout.eval(family=family, parameters=parameters, on_options=on_options)
+        return self.timeout.eval(
+            family=family, parameters=parameters, on_options=on_options, memo=self.memo
+        )
 
     def get_modules(
         self,
@@ -385,7 +410,9 @@ class PYTModel:
         parameters: dict[str, Any] | None = None,
         on_options: list[str] | None = None,
     ) -> list[ModuleSpec]:
-        return self.modules.eval(family=family, parameters=parameters, on_options=on_options)
+        return self.modules.eval(
+            family=family, parameters=parameters, on_options=on_options, memo=self.memo
+        )
 
     def get_rcfiles(
         self,
@@ -393,7 +420,9 @@ class PYTModel:
         parameters: dict[str, Any] | None = None,
         on_options: list[str] | None = None,
     ) -> list[str]:
-        return self.rcfiles.eval(family=family, parameters=parameters, on_options=on_options)
+        return self.rcfiles.eval(
+            family=family, parameters=parameters, on_options=on_options, memo=self.memo
+        )
 
     def get_artifacts(
         self,
@@ -402,7 +431,9 @@ class PYTModel:
         on_options: list[str] | None = None,
         subs: dict[str, Any] | None = None,
     ) -> list[Artifact]:
-        artifacts = self.artifacts.eval(family=family, parameters=parameters, on_options=on_options)
+        artifacts = self.artifacts.eval(
+            family=family, parameters=parameters, on_options=on_options, memo=self.memo
+        )
         if subs:
             for i, a in enumerate(artifacts):
                 artifacts[i] = Artifact(
@@ -417,7 +448,9 @@ class PYTModel:
         on_options: list[str] | None = None,
         subs: dict[str, Any] | None = None,
     ) -> list[Asset]:
-        sources = self.sources.eval(family=family, parameters=parameters, on_options=on_options)
+        sources = self.sources.eval(
+            family=family, parameters=parameters, on_options=on_options, memo=self.memo
+        )
 
         assets: list[Asset] = []
         base_dir = self.file.parent
@@ -435,10 +468,14 @@ class PYTModel:
 
             # Expand globs (relative patterns resolved from the test file directory)
             if _has_glob(src_text):
-                if os.path.isabs(src_text):
+                if self.globs is not None and src_text in self.globs:
+                    matches = self.globs[src_text]
+                elif os.path.isabs(src_text):
                     matches = [Path(p) for p in glob.glob(src_text)]
                 else:
                     matches = sorted(base_dir.glob(src_text))
+                if self.globs is not None:
+                    self.globs[src_text] = matches
 
                 if not matches:
                     logger.warning("source glob matched nothing: %r (from %s)", src_text, self.file)
@@ -471,7 +508,9 @@ class PYTModel:
         on_options: list[str] | None = None,
         subs: dict[str, Any] | None = None,
     ) -> list[BaselineAction]:
-        actions = self.baseline.eval(family=family, parameters=parameters, on_options=on_options)
+        actions = self.baseline.eval(
+            family=family, parameters=parameters, on_options=on_options, memo=self.memo
+        )
         if subs:
             for i, a in enumerate(actions):
                 if isinstance(a, BaselineCopyAction):
@@ -486,7 +525,9 @@ class PYTModel:
         parameters: dict[str, Any] | None = None,
         on_options: list[str] | None = None,
     ) -> bool:
-        return self.exclusive.eval(family=family, parameters=parameters, on_options=on_options)
+        return self.exclusive.eval(
+            family=family, parameters=parameters, on_options=on_options, memo=self.memo
+        )
 
     def get_dependencies(
         self,
@@ -495,7 +536,9 @@ class PYTModel:
         on_options: list[str] | None = None,
         subs: dict[str, Any] | None = None,
     ) -> list[DependencySelector]:
-        deps = self.depends_on.eval(family=family, parameters=parameters, on_options=on_options)
+        deps = self.depends_on.eval(
+            family=family, parameters=parameters, on_options=on_options, memo=self.memo
+        )
         if subs:
             for i, dep in enumerate(deps):
                 deps[i] = DependencySelector(
@@ -511,7 +554,9 @@ class PYTModel:
         parameters: dict[str, Any] | None = None,
         on_options: list[str] | None = None,
     ) -> dict[str, Any]:
-        return self.attributes.eval(family=family, parameters=parameters, on_options=on_options)
+        return self.attributes.eval(
+            family=family, parameters=parameters, on_options=on_options, memo=self.memo
+        )
 
     def get_preload(
         self,
@@ -519,10 +564,16 @@ class PYTModel:
         parameters: dict[str, Any] | None = None,
         on_options: list[str] | None = None,
     ) -> str | None:
-        return self.preload.eval(family=family, parameters=parameters, on_options=on_options)
+        return self.preload.eval(
+            family=family, parameters=parameters, on_options=on_options, memo=self.memo
+        )
 
     def get_enable(self, family=None, parameters=None, on_options=None) -> tuple[bool, str | None]:
         for c in self.enable.items:
+            kwds = dict(family=family, on_options=on_options, parameters=parameters)
+            if c.matches(**kwds, memo=self.memo) == c.value:
+                continue
+            # Evaluate again for the reason, which includes the parameters
             result = c.when.evaluate(testname=family, on_options=on_options, parameters=parameters)
             if c.value is True and not result.value:
                 return False, result.reason
@@ -536,7 +587,9 @@ class PYTModel:
         parameters: dict[str, Any] | None = None,
         on_options: list[str] | None = None,
     ) -> str | None:
-        return self.skip_reason.eval(family=family, parameters=parameters, on_options=on_options)
+        return self.skip_reason.eval(
+            family=family, parameters=parameters, on_options=on_options, memo=self.memo
+        )
 
     def get_xstatus(
         self,
@@ -544,13 +597,17 @@ class PYTModel:
         parameters: dict[str, Any] | None = None,
         on_options: list[str] | None = None,
     ) -> int:
-        xs = self.xstatus.eval(family=family, parameters=parameters, on_options=on_options)
+        xs = self.xstatus.eval(
+            family=family, parameters=parameters, on_options=on_options, memo=self.memo
+        )
         return xs.code if xs is not None else 0
 
     def get_analyze(
         self, family: str | None = None, on_options: list[str] | None = None
     ) -> AnalyzeSpec | None:
-        return self.analyze.eval(family=family, parameters=None, on_options=on_options)
+        return self.analyze.eval(
+            family=family, parameters=None, on_options=on_options, memo=self.memo
+        )
 
     def get_meta_parameters(
         self,
@@ -559,7 +616,7 @@ class PYTModel:
         on_options: list[str] | None = None,
     ) -> dict[str, Any]:
         return self.meta_parameters.eval(
-            family=family, parameters=parameters, on_options=on_options
+            family=family, parameters=parameters, on_options=on_options, memo=self.memo
         )
 
     # ----------------------------- substitution helpers -----------------------------
@@ -768,17 +825,18 @@ class PYTLockEmitter:
     def lock(
         self, model: PYTModel, on_options: list[str] | None = None
     ) -> Sequence["JobSpecIR | JobSpec"]:
-        if model.filter_warnings:
-            with logging.suppress_stream_below(logging.ERROR):
-                return self._lock(model, on_options=on_options)
-        return self._lock(model, on_options=on_options)
+        with model.memoize():
+            if model.filter_warnings:
+                with logging.suppress_stream_below(logging.ERROR):
+                    return self._lock(model, on_options=on_options)
+            return self._lock(model, on_options=on_options)
 
     def _lock(self, model: PYTModel, on_options: list[str] | None = None) -> list[JobSpecIR]:
         irs: list[JobSpecIR] = []
         families = model.get_families(on_options=on_options)
 
         for family in families:
-            param_dicts = model.get_parameters(family, on_options=on_options)
+            param_dicts: Iterable[dict[str, Any]] = model.get_parameters(family, on_options)
             if not param_dicts:
                 param_dicts = [{}]
 
@@ -856,7 +914,9 @@ class PYTLockEmitter:
 
             analyze = model.get_analyze(family, on_options=on_options)
             if analyze is not None:
-                psets = model.parameter_sets.eval(family=family, on_options=on_options)
+                psets = model.parameter_sets.eval(
+                    family=family, on_options=on_options, memo=model.memo
+                )
                 if not any(psets):
                     raise ValueError(
                         "Generation of composite base job requires at least one parameter"
@@ -940,11 +1000,180 @@ class PYTLockEmitter:
         return irs
 
 
+class DynamicDirectives(Exception):
+    """Raised when a file's directives cannot be determined without executing it"""
+
+
+class StaticDirectiveExtractor:
+    """Read ``canary.directives.*`` calls from a file's syntax tree without executing it.
+
+    Only module level statements that cannot affect which directives are recorded are accepted:
+    docstrings, imports, undecorated function definitions, the ``if __name__ == "__main__"``
+    guard, and directive calls whose arguments are literals or attributes of the ``canary``
+    module.  Anything else raises ``DynamicDirectives``.
+
+    """
+
+    def __init__(self, file: Path) -> None:
+        self.file = file
+        self.canary_names: set[str] = set()
+        self.directive_names: set[str] = set()
+
+    def extract(self) -> list[RecordedDirectiveCall]:
+        with open(self.file) as fp:
+            tree = ast.parse(fp.read(), self.file.as_posix())
+        calls: list[RecordedDirectiveCall] = []
+        for node in tree.body:
+            if isinstance(node, ast.Import):
+                self.visit_import(node)
+            elif isinstance(node, ast.ImportFrom):
+                self.visit_import_from(node)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self.visit_function(node)
+            elif isinstance(node, ast.If) and self.is_main_guard(node):
+                continue
+            elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+                continue
+            elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
+                calls.append(self.visit_call(node.value))
+            else:
+                self.dynamic(node, f"{type(node).__name__.lower()} statement")
+        return calls
+
+    def dynamic(self, node: ast.AST, what: str) -> NoReturn:
+        raise DynamicDirectives(f"line {getattr(node, 'lineno', '?')}: {what}")
+
+    def visit_import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            if alias.name == "canary":
+                self.canary_names.add(alias.asname or "canary")
+            elif alias.name.startswith("canary."):
+                if alias.asname is None:
+                    self.canary_names.add("canary")
+                elif alias.name == "canary.directives":
+                    self.directive_names.add(alias.asname)
+            else:
+                self.check_not_local(node, alias.name)
+
+    def visit_import_from(self, node: ast.ImportFrom) -> None:
+        if node.level:
+            self.dynamic(node, "relative import")
+        if node.module != "canary":
+            self.check_not_local(node, node.module or "")
+            return
+        for alias in node.names:
+            if alias.name == "*":
+                self.dynamic(node, "from canary import *")
+            elif alias.name == "directives":
+                self.directive_names.add(alias.asname or alias.name)
+
+    def check_not_local(self, node: ast.AST, module: str) -> None:
+        # A helper module living next to the test could itself call directives when imported
+        root = self.file.parent / module.split(".")[0]
+        if root.with_suffix(".py").exists() or (root / "__init__.py").exists():
+            self.dynamic(node, f"imports local module {module!r}")
+
+    def visit_function(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
+        if node.decorator_list:
+            self.dynamic(node, f"decorated function {node.name!r}")
+        defaults = [d for d in node.args.defaults + node.args.kw_defaults if d is not None]
+        if any(isinstance(n, ast.Call) for d in defaults for n in ast.walk(d)):
+            self.dynamic(node, f"call in default arguments of {node.name!r}")
+
+    @staticmethod
+    def is_main_guard(node: ast.If) -> bool:
+        test = node.test
+        if node.orelse or not isinstance(test, ast.Compare) or len(test.ops) != 1:
+            return False
+        if not isinstance(test.ops[0], ast.Eq):
+            return False
+        sides = [test.left, test.comparators[0]]
+        names = [s.id for s in sides if isinstance(s, ast.Name)]
+        values = [s.value for s in sides if isinstance(s, ast.Constant)]
+        return names == ["__name__"] and values == ["__main__"]
+
+    def directive_name(self, func: ast.expr) -> str | None:
+        if not isinstance(func, ast.Attribute):
+            return None
+        owner = func.value
+        if isinstance(owner, ast.Name) and owner.id in self.directive_names:
+            return func.attr
+        if (
+            isinstance(owner, ast.Attribute)
+            and owner.attr == "directives"
+            and isinstance(owner.value, ast.Name)
+            and owner.value.id in self.canary_names
+        ):
+            return func.attr
+        return None
+
+    def visit_call(self, node: ast.Call) -> RecordedDirectiveCall:
+        name = self.directive_name(node.func)
+        if name is None:
+            self.dynamic(node, f"call to {ast.unparse(node.func)}")
+        args: list[Any] = []
+        for arg in node.args:
+            if isinstance(arg, ast.Starred):
+                self.dynamic(node, "starred argument")
+            args.append(self.value(arg))
+        kwargs: dict[str, Any] = {}
+        for kw in node.keywords:
+            if kw.arg is None:
+                self.dynamic(node, "** argument")
+            kwargs[kw.arg] = self.value(kw.value)
+        return RecordedDirectiveCall(
+            name=name, args=tuple(args), kwargs=kwargs, file=self.file.as_posix(), line=node.lineno
+        )
+
+    def value(self, node: ast.expr) -> Any:
+        try:
+            return ast.literal_eval(node)
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            pass
+        attrs: list[str] = []
+        while isinstance(node, ast.Attribute):
+            attrs.insert(0, node.attr)
+            node = node.value
+        if isinstance(node, ast.Name) and node.id in self.canary_names and attrs:
+            if attrs[0] != "directives":
+                import canary
+
+                obj: Any = canary
+                try:
+                    for attr in attrs:
+                        obj = getattr(obj, attr)
+                except AttributeError:
+                    pass
+                else:
+                    return obj
+        self.dynamic(node, "non-literal directive argument")
+
+
 class PYTLoader:
     def __init__(self, *, file: Path) -> None:
         self.file = file
+        self.method: Literal["ast", "exec"] | None = None
+        self.reason: str | None = None
 
     def parse(self) -> list[RecordedDirectiveCall]:
+        """Return the directives called by ``file``.
+
+        Directives are read from the file's syntax tree when possible; the file is only executed
+        when it uses constructs the static extractor cannot follow.  ``method`` and ``reason``
+        record which path was taken.
+
+        """
+        try:
+            calls = StaticDirectiveExtractor(self.file).extract()
+        except DynamicDirectives as e:
+            self.method, self.reason = "exec", str(e)
+            logger.debug("%s: executing file to record directives (%s)", self.file, e)
+            return self.exec()
+        self.method = "ast"
+        logger.debug("%s: read %d directives statically", self.file, len(calls))
+        return calls
+
+    def exec(self) -> list[RecordedDirectiveCall]:
         import canary
         from _canary import set_file_scanning
 
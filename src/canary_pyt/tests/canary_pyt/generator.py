@@ -190,6 +190,64 @@ canary.directives.timeout("3s")
     assert calls[0].line is not None
 
 
+def test_pyt_loader_reads_literal_directives_without_executing(tmp_path: Path) -> None:
+    text = """
+import canary
+from canary import directives as d
+import module_that_does_not_exist
+
+canary.directives.parameterize(
+    "a,b", [(0, 5), (6, 10)], samples=4, type=canary.random_parameter_space
+)
+d.keywords("fast", when={"options": "long"})
+
+
+def test():
+    return 0
+
+
+if __name__ == "__main__":
+    test()
+"""
+    f = make_test_file(tmp_path, "t.pyt", text=text)
+    loader = PYTLoader(file=f)
+    calls = loader.parse()
+    assert loader.method == "ast"
+    assert [(c.name, c.line) for c in calls] == [("parameterize", 6), ("keywords", 9)]
+    assert calls[0].args == ("a,b", [(0, 5), (6, 10)])
+    assert calls[1].kwargs == {"when": {"options": "long"}}
+    import canary
+
+    assert calls[0].kwargs["type"] is canary.random_parameter_space
+
+
+@pytest.mark.parametrize(
+    "body,reason",
+    [
+        ("n = 3\ncanary.directives.cpus(n)", "assign statement"),
+        ("canary.directives.cpus(len('abc'))", "non-literal"),
+        ("import helper\ncanary.directives.cpus(1)", "local module 'helper'"),
+        ("print('hi')", "call to print"),
+    ],
+)
+def test_pyt_loader_executes_dynamic_files(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, body: str, reason: str
+) -> None:
+    monkeypatch.syspath_prepend(str(tmp_path))
+    make_test_file(tmp_path, "helper.py", text="")
+    f = make_test_file(tmp_path, "t.pyt", text=f"import canary\n{body}\n")
+    loader = PYTLoader(file=f)
+    try:
+        calls = loader.parse()
+    finally:
+        # Executing the file imports helper, do not leave it behind for other tests
+        sys.modules.pop("helper", None)
+    assert loader.method == "exec"
+    assert loader.reason is not None
+    assert reason in loader.reason
+    assert [c.name for c in calls] == ([] if body.startswith("print") else ["cpus"])
+
+
 def test_adapter_apply_populates_model_from_calls(tmp_path: Path) -> None:
     text = """
 import canary
@@ -464,3 +522,41 @@ def test_set_id_template_expands_parent_analyze_with_blank_parameters(tmp_path:
 
     assert sorted(s.id for s in children) == ["deadbeef1", "deadbeef2"]
     assert parent.id == "deadbeef"
+
+
+def test_lock_evaluates_conditions_once_per_projection(tmp_path: Path, monkeypatch) -> None:
+    from _canary.when import When
+    from canary_pyt import pyt
+
+    m = make_model(tmp_path, "x.pyt")
+    (tmp_path / "mesh-1.exo").touch()
+    m.add_parameter_set(ParameterSet.list_parameter_space("np", [1, 2, 4]))
+    m.add_parameter_set(ParameterSet.list_parameter_space("dt", [0.1, 0.2, 0.3, 0.4]))
+    m.add_keywords("big", when={"parameters": "np>2"})
+    m.add_timeout(10, when={"options": "long"})
+    m.add_source(action="copy", src="mesh-*.exo")
+
+    evaluated: list[tuple[str | None, dict | None]] = []
+    evaluate = When.evaluate
+
+    def counting_evaluate(self, **kwds):
+        evaluated.append((self.parameter_expr, kwds.get("parameters")))
+        return evaluate(self, **kwds)
+
+    monkeypatch.setattr(When, "evaluate", counting_evaluate)
+    globbed: list[str] = []
+    glob = pyt.glob.glob
+
+    def counting_glob(pattern: str) -> list[str]:
+        globbed.append(pattern)
+        return glob(pattern)
+
+    monkeypatch.setattr(pyt.glob, "glob", counting_glob)
+    specs = lock_model(m, on_options=["long"])
+    assert len(specs) == 12
+    assert sorted(s.parameters["np"] for s in specs if "big" in s.keywords) == [4] * 4
+    assert all(s.timeout == 10 for s in specs)
+    assert all([a.src.name for a in s.assets] == ["mesh-1.exo"] for s in specs)
+    # One evaluation of "np>2" per value of np
+    assert sum(1 for expr, _ in evaluated if expr == "np>2") == 3
+    assert len(globbed) == 1
@@ -3,12 +3,20 @@
 # SPDX-License-Identifier: MIT
 
 import os
+import tempfile
 
 import pytest
 
 import _canary.config
 import _canary.util.multiprocessing as mp
 
+# Keep the plugin startup and ctest caches out of the user's cache directory.  They are set here,
+# rather than in a fixture, so that they also apply during collection and to processes started by
+# the forkserver
+test_cache = tempfile.TemporaryDirectory(prefix="canary-")
+os.environ["CANARY_STARTUP_CACHE"] = os.path.join(test_cache.name, "startup.json")
+os.environ["CANARY_CTEST_CACHE"] = os.path.join(test_cache.name, "ctest")
+
 mp.initialize()
 
 
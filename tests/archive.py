@@ -0,0 +1,99 @@
+# Copyright NTESS. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import gzip
+import io
+import os
+import tarfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from _canary.job import Job
+from _canary.jobspec import JobSpec
+from _canary.jobstate import JobPhase
+from _canary.plugins.builtin.archive import Archiver
+from _canary.plugins.builtin.archive import read_job_artifacts
+from _canary.testexec import ExecutionSpace
+from _canary.util.compression import ChunkedCompressor
+from _canary.util.compression import codec_for
+
+
+def make_jobs(tmp_path: Path, count: int) -> list[Job]:
+    session = tmp_path / "sessions" / "s1"
+    jobs: list[Job] = []
+    for i in range(count):
+        name = f"case{i}"
+        spec = JobSpec(
+            file_root=tmp_path,
+            file_path=Path(f"{name}.pyt"),
+            family=name,
+            id=f"{i:064x}",
+            timeout=10.0,
+        )
+        spec.add_artifact("*.txt")
+        spec.add_artifact("out")
+        spec.add_artifact("*.log", when="on_failure")
+        job = Job(spec=spec, workspace=ExecutionSpace(root=session, path=Path(name), session="s1"))
+        job.workspace.create(exist_ok=True)
+        (job.workspace.dir / "result.txt").write_text(f"{name}\n" * 1000)
+        (job.workspace.dir / "run.log").write_text("log")
+        (job.workspace.dir / "out/nested").mkdir(parents=True)
+        (job.workspace.dir / "out/nested/data.bin").write_bytes(os.urandom(256))
+        job.status.set(category="PASS", outcome="SUCCESS")
+        jobs.append(job)
+    # The same file reachable from two jobs is archived once
+    os.link(jobs[0].workspace.dir / "result.txt", jobs[1].workspace.dir / "shared.txt")
+    return jobs
+
+
+def test_chunked_compressor_writes_concatenated_members():
+    data = os.urandom(1000) * 100
+    buffer = io.BytesIO()
+    with ChunkedCompressor(buffer, codec="gzip", chunk_size=4096, workers=4) as stream:
+        stream.write(data[:5000])
+        index = stream.cut()
+        stream.write(data[5000:])
+        assert stream.tell() == len(data)
+    assert gzip.decompress(buffer.getvalue()) == data
+    assert len(stream.offsets) > 2
+    assert gzip.decompress(buffer.getvalue()[stream.member_offset(index) :]) == data[5000:]
+
+
+@pytest.mark.parametrize("name", ["artifacts.tgz", "artifacts.tar"])
+def test_archiver_streams_artifacts_with_index(tmp_path, name):
+    jobs = make_jobs(tmp_path, 8)
+    dest = tmp_path / name
+    archiver = Archiver(dest, prefix=tmp_path / "sessions/s1", codec=codec_for(dest), index=True)
+    archiver.finish(SimpleNamespace(jobs=jobs))
+
+    with tarfile.open(dest) as tf:
+        names = tf.getnames()
+    assert "case3/result.txt" in names
+    assert "case3/out/nested/data.bin" in names
+    assert "case3/run.log" not in names
+    assert "case1/shared.txt" not in names
+    assert len(names) == len(set(names)) == 8 * 4
+
+    files = read_job_artifacts(dest, jobs[5].id)
+    assert set(files) == {"case5/result.txt", "case5/out/nested/data.bin"}
+    assert files["case5/result.txt"] == b"case5\n" * 1000
+
+
+def test_archiver_archives_jobs_as_they_finish(tmp_path):
+    jobs = make_jobs(tmp_path, 4)
+    session = SimpleNamespace(jobs=jobs)
+    archiver = Archiver(tmp_path / "a.tgz", prefix=tmp_path / "sessions/s1", interval=0.01)
+    archiver.start(session)
+    jobs[2].state.phase = JobPhase.DONE
+    deadline = time.monotonic() + 10
+    while jobs[2].id not in archiver.archived and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert archiver.archived == {jobs[2].id}
+    archiver.finish(session)
+    assert archiver.archived == {job.id for job in jobs}
+    with tarfile.open(tmp_path / "a.tgz") as tf:
+        assert tf.getnames()[0] == "case2/result.txt"
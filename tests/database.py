@@ -1,3 +1,6 @@
+import sqlite3
+import threading
+import time
 from pathlib import Path
 from types import SimpleNamespace
 from typing import TYPE_CHECKING
@@ -8,6 +11,7 @@ import pytest
 
 from _canary.database import NotASelection
 from _canary.database import WorkspaceDatabase
+from _canary.util import json_helper as json
 from _canary.util.testing import generate_random_jobs
 from _canary.util.testing import generate_random_jobspecs
 
@@ -208,6 +212,218 @@ def test_result_history(db: WorkspaceDatabase, make_session):
     assert {history[0]["session"], history[1]["session"]} == {"s1", "s2"}
 
 
+def test_latest_results_and_compaction(db: WorkspaceDatabase, make_session):
+    session = make_session(db.path.parent, count=4)
+    job = session.jobs[0]
+    job.add_measurement("memory_rss_mb", {"min": 1.0, "max": 12.5, "ave": 6.0})
+    for name in ("s1", "s2", "s3"):
+        for j in session.jobs:
+            j.workspace.session = name
+        db.put_results(*session.jobs)
+    # Writing an older session does not replace the latest result
+    job.workspace.session = "s0"
+    db.put_results(job)
+
+    results = db.get_results()
+    assert {r["session"] for r in results.values()} == {"s3"}
+    row = db.connection.execute(
+        "SELECT started, duration, peak_rss FROM latest_results WHERE spec_id = ?", (job.id,)
+    ).fetchone()
+    assert row == (job.timekeeper._started, job.timekeeper.duration(), 12.5)
+    assert results[job.id]["timekeeper"].duration() == job.timekeeper.duration()
+
+    assert db.compact(keep=1) == 2 * len(session.jobs) + 1
+    assert db.get_results() == results
+    history = db.get_result_history(job.id[:8])
+    assert [r["session"] for r in history] == ["s0", "s1", "s2", "s3"]
+    assert db.compact(keep=1) == 0
+
+
+def test_migrate_timekeeper_to_columns(tmp_path: Path, make_session):
+    session = make_session(tmp_path, count=2)
+    root = tmp_path / "legacy"
+    root.mkdir()
+    conn = sqlite3.connect(root / "workspace.sqlite3")
+    conn.execute(
+        """CREATE TABLE results (
+        spec_id TEXT, spec_name TEXT, spec_fullname TEXT, file_root TEXT, file_path TEXT,
+        session TEXT, workspace TEXT, job_state TEXT, status_category TEXT, status_outcome TEXT,
+        status_reason TEXT, status_code INTEGER, timekeeper TEXT, measurements TEXT,
+        PRIMARY KEY (spec_id, session)
+        )"""
+    )
+    for job in session.jobs:
+        row = WorkspaceDatabase.format_single_result(job)
+        conn.execute(
+            "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            row[:12] + (json.dumps_min(job.timekeeper), row[-1]),
+        )
+    conn.commit()
+    conn.close()
+
+    db = WorkspaceDatabase.create(root)
+    try:
+        results = db.get_results()
+        assert set(results) == {job.id for job in session.jobs}
+        for job in session.jobs:
+            assert results[job.id]["timekeeper"].duration() == pytest.approx(0.6)
+            assert results[job.id]["timekeeper"]._started == job.timekeeper._started
+    finally:
+        db.close()
+
+
+def test_readers_see_consistent_snapshots_during_writes(tmp_path: Path, make_session):
+    session = make_session(tmp_path / "src", count=20)
+    jobs = session.jobs
+    root = tmp_path / "ws"
+    WorkspaceDatabase.create(root).close()
+    batches = -(-50_000 // len(jobs))
+    done = threading.Event()
+    errors: list[BaseException] = []
+    reads: list[int] = []
+
+    def write() -> None:
+        # A dedicated writer, like the ResultListener
+        writer = WorkspaceDatabase.load(root)
+        writer.connect()
+        writer.connection.execute("PRAGMA wal_autocheckpoint=0;")
+        try:
+            for i in range(batches):
+                for job in jobs:
+                    job.workspace.session = f"{i:05d}"
+                writer.put_results(*jobs)
+                if i % 10 == 0:
+                    writer.checkpoint()
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            writer.close()
+            done.set()
+
+    def read() -> None:
+        reader = WorkspaceDatabase.load(root)
+        n = 0
+        try:
+            while not done.is_set():
+                with reader.snapshot() as conn:
+                    count = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+                    latest = conn.execute("SELECT DISTINCT session FROM latest_results").fetchall()
+                    history = reader.get_result_history(jobs[0].id)
+                # Each batch is all or nothing and latest_results agrees with results
+                assert count % len(jobs) == 0
+                assert len(latest) == (1 if count else 0)
+                assert len(history) == count // len(jobs)
+                results = reader.get_results()
+                assert len({r["session"] for r in results.values()}) <= 1
+                n += 1
+                time.sleep(0.001)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            reader.close()
+            reads.append(n)
+
+    threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    assert len(reads) == 3 and all(reads)
+
+    db = WorkspaceDatabase.load(root)
+    try:
+        assert len(db.get_result_history(jobs[-1].id)) == batches
+        busy, log, _ = db.checkpoint("TRUNCATE")
+        assert (busy, log) == (0, 0)
+    finally:
+        db.close()
+
+
+def journal_mode(db: WorkspaceDatabase) -> str:
+    return db.connection.execute("PRAGMA journal_mode;").fetchone()[0]
+
+
+def test_nested_instances_keep_the_rollback_journal(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("CANARY_LEVEL", "1")
+    db = WorkspaceDatabase.create(tmp_path / "nested")
+    try:
+        assert journal_mode(db) == "memory"
+    finally:
+        db.close()
+
+    # ... but leave a database created by the top-level instance in WAL mode
+    monkeypatch.setenv("CANARY_LEVEL", "0")
+    parent = WorkspaceDatabase.create(tmp_path / "parent")
+    monkeypatch.setenv("CANARY_LEVEL", "1")
+    child = WorkspaceDatabase.load(tmp_path / "parent")
+    try:
+        assert journal_mode(parent) == "wal"
+        assert journal_mode(child) == "wal"
+    finally:
+        child.close()
+        parent.close()
+
+
+def test_network_file_systems_keep_the_rollback_journal(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr("_canary.database.is_network_filesystem", lambda path: True)
+    db = WorkspaceDatabase.create(tmp_path / "ws")
+    try:
+        assert journal_mode(db) == "memory"
+    finally:
+        db.close()
+
+
+def test_last_connection_to_close_leaves_wal(tmp_path: Path):
+    first = WorkspaceDatabase.create(tmp_path / "ws")
+    second = WorkspaceDatabase.load(tmp_path / "ws")
+    second.connect()
+    assert journal_mode(first) == "wal"
+    # The switch fails without waiting on the busy timeout while other connections are open
+    start = time.monotonic()
+    first.close()
+    assert time.monotonic() - start < 5
+    assert journal_mode(second) == "wal"
+    second.close()
+    conn = sqlite3.connect(f"{second.path.absolute().as_uri()}?mode=ro", uri=True)
+    try:
+        assert conn.execute("PRAGMA journal_mode;").fetchone()[0] == "delete"
+    finally:
+        conn.close()
+    assert not second.path.with_name(f"{second.path.name}-wal").exists()
+
+
+def test_read_wal_database_without_write_access(tmp_path: Path, make_session, monkeypatch):
+    db = WorkspaceDatabase.create(tmp_path / "ws")
+    session = make_session(tmp_path / "src")
+    db.put_specs([job.spec for job in session.jobs])
+    db.put_results(*session.jobs)
+    # A killed session leaves the database in WAL mode
+    db.connection.close()
+    db._connection = None
+
+    monkeypatch.setattr("_canary.database.os.access", lambda path, mode: False)
+    reader = WorkspaceDatabase.load(tmp_path / "ws")
+    try:
+        assert reader._reader_uri().endswith("&immutable=1")
+        assert len(reader.get_results()) == len(session.jobs)
+    finally:
+        reader.close()
+
+
+def test_iter_results_does_not_hold_a_snapshot(db: WorkspaceDatabase, make_session):
+    session = make_session(db.path.parent, count=20)
+    db.put_specs([job.spec for job in session.jobs])
+    db.put_results(*session.jobs)
+    seen: list[str] = []
+    for batch in db.iter_results(batch_size=7):
+        assert not db.reader.in_transaction
+        seen.extend(result["id"] for result, _ in batch)
+    assert sorted(seen) == sorted(job.id for job in session.jobs)
+    assert len(seen) == len(set(seen))
+
+
 # -----------------------------------------------------------------------------
 # View-based selection
 # -----------------------------------------------------------------------------
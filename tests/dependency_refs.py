@@ -0,0 +1,125 @@
+# Copyright NTESS. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import json
+from pathlib import Path
+
+import pytest
+
+import canary
+from _canary.job import load_lockfile
+from _canary.jobspec import JobSpec
+from _canary.jobspec import SpecDependency
+from _canary.jobspec import SpecReference
+from _canary.testinst import load_instance
+from _canary.util import json_helper
+from _canary.util.filesystem import working_dir
+from _canary.workspace import Workspace
+
+
+def make_chain(root: Path, depth: int) -> list[JobSpec]:
+    (root / "chain.pyt").write_text("import canary\n")
+    specs: list[JobSpec] = []
+    for i in range(depth):
+        deps = [SpecDependency(spec=specs[-1])] if specs else []
+        spec = JobSpec(
+            file_root=root, file_path=Path("chain.pyt"), family=f"t{i}", dependencies=deps
+        )
+        specs.append(spec)
+    return specs
+
+
+@pytest.mark.parametrize("format", [1, 2])
+def test_spec_rows_do_not_grow_with_depth(tmp_path, format):
+    with working_dir(tmp_path), canary.config.override():
+        canary.config.set("workspace:format", format)
+        specs = make_chain(tmp_path, 12)
+        sizes = [len(json_helper.dumps_min(spec)) for spec in specs]
+        if format == 1:
+            assert sizes[-1] > 5 * sizes[1]
+        else:
+            assert max(sizes[1:]) - min(sizes[1:]) < 16
+            data = json_helper.loads(json_helper.dumps_min(specs[-1]))
+            assert isinstance(data.dependencies[0].spec, SpecReference)
+
+        workspace = Workspace.create(tmp_path)
+        workspace.db.put_specs(specs)
+        loaded = {spec.id: spec for spec in workspace.db.load_specs([specs[-1].id])}
+        spec = loaded[specs[-1].id]
+        for expected in reversed(specs[:-1]):
+            (dep,) = spec.dependencies
+            assert isinstance(dep.spec, JobSpec)
+            assert dep.spec.id == expected.id
+            spec = dep.spec
+
+
+def test_lock_files_refer_to_dependencies(tmp_path):
+    root = tmp_path / "refs"
+    root.mkdir()
+    (root / "a.pyt").write_text(
+        """\
+import canary
+
+def test():
+    pass
+
+if __name__ == "__main__":
+    test()
+"""
+    )
+    (root / "b.pyt").write_text(
+        """\
+import canary
+canary.directives.depends_on("a")
+
+def test():
+    self = canary.get_instance()
+    assert self.dependencies[0].name == "a"
+
+if __name__ == "__main__":
+    test()
+"""
+    )
+    (root / "c.pyt").write_text(
+        """\
+import canary
+canary.directives.depends_on("b")
+
+def test():
+    self = canary.get_instance()
+    assert self.dependencies[0].dependencies[0].name == "a"
+
+if __name__ == "__main__":
+    test()
+"""
+    )
+    with working_dir(root), canary.config.override():
+        canary.config.set("workspace:format", 2)
+        workspace = Workspace.create(root)
+        specs = workspace.collect({str(root): []})
+        session = workspace.run(specs, only="all")
+        assert session.returncode == 0
+
+        (c,) = [job for job in workspace.load_jobs() if job.name == "c"]
+        raw = json.loads(c.lockfile.read_text())
+        (dep,) = raw["dependencies"]
+        assert "job" not in dep and dep["job_id"] == c.dependencies[0].job.id
+        assert "spec" not in raw["spec"]["dependencies"][0]
+
+        # Dependencies are resolved from their lock files on load
+        job = load_lockfile(c.lockfile)
+        assert job.dependencies[0].job.name == "b"
+        assert job.dependencies[0].job.dependencies[0].job.name == "a"
+        assert job.spec.dependencies[0].spec.name == "b"
+        instance = load_instance(c.workspace.dir)
+        assert instance.dependencies[0].dependencies[0].name == "a"
+
+        # Format 1 lock files remain readable
+        canary.config.set("workspace:format", 1)
+        c.save()
+        raw = json.loads(c.lockfile.read_text())
+        assert "job" in raw["dependencies"][0]
+        canary.config.set("workspace:format", 2)
+        job = load_lockfile(c.lockfile)
+        assert job.dependencies[0].job.dependencies[0].job.name == "a"
@@ -41,3 +41,86 @@ def test_openfile_rejects_escape(tmp_path):
     with pytest.raises(ValueError):
         with space.openfile("../bad.txt", "w"):
             pass
+
+
+def test_copy_directory_and_files(tmp_path):
+    src = tmp_path / "mesh"
+    for i in range(20):
+        file = src / f"part-{i % 3}" / f"block-{i}.exo"
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(f"block {i}")
+    deck = tmp_path / "input.deck"
+    deck.write_text("deck")
+    deck.chmod(0o750)
+
+    space = ExecutionSpace(root=tmp_path, path=Path("work"))
+    space.create()
+    space.copy(src)
+    space.copy(deck)
+
+    copied = sorted(p.relative_to(space.dir / "mesh") for p in (space.dir / "mesh").rglob("*.exo"))
+    assert copied == sorted(p.relative_to(src) for p in src.rglob("*.exo"))
+    assert (space.dir / "mesh/part-1/block-4.exo").read_text() == "block 4"
+    assert (space.dir / "input.deck").stat().st_mode == deck.stat().st_mode
+
+    # Modifying a copy does not modify the source
+    (space.dir / "input.deck").write_text("changed")
+    assert deck.read_text() == "deck"
+
+
+def test_clonefile_falls_back_to_copy(tmp_path, monkeypatch):
+    from _canary.util import filesystem
+
+    calls: list[str] = []
+
+    def reflink(src, dst):
+        calls.append(str(src))
+        return False
+
+    monkeypatch.setattr(filesystem, "reflink", reflink)
+    monkeypatch.setattr(filesystem, "_reflink_unsupported", set())
+    for name in "ab":
+        (tmp_path / name).write_text(name)
+        filesystem.clonefile(tmp_path / name, tmp_path / f"{name}.copy")
+        assert (tmp_path / f"{name}.copy").read_text() == name
+    # Once cloning fails, it isn't tried again between the same file systems
+    assert calls == [str(tmp_path / "a")]
+
+
+def test_copy_read_only_directory(tmp_path):
+    src = tmp_path / "deck"
+    for i in range(20):
+        file = src / f"sub-{i % 2}" / f"f{i}"
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(str(i))
+    for path in (src / "sub-0", src / "sub-1", src):
+        path.chmod(0o555)
+
+    space = ExecutionSpace(root=tmp_path, path=Path("work"))
+    space.create()
+    try:
+        space.copy(src)
+        assert (space.dir / "deck/sub-1/f3").read_text() == "3"
+        assert len(list((space.dir / "deck").rglob("f*"))) == 20
+        assert (space.dir / "deck/sub-0").stat().st_mode == (src / "sub-0").stat().st_mode
+    finally:
+        for path in (src, src / "sub-0", src / "sub-1"):
+            path.chmod(0o755)
+        for path in (space.dir / "deck").glob("**/"):
+            path.chmod(0o755)
+
+
+def test_reflink_errors_fall_back_to_copy(tmp_path, monkeypatch):
+    import errno
+    import fcntl
+
+    from _canary.util import filesystem
+
+    def ioctl(*args):
+        raise OSError(errno.EIO, "I/O error")
+
+    monkeypatch.setattr(fcntl, "ioctl", ioctl)
+    monkeypatch.setattr(filesystem, "_reflink_unsupported", set())
+    (tmp_path / "a").write_text("a")
+    filesystem.clonefile(tmp_path / "a", tmp_path / "a.copy")
+    assert (tmp_path / "a.copy").read_text() == "a"
@@ -0,0 +1,56 @@
+# Copyright NTESS. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import subprocess
+import sys
+
+# Modules that a test process should never pay for just by running ``import canary``
+heavy_modules = (
+    "_canary.collect",
+    "_canary.config.config",
+    "_canary.database",
+    "_canary.job",
+    "_canary.launcher",
+    "_canary.reporters",
+    "_canary.select",
+    "_canary.workspace",
+    "psutil",
+    "rich",
+    "schema",
+    "yaml",
+)
+
+
+def import_times(code: str) -> dict[str, int]:
+    """Import time, in microseconds, of each module imported by ``code``.  Nested imports are
+    included in the cumulative time of their top-level import and are recorded as 0"""
+    args = [sys.executable, "-X", "importtime", "-c", code]
+    p = subprocess.run(args, capture_output=True, text=True, check=True)
+    times: dict[str, int] = {}
+    for line in p.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) if not name.startswith("  ") else 0
+    return times
+
+
+def test_import_canary_is_lightweight():
+    code = "import canary; canary.get_instance; canary.TestFailed; canary.directives.parameterize"
+    times = import_times(code)
+    loaded = [name for name in heavy_modules if name in times]
+    assert not loaded, f"import canary loaded {', '.join(loaded)}"
+
+
+def test_lazy_attributes_resolve():
+    import canary
+    from _canary.workspace import Workspace
+
+    assert canary.Workspace is Workspace
+    assert canary.ResolvedSpec is canary.JobSpec
+    assert canary.AbstractTestGenerator is canary.AbstractSpecGenerator
+    assert "Workspace" in vars(canary)
+    for name in canary.__all__:
+        assert getattr(canary, name) is not None
@@ -58,3 +58,43 @@ def test_instance_deps(tmpdir):
                     (2, 2, 3),
                     (4, 2, 5),
                 )
+
+
+def test_instance_file(tmpdir):
+    import json
+
+    from _canary.workspace import Workspace
+
+    workdir = os.path.join(tmpdir.strpath, "src")
+    with working_dir(workdir, create=True):
+        with open("a.pyt", "w") as fh:
+            fh.write("import canary\n")
+            fh.write("canary.directives.parameterize('np', [1, 2])\n")
+        with open("b.pyt", "w") as fh:
+            fh.write("import canary\n")
+            fh.write("canary.directives.depends_on(['a.np=1', 'a.np=2'])\n")
+            fh.write("if __name__ == '__main__':\n")
+            fh.write("    self = canary.get_instance()\n")
+            fh.write("    assert [dep.parameters.np for dep in self.dependencies] == [1, 2]\n")
+            fh.write(
+                "    assert all(dep.status.category.name == 'PASS' for dep in self.dependencies)\n"
+            )
+            fh.write("    self.set_attribute(answer=42)\n")
+        with canary.config.override():
+            workspace = Workspace.create(workdir)
+            specs = workspace.collect({workdir: []})
+            session = workspace.run(specs, only="all")
+            assert session.returncode == 0
+            (job,) = [job for job in workspace.load_jobs() if job.name == "b"]
+
+            # The instance file is flat: dependencies are references
+            with open(job.workspace.joinpath(inst.instance_file_name)) as fh:
+                record = json.load(fh)
+            assert [set(ref) for ref in record["dependencies"]] == [{"id", "dir"}] * 2
+            instance = inst.load_instance(job.workspace.dir)
+            assert isinstance(instance.dependencies, inst.DependencyInstances)
+            assert not instance.dependencies.loaded
+            assert instance.get_dependency(np=2).parameters.np == 2
+
+            # Attributes set by the test are merged into the job's lock file
+            assert cj.load_lockfile(job.lockfile).get_attribute("answer") == 42
@@ -190,10 +190,14 @@ def _patch_pluginmanager_and_config(monkeypatch):
         canary_resource_pool_types=lambda: ["cpus", "gpus"],
         canary_resource_pool_count_per_node=lambda type="cpu": 1,
     )
-    monkeypatch.setattr(config, "pluginmanager", types.SimpleNamespace(hook=hook), raising=True)
-    monkeypatch.setattr(config, "getoption", lambda *a, **k: None, raising=True)
-    monkeypatch.setattr(config, "get", lambda *a, **k: None, raising=True)
-    monkeypatch.setattr(config, "serialize", lambda: "CFG", raising=True)
+    # The config module forwards these to the active Config through __getattr__.  Patch the
+    # module namespace so that the undo removes them again: monkeypatch.setattr would restore
+    # them as module attributes bound to the current Config, hiding later overrides
+    namespace = vars(config)
+    monkeypatch.setitem(namespace, "pluginmanager", types.SimpleNamespace(hook=hook))
+    monkeypatch.setitem(namespace, "getoption", lambda *a, **k: None)
+    monkeypatch.setitem(namespace, "get", lambda *a, **k: None)
+    monkeypatch.setitem(namespace, "serialize", lambda: "CFG")
 
 
 @pytest.fixture
@@ -324,3 +328,78 @@ def test_job_save_uses_atomic_tmp_cleanup(spec: JobSpec, space):
 
     loaded = json.loads(job.lockfile.read_text())
     assert loaded.id == job.id
+
+
+def test_job_batched_saves_write_once(spec: JobSpec, space, monkeypatch):
+    job = Job(spec=spec, workspace=space)
+    writes: list[JobPhase] = []
+    safesave = json.safesave
+
+    def counting_safesave(file, obj, **kwargs):
+        writes.append(obj.state.phase)
+        safesave(file, obj, **kwargs)
+
+    monkeypatch.setattr(json, "safesave", counting_safesave)
+    with job.batched_saves():
+        job.save()
+        job.state.phase = JobPhase.RUNNING
+        job.write_lockfile()
+        with job.batched_saves():
+            job.state.phase = JobPhase.DONE
+            job.save()
+        job.save()
+        assert writes == [JobPhase.RUNNING]
+    assert writes == [JobPhase.RUNNING, JobPhase.DONE]
+    assert json.loads(job.lockfile.read_text()).state.is_done()
+
+    # Nothing to write if the job was not saved in the block
+    with job.batched_saves():
+        pass
+    assert len(writes) == 2
+
+
+def test_when_expressions_are_compiled_once(spec: JobSpec, space):
+    from _canary.job import compile_when
+
+    upstream = Job(spec=spec, workspace=space)
+    upstream.state.phase = JobPhase.DONE
+    upstream.status.set(outcome="DIFFED")
+    when = "diffed or failed or timeout"
+    deps = [Dependency(job=upstream, when=when) for _ in range(10)]
+    misses = compile_when.cache_info().misses
+    for _ in range(10):
+        assert all(dep.is_satisfied() for dep in deps)
+    assert compile_when.cache_info().misses == misses + 1
+    upstream.status.set(outcome="SUCCESS")
+    assert not any(dep.is_satisfied() for dep in deps)
+
+
+def test_dependency_summary_tracks_upstreams(repo: Path, space):
+    f = Path("suite/test_x.py")
+    a = Job(
+        spec=JobSpec(file_root=repo, file_path=f, id="a" * 64, family="a", timeout=10.0),
+        workspace=space,
+    )
+    b = Job(
+        spec=JobSpec(file_root=repo, file_path=f, id="b" * 64, family="b", timeout=10.0),
+        workspace=space,
+    )
+    spec = JobSpec(file_root=repo, file_path=f, id="c" * 64, family="c", timeout=10.0)
+    deps = [Dependency(job=a, when="on_success"), Dependency(job=b, when="on_failure")]
+    c = Job(spec=spec, workspace=space, dependencies=deps)
+
+    assert not c.is_ready()
+    summary = c.dependency_summary()
+    assert (summary.done, len(summary.pending)) == (0, 2)
+
+    a.state.phase = JobPhase.DONE
+    a.status.set(outcome="SUCCESS")
+    assert not c.is_ready()
+    assert (summary.done, summary.satisfied, summary.pending) == (1, 1, [deps[1]])
+
+    b.state.phase = JobPhase.DONE
+    b.status.set(outcome="SUCCESS")
+    assert not c.is_ready()
+    assert not c.is_runnable()
+    assert summary.violated == 1 and summary.blocker is deps[1]
+    assert c.state.is_done() and c.status.outcome.name == "BLOCKED"
@@ -0,0 +1,201 @@
+# Copyright NTESS. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import dataclasses
+import os
+import random
+import time
+from pathlib import Path
+from typing import Sequence
+from typing import cast
+
+import pytest
+
+from _canary.job import Job
+from _canary.job_graph import make_job_graph
+from _canary.jobspec import JobSpec
+from _canary.jobspec import SpecDependency
+from _canary.jobspec_graph import make_spec_graph
+from _canary.util.level_graph import LevelGraph
+
+# The larger sizes take over a minute to set up, run them with CANARY_BENCHMARKS=1
+benchmark = pytest.mark.skipif(
+    not os.getenv("CANARY_BENCHMARKS"), reason="set CANARY_BENCHMARKS=1 to run"
+)
+sizes = [10_000, pytest.param(100_000, marks=benchmark), pytest.param(500_000, marks=benchmark)]
+
+
+@dataclasses.dataclass(eq=False)
+class Node:
+    id: str
+    deps: list[str] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass(eq=False)
+class FakeJobDependency:
+    job: "FakeJob"
+    when: str = "on_success"
+
+
+@dataclasses.dataclass(eq=False)
+class FakeJob:
+    id: str
+    fullname: str
+    dependencies: list[FakeJobDependency] = dataclasses.field(default_factory=list)
+
+
+def random_edges(n: int, seed: int = 0, width: int = 1000) -> list[list[int]]:
+    """Each node depends on up to two of the ``width`` nodes before it"""
+    rng = random.Random(seed)
+    return [
+        sorted({rng.randrange(max(0, i - width), i) for _ in range(2)}) if i else []
+        for i in range(n)
+    ]
+
+
+def make_nodes(n: int, seed: int = 0) -> list[Node]:
+    return [
+        Node(f"n{i:06d}", [f"n{j:06d}" for j in deps])
+        for i, deps in enumerate(random_edges(n, seed, 20))
+    ]
+
+
+def node_graph(nodes: Sequence[Node], require_closed: bool = True) -> LevelGraph[Node]:
+    return LevelGraph.from_items(
+        nodes, id_fn=lambda n: n.id, deps_fn=lambda n: n.deps, require_closed=require_closed
+    )
+
+
+def assert_same(graph: LevelGraph, expected: LevelGraph) -> None:
+    assert graph.level_ids == expected.level_ids
+    assert graph.deps_by_id == expected.deps_by_id
+    assert {k: set(v) for k, v in graph.dependents_by_id.items()} == {
+        k: set(v) for k, v in expected.dependents_by_id.items()
+    }
+    assert graph.level_by_id == expected.level_by_id
+
+
+def test_project_matches_graph_built_from_selection():
+    nodes = make_nodes(500)
+    graph = node_graph(nodes)
+    rng = random.Random(1)
+    ids = rng.sample([n.id for n in nodes], 20)
+
+    closed = graph.project(ids, include_upstreams=True)
+    keep = set(closed.items_by_id)
+    assert_same(closed, node_graph([n for n in nodes if n.id in keep]))
+
+    downstream = graph.project(ids, include_downstreams=True, require_closed=False)
+    keep = set(downstream.items_by_id)
+    assert_same(downstream, node_graph([n for n in nodes if n.id in keep], require_closed=False))
+
+    with pytest.raises(ValueError):
+        graph.project([nodes[-1].id])
+
+
+def test_project_orders_levels_by_sort_key():
+    nodes = make_nodes(50)
+    graph = LevelGraph.from_items(
+        nodes, id_fn=lambda n: n.id, deps_fn=lambda n: n.deps, sort_key=lambda n: n.id[::-1]
+    )
+    ids = [n.id for n in nodes]
+    assert graph.project(ids).level_ids == graph.level_ids
+    assert graph.project(ids[::2], require_closed=False).level_ids == tuple(
+        tuple(sorted(level, key=lambda i: i[::-1]))
+        for level in graph.project(
+            ids[::2], require_closed=False, sort_key=lambda n: n.id
+        ).level_ids
+    )
+
+
+def test_add_and_remove_maintain_levels():
+    nodes = make_nodes(400)
+    graph = node_graph(nodes[:300])
+    graph = graph.add(nodes[300:], id_fn=lambda n: n.id, deps_fn=lambda n: n.deps)
+    assert_same(graph, node_graph(nodes))
+
+    with pytest.raises(ValueError):
+        graph.add([Node("n000000")], id_fn=lambda n: n.id, deps_fn=lambda n: n.deps)
+    with pytest.raises(ValueError):
+        graph.remove([nodes[0].id])
+
+    rng = random.Random(2)
+    removed = set(rng.sample([n.id for n in nodes], 40))
+    pruned = graph.remove(removed, require_closed=False)
+    assert_same(pruned, node_graph([n for n in nodes if n.id not in removed], require_closed=False))
+
+    downstream = graph.project([nodes[150].id], include_downstreams=True, require_closed=False)
+    pruned = graph.remove(downstream.items_by_id)
+    assert_same(pruned, node_graph([n for n in nodes if n.id not in downstream.items_by_id]))
+
+
+def test_add_detects_cycle():
+    graph = node_graph([Node("a")])
+    with pytest.raises(ValueError):
+        graph.add(
+            [Node("b", ["a", "c"]), Node("c", ["b"])],
+            id_fn=lambda n: n.id,
+            deps_fn=lambda n: n.deps,
+        )
+
+
+def benchmark_graph(graph: LevelGraph, ids: list[str], build_time: float) -> None:
+    # ids are in creation order, so the upstreams of the first 1% are within the first 1%
+    start = time.perf_counter()
+    k = len(ids) // 100
+    subgraph = graph.project(ids[k - 10 : k], include_upstreams=True)
+    elapsed = time.perf_counter() - start
+    assert 10 <= len(subgraph) <= k
+    assert elapsed < build_time / 10
+
+    start = time.perf_counter()
+    whole = graph.project(ids)
+    assert time.perf_counter() - start < build_time
+    same = whole.level_ids == graph.level_ids
+    assert same
+
+    tail = ids[-100:]
+    start = time.perf_counter()
+    pruned = graph.remove(tail, require_closed=False)
+    restored = pruned.add(
+        [graph.items_by_id[i] for i in tail],
+        id_fn=lambda item: item.id,
+        deps_fn=lambda item: graph.deps_by_id[item.id],
+    )
+    assert time.perf_counter() - start < build_time
+    same = restored.level_ids == graph.level_ids
+    assert same
+
+
+@pytest.mark.parametrize("n", sizes)
+def test_spec_graph_benchmark(n):
+    specs: list[JobSpec] = []
+    for i, deps in enumerate(random_edges(n)):
+        spec = JobSpec(
+            file_root=Path("/unused"),
+            file_path=Path(f"d{i % 100}/t{i}.pyt"),
+            family=f"t{i}",
+            id=f"{i:032x}",
+        )
+        spec.dependencies.extend(SpecDependency(spec=specs[j], when="on_success") for j in deps)
+        specs.append(spec)
+    start = time.perf_counter()
+    graph = make_spec_graph(specs[::-1])
+    build_time = time.perf_counter() - start
+    assert len(graph) == n
+    benchmark_graph(graph, [spec.id for spec in specs], build_time)
+
+
+@pytest.mark.parametrize("n", sizes)
+def test_job_graph_benchmark(n):
+    jobs: list[FakeJob] = []
+    for i, deps in enumerate(random_edges(n)):
+        job = FakeJob(id=f"{i:032x}", fullname=f"d{i % 100}/t{i}")
+        job.dependencies.extend(FakeJobDependency(jobs[j]) for j in deps)
+        jobs.append(job)
+    start = time.perf_counter()
+    graph = make_job_graph(cast(Sequence[Job], jobs[::-1]))
+    build_time = time.perf_counter() - start
+    assert len(graph) == n
+    benchmark_graph(graph, [job.id for job in jobs], build_time)
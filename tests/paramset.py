@@ -1,6 +1,10 @@
+import itertools
+import tracemalloc
+
 import pytest
 
 from _canary.paramset import ParameterSet
+from _canary.paramset import ParameterSpace
 from _canary.paramset import is_scalar
 from _canary.paramset import transpose
 
@@ -142,6 +146,58 @@ def test_combine_multiple_keys_flattened_order():
     assert out == [{"a": 1, "b": 2, "c": 3}]
 
 
+def test_parameter_space_matches_product_order():
+    ps1 = ParameterSet.list_parameter_space("a", [1, 1, 2])
+    ps2 = ParameterSet.list_parameter_space("b,c", [(10, "x"), (20, "y"), (10, "x")])
+    space = ParameterSpace([ps1, ps2])
+    expected = [{"a": a, "b": b, "c": c} for a in (1, 2) for b, c in ((10, "x"), (20, "y"))]
+    assert list(space) == expected
+    assert len(space) == 4
+    assert [space[i] for i in range(-4, 4)] == expected + expected
+    with pytest.raises(IndexError):
+        space[4]
+
+
+def test_parameter_space_filters():
+    ps1 = ParameterSet.list_parameter_space("a", [1, 2, 3])
+    ps2 = ParameterSet.list_parameter_space("b", [1, 2])
+    space = ParameterSpace([ps1, ps2])
+
+    pushed = space.filter(lambda p: p["a"] != 2, keys=["a"])
+    assert pushed.rows[0] == [(1,), (3,)] and not pushed.predicates
+    assert len(pushed) == 4 and pushed[-1] == {"a": 3, "b": 2}
+
+    residual = pushed.filter(lambda p: p["a"] > p["b"], keys=["a", "b"])
+    assert residual.predicates
+    assert list(residual) == [{"a": 3, "b": 1}, {"a": 3, "b": 2}]
+    assert len(residual) == 2 and residual[1] == {"a": 3, "b": 2}
+    assert not residual.filter(lambda p: False)
+    assert len(space) == 6
+
+
+def test_parameter_space_benchmark_million_combinations():
+    sizes = (10, 10, 100, 100)
+    psets = [
+        ParameterSet.list_parameter_space(f"p{i}", list(range(n))) for i, n in enumerate(sizes)
+    ]
+    tracemalloc.start()
+    try:
+        space = ParameterSpace(psets)
+        assert len(space) == 1_000_000
+        assert space[765_432] == {"p0": 7, "p1": 6, "p2": 54, "p3": 32}
+        survivors = space.filter(lambda p: p["p2"] == 0, keys=["p2"])
+        survivors = survivors.filter(lambda p: p["p3"] % 10 == 0, keys=["p3"])
+        assert len(survivors) == 1_000
+        assert sum(1 for _ in survivors) == 1_000
+        first = list(itertools.islice(space, 3))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert first[2] == {"p0": 0, "p1": 0, "p2": 0, "p3": 2}
+    # Materializing the full product takes hundreds of megabytes
+    assert peak < 1_000_000
+
+
 def test_is_scalar():
     assert is_scalar(1)
     assert is_scalar(1.0)
@@ -0,0 +1,110 @@
+# Copyright NTESS. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+
+import pytest
+
+from _canary import plugincache
+from _canary.config.argparsing import make_argument_parser
+from _canary.pluginmanager import CanaryPluginManager
+
+
+@pytest.fixture
+def cache_file(tmp_path, monkeypatch):
+    file = tmp_path / "startup.json"
+    monkeypatch.setenv("CANARY_STARTUP_CACHE", str(file))
+    monkeypatch.setattr(plugincache, "_cache", None)
+    return file
+
+
+def hookimpls(pm: CanaryPluginManager) -> dict[str, list[tuple[str, str]]]:
+    impls: dict[str, list[tuple[str, str]]] = {}
+    for name, caller in vars(pm.hook).items():
+        for impl in caller.get_hookimpls():
+            impls.setdefault(name, []).append((impl.plugin_name, impl.function.__name__))
+    return impls
+
+
+def test_cached_registry_matches_discovery(cache_file):
+    pm = CanaryPluginManager.factory()
+    assert cache_file.exists()
+    assert not any(isinstance(p, plugincache.LazyPlugin) for p in pm.get_plugins())
+
+    plugincache._cache = None
+    cached = CanaryPluginManager.factory()
+    assert all(isinstance(p, plugincache.LazyPlugin) for p in cached.get_plugins())
+    assert [name for name, _ in cached.list_name_plugin()] == [
+        name for name, _ in pm.list_name_plugin()
+    ]
+    assert hookimpls(cached) == hookimpls(pm)
+    assert "status" in plugincache.known_commands()
+
+
+def test_lazy_commands(cache_file):
+    CanaryPluginManager.factory()
+    pm = CanaryPluginManager.factory()
+    parser = make_argument_parser()
+    parser.command_hint = "status"
+    pm.hook.canary_addcommand(parser=parser)
+    command = parser.get_command("status")
+    assert isinstance(command, plugincache.LazyCommand)
+    assert command._command is None
+
+    # Plugins can add options to commands that will not run without setting them up
+    parser.add_plugin_argument("--spam", command="run", action="store_true")
+    run = parser.get_command("run")
+    assert run._command is None
+
+    args = parser.parse_args(["status", "--durations", "3"])
+    assert args.durations == 3
+    assert type(command._command).__name__ == "Status"
+    assert run._command is None
+
+    # Without a hint, the parser of a command is set up before plugins add options to it
+    parser.command_hint = None
+    parser.add_plugin_argument("--eggs", command="run", action="store_true")
+    assert type(run._command).__name__ == "Run"
+    help = parser.get_subparser("run").format_help()
+    assert help.index("--workers") < help.index("--eggs")
+
+
+def test_stale_cache_is_ignored(cache_file, tmp_path, monkeypatch):
+    source = tmp_path / "plugin.py"
+    source.write_text("x = 1\n")
+    before = plugincache.fingerprint([str(source)])
+    assert plugincache.fingerprint([str(source)]) == before
+    st = source.stat()
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert plugincache.fingerprint([str(source)]) != before
+
+    # Plugins can be enabled or disabled by the environment and configuration files
+    before = plugincache.fingerprint([str(source)])
+    monkeypatch.setenv("CANARY_PLUGINS", "no:builtin.post_clean")
+    assert plugincache.fingerprint([str(source)]) != before
+    before = plugincache.fingerprint([str(source)])
+    config = tmp_path / "config.yaml"
+    monkeypatch.setenv("CANARY_GLOBAL_CONFIG", str(config))
+    config.write_text("canary:\n  plugins: []\n")
+    assert plugincache.fingerprint([str(source)]) != before
+    monkeypatch.delenv("CANARY_PLUGINS")
+    monkeypatch.delenv("CANARY_GLOBAL_CONFIG")
+
+    CanaryPluginManager.factory()
+    plugincache._cache = None
+    data = plugincache.load()
+    assert data is not None
+    data["fingerprint"] = before
+    cache_file.write_text(json.dumps(data))
+    plugincache._cache = None
+    assert plugincache.load() is None
+
+
+def test_startup_cache_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("CANARY_STARTUP_CACHE", "0")
+    monkeypatch.setattr(plugincache, "_cache", None)
+    assert plugincache.cache_file() is None
+    pm = CanaryPluginManager.factory()
+    assert not any(isinstance(p, plugincache.LazyPlugin) for p in pm.get_plugins())
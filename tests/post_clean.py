@@ -0,0 +1,46 @@
+# Copyright NTESS. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: MIT
+
+from pathlib import Path
+from types import SimpleNamespace
+
+from _canary import config
+from _canary.job import Job
+from _canary.jobspec import JobSpec
+from _canary.plugins.builtin import post_clean
+from _canary.testexec import ExecutionSpace
+
+
+def make_job(tmp_path: Path, name: str, category: str, outcome: str) -> Job:
+    spec = JobSpec(file_root=tmp_path, file_path=Path(f"{name}.pyt"), family=name, id=name * 16)
+    job = Job(spec=spec, workspace=ExecutionSpace(root=tmp_path / "s1", path=Path(name)))
+    job.workspace.create(exist_ok=True)
+    (tmp_path / "mesh.exo").write_text("mesh")
+    (job.workspace.dir / "mesh.exo").symlink_to(tmp_path / "mesh.exo")
+    (job.workspace.dir / "result.txt").write_text("result")
+    (job.workspace.dir / "out/nested").mkdir(parents=True)
+    (job.workspace.dir / job.stdout).write_text("output")
+    job.status.set(category=category, outcome=outcome)
+    job.save()
+    return job
+
+
+def test_teardown_cleans_successful_jobs(tmp_path):
+    passed = make_job(tmp_path, "a", "PASS", "SUCCESS")
+    failed = make_job(tmp_path, "b", "FAIL", "FAILED")
+    session = SimpleNamespace(jobs=[passed, failed])
+
+    with config.override():
+        post_clean.canary_sessionfinish(session=session)
+    assert (passed.workspace.dir / "result.txt").exists()
+
+    with config.override():
+        setattr(config.options, "teardown", True)
+        post_clean.canary_sessionfinish(session=session)
+    assert sorted(p.name for p in passed.workspace.dir.iterdir()) == sorted(
+        [passed.lockfile.name, passed.stdout]
+    )
+    assert (tmp_path / "mesh.exo").exists()
+    assert (failed.workspace.dir / "result.txt").exists()
+    assert (failed.workspace.dir / "out/nested").exists()
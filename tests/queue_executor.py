@@ -2,12 +2,18 @@
 #
 # SPDX-License-Identifier: MIT
 
+import threading
+import time
 from typing import Any
 from typing import Callable
 from typing import cast
 
 from _canary.job import BaseJob
 from _canary.job import JobState
+from _canary.job import Measurements
+from _canary.queue import Busy
+from _canary.queue import ResourceQueue
+from _canary.queue import RetryPolicy
 from _canary.queue_executor import ExecutionSlot
 from _canary.queue_executor import ResourceQueueExecutor
 from _canary.status import Status
@@ -80,6 +86,9 @@ class DummyQueue:
         self.done_jobs: list[BaseJob] = []
         self.cleared: str | None = None
 
+    def requeue(self, job: BaseJob) -> bool:
+        return False
+
     def done(self, job: BaseJob) -> None:
         self.done_jobs.append(job)
 
@@ -232,3 +241,63 @@ def test_terminate_all_marks_inflight_jobs_error_for_non_interrupt() -> None:
     assert queue.done_jobs == [job]
     assert queue.cleared == "ERROR"
     assert job.timekeeper._finished > 0
+
+
+class RepeatableJob(DummyJob):
+    def __init__(self, id: str) -> None:
+        super().__init__(id)
+        self.measurements = Measurements()
+        self.repeat_in_queue = False
+
+    def required_resources(self):
+        return [{"cpus": 1}]
+
+
+class FakePool:
+    def accommodates(self, required) -> bool:
+        return True
+
+    def checkout(self, required):
+        return {"cpus": len(required)}
+
+    def checkin(self, allocation) -> None:
+        pass
+
+
+def test_failed_job_is_requeued_behind_other_work() -> None:
+    retry = RetryPolicy(until_pass=2, backoff=0.05)
+    flaky, other = RepeatableJob("a" * 64), RepeatableJob("b" * 64)
+    flaky.cost = lambda: 2.0  # type: ignore[method-assign]
+    queue = ResourceQueue(threading.Lock(), cast(Any, FakePool()), [flaky, other], retry=retry)
+    executor = make_executor(cast(Any, queue))
+    events = add_listener(executor)
+    assert flaky.repeat_in_queue
+
+    def run(job: BaseJob, outcome: str) -> None:
+        slot = ExecutionSlot(job=job, qrank=1, qsize=2, worker_id=0)
+        executor.slots_by_id[job.id] = slot
+        executor.running[job.id] = slot
+        executor.busy_workers[0] = job.id
+        job.set_status(outcome=outcome)
+        executor._handle_worker_payload({"job_id": job.id, "worker_id": 0, "event": "job_finished"})
+
+    assert queue.get() is flaky
+    run(flaky, "FAILED")
+    assert events == []
+    assert not flaky.state.is_done() and flaky.status.is_unset()
+    assert len(queue) == 2 and not queue._busy
+
+    # The repeat yields to work that has not yet run, and then waits out its backoff
+    assert queue.get() is other
+    run(other, "SUCCESS")
+    try:
+        queue.get()
+    except Busy:
+        time.sleep(0.05)
+    assert queue.get() is flaky
+    run(flaky, "SUCCESS")
+
+    assert [slot.job for _, slot in events] == [other, flaky]
+    attempts = flaky.measurements.data["attempts"]
+    assert [(a["attempt"], a["outcome"]) for a in attempts] == [(1, "FAILED"), (2, "SUCCESS")]
+    assert "attempts" not in other.measurements.data
@@ -47,7 +47,6 @@ if __name__ == "__main__":
         workspace = Workspace.create(root)
         specs = workspace.collect({str(root): []})
         with config.override():
-            setattr(config.options, "report", ["html"])
             session = workspace.run(specs, only="all")
 
         ns = SimpleNamespace(
@@ -174,6 +173,56 @@ def test_html_report_updates_in_place(setup):
         assert after[job.id]["status"] == before[job.id]["status"]
 
 
+def test_html_report_only_rewrites_changed_jobs(setup):
+    jobs = latest_jobs(setup.workspace)
+    output_dir = setup.tmp_path / "INCREMENTAL_HTML"
+
+    reporter = HTMLReporter()
+    reporter.write(HTMLReportRequest(workspace=setup.workspace, jobs=jobs, output_dir=output_dir))
+    pages = {job.id: output_dir / "jobs" / f"{job.id}.html" for job in jobs}
+    for page in pages.values():
+        page.write_text("sentinel")
+
+    # Nothing changed: no page is rewritten
+    reporter.write(HTMLReportRequest(workspace=setup.workspace, jobs=jobs, output_dir=output_dir))
+    assert all(page.read_text() == "sentinel" for page in pages.values())
+
+    # Only the page of the changed job is rewritten
+    updated = jobs[0]
+    updated.status = Status.DIFFED(reason="synthetic diff for incremental report test")
+    reporter.write(HTMLReportRequest(workspace=setup.workspace, jobs=jobs, output_dir=output_dir))
+    assert pages[updated.id].read_text() != "sentinel"
+    for job in jobs[1:]:
+        assert pages[job.id].read_text() == "sentinel"
+    assert (output_dir / "Diff.html").exists()
+    manifest = load_manifest(output_dir / "manifest.json")
+    assert all(manifest[job.id]["fingerprint"] for job in jobs)
+
+
+def test_iter_jobs_streams_latest_results(setup):
+    jobs = {job.id: job for job in latest_jobs(setup.workspace)}
+    records = list(setup.workspace.iter_jobs(batch_size=1))
+    assert sorted(record.id for record in records) == sorted(jobs)
+    for record in records:
+        assert record.dependencies == []
+        assert record.status == jobs[record.id].status
+        assert record.workspace.dir == jobs[record.id].workspace.dir
+
+
+def test_html_report_from_job_stream(setup):
+    output_dir = setup.tmp_path / "STREAM_HTML"
+    request = HTMLReportRequest(
+        workspace=setup.workspace, jobs=setup.workspace.iter_jobs(), output_dir=output_dir
+    )
+    reporter = HTMLReporter()
+    reporter.render_batch_size = 1
+    reporter.write(request)
+
+    manifest = load_manifest(output_dir / "manifest.json")
+    assert sorted(manifest) == sorted(job.id for job in latest_jobs(setup.workspace))
+    assert all((output_dir / "jobs" / f"{id}.html").exists() for id in manifest)
+
+
 def test_markdown_report(setup):
     jobs = latest_jobs(setup.workspace)
     output_dir = setup.tmp_path / "MARKDOWN"
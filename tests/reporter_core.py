@@ -2,6 +2,7 @@
 #
 # SPDX-License-Identifier: MIT
 
+import threading
 from types import SimpleNamespace
 from typing import Any
 from typing import Callable
@@ -9,9 +10,13 @@ from typing import cast
 
 from _canary.job import BaseJob
 from _canary.job import JobState
+from _canary.jobstate import JobPhase
+from _canary.queue import ResourceQueue
 from _canary.queue_executor import ExecutionSlot
 from _canary.reporter import EventReporter
 from _canary.reporter import Reporter
+from _canary.resource_pool import ResourcePool
+from _canary.resource_pool.rpool import NodeRequest
 from _canary.status import Status
 from _canary.timekeeper import Timekeeper
 
@@ -85,7 +90,7 @@ class DummyQueue:
     def jobs(self) -> list[BaseJob]:
         return list(self._jobs)
 
-    def pending(self) -> list[BaseJob]:
+    def pending(self, limit: int | None = None) -> list[BaseJob]:
         return []
 
     def status(self, start: float | None = None) -> str:
@@ -220,3 +225,57 @@ def test_row_values_for_job_falls_back_to_timekeeper():
     assert values["running"].strip() == "4.0s"
     assert values["total"].strip() == "9.0s"
     assert values["details"] == "boom"
+
+
+def test_event_reporter_renders_queued_events() -> None:
+    job = DummyJob(name="event")
+    executor = DummyExecutor([job])
+    reporter = EventReporter(executor)
+    rendered: list[tuple[str, str]] = []
+    for event in reporter.handlers:
+        reporter.handlers[event] = lambda slot, event=event: rendered.append((event, slot.job.name))
+
+    slot = make_slot()
+    with reporter:
+        for event in ("job_submitted", "job_started", "job_unknown", "job_finished"):
+            for cb in executor.listeners:
+                cb(event, slot)
+    assert not executor.listeners
+    assert rendered == [
+        ("job_submitted", "myjob"),
+        ("job_started", "myjob"),
+        ("job_finished", "myjob"),
+    ]
+
+
+class CpuJob(DummyJob):
+    def required_resources(self):
+        request = NodeRequest()
+        request.add("cpus", 1)
+        return [request]
+
+
+def test_queue_status_keeps_running_totals() -> None:
+    pool = ResourcePool(
+        {"nodes": [{"id": "local", "resources": {"cpus": [{"id": "0", "slots": 1}], "gpus": []}}]}
+    )
+    queue = ResourceQueue(threading.Lock(), resource_pool=pool)
+    jobs = [CpuJob(id=c * 64, name=c) for c in "abc"]
+    jobs[1].status.set(outcome="FAILED")
+    queue.put(*jobs)
+    assert queue.status().startswith("0/3 [green]RUNNING[/]")
+
+    for _ in jobs:
+        job = queue.get()
+        if job.name != "c":
+            job.state.phase = JobPhase.DONE
+        queue.done(job)
+    counts = queue.counts()
+    assert (counts.pending, counts.busy, counts.done) == (0, 0, 3)
+    assert sum(counts.totals.values()) == 2
+
+    # Jobs are counted once they reach their final state
+    jobs[2].state.phase = JobPhase.DONE
+    text = queue.status()
+    assert text.startswith("3/3 [blue]COMPLETE[/], 2 [bold green]SUCCESS[/], 1 [bold red]FAILED[/]")
+    assert sum(queue.counts().totals.values()) == 3
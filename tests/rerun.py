@@ -24,8 +24,16 @@ def create_workspace(root: Path) -> tuple[Workspace, list[canary.JobSpec]]:
         return workspace, specs
 
 
-def run_specs(workspace: Workspace, specs: list[canary.JobSpec], *, only: str = "all"):
-    with working_dir(workspace.root), canary.config.override():
+def run_specs(
+    workspace: Workspace,
+    specs: list[canary.JobSpec],
+    *,
+    only: str = "all",
+    record_inputs: bool = False,
+):
+    with working_dir(workspace.root), canary.config.override() as config:
+        if record_inputs:
+            config.set("run:record_inputs", True)
         return workspace.run(specs, only=only)
 
 
@@ -364,6 +372,94 @@ if __name__ == "__main__":
     assert started_at(jobs2["downstream"]) == downstream_started_1
 
 
+def test_rerun_changed_detects_modified_assets(tmp_path):
+    root = tmp_path / "rerun-changed-assets"
+    root.mkdir()
+
+    data = root / "data.txt"
+    data.write_text("1")
+    for name in ("a", "b"):
+        write(
+            root / f"{name}.pyt",
+            """\
+import sys
+import canary
+canary.directives.copy("data.txt")
+canary.directives.parameterize("n", [1, 2])
+def test():
+    pass
+if __name__ == "__main__":
+    sys.exit(test())
+"""
+            if name == "a"
+            else """\
+import sys
+def test():
+    pass
+if __name__ == "__main__":
+    sys.exit(test())
+""",
+        )
+
+    workspace, specs = create_workspace(root)
+    session1 = run_specs(workspace, specs, only="all", record_inputs=True)
+    assert session1.returncode == 0
+    jobs1 = {job.display_name(): job for job in workspace.load_jobs()}
+
+    # Touching a file without changing its contents is not a change
+    time.sleep(0.05)
+    (root / "b.pyt").touch()
+    data.write_text("2")
+
+    session2 = run_specs(workspace, specs, only="changed")
+    assert session2.returncode == 0
+    jobs2 = {job.display_name(): job for job in workspace.load_jobs()}
+    for name, job in jobs2.items():
+        if name.startswith("a"):
+            assert started_at(job) > started_at(jobs1[name])
+        else:
+            assert started_at(job) == started_at(jobs1[name])
+
+
+def test_inputs_are_recorded_once_change_detection_is_used(tmp_path, monkeypatch):
+    root = tmp_path / "rerun-record-inputs"
+    root.mkdir()
+    body = """\
+import sys
+def test():
+    pass
+if __name__ == "__main__":
+    sys.exit(test())
+"""
+    for name in ("a", "b"):
+        write(root / f"{name}.pyt", body)
+
+    workspace, specs = create_workspace(root)
+    run_specs(workspace, specs, only="all")
+    assert not workspace.db.has_spec_inputs()
+
+    write(root / "b.pyt", body + "# edited\n")
+    with working_dir(root), canary.config.override():
+        specs = workspace.collect({str(root): []})
+    run_specs(workspace, specs, only="changed")
+    assert workspace.db.has_spec_inputs()
+
+    # Later sessions keep the records current, but only rewrite specs whose inputs changed
+    written: list[set[str]] = []
+    put_spec_inputs = workspace.db.put_spec_inputs
+
+    def record_put(rows):
+        written.append(set(rows))
+        put_spec_inputs(rows)
+
+    monkeypatch.setattr(workspace.db, "put_spec_inputs", record_put)
+    ids = {spec.name: spec.id for spec in specs}
+    run_specs(workspace, specs, only="all")
+    assert written == [{ids["a"]}]
+    run_specs(workspace, specs, only="all")
+    assert written == [{ids["a"]}]
+
+
 @pytest.mark.skipif(True, reason="Rerun closure still being worked on")
 def test_rerun_changed_includes_downstream_closure(tmp_path):
     root = tmp_path / "rerun-changed-downstream"
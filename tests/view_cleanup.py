@@ -102,3 +102,43 @@ def test_rebuild_view_refuses_non_owning_directory(tmp_path):
             )
 
         assert (view / "user-file.txt").exists()
+
+
+def test_select_from_view_without_scanning(tmp_path, monkeypatch):
+    import _canary.workspace
+
+    root = tmp_path / "view-select"
+    root.mkdir()
+    body = "def test():\n    pass\n\nif __name__ == '__main__':\n    test()\n"
+    write(root / "foo" / "a.pyt", body)
+    write(root / "foo" / "b.pyt", body)
+    write(root / "bar" / "c.pyt", body)
+
+    with working_dir(root), canary.config.override():
+        workspace = Workspace.create(root)
+        specs = workspace.collect({str(root): []})
+        session = workspace.run(specs, only="all")
+        assert session.returncode == 0
+        view = root / "TestResults"
+        by_name = {spec.name: spec.id for spec in specs}
+
+        def no_scan(path):
+            raise AssertionError(f"unexpected scan of {path}")
+
+        # Manifest fast path
+        monkeypatch.setattr(_canary.workspace, "scan_job_ids", no_scan)
+        found = {spec.name for spec in workspace.select_from_view(view / "foo")}
+        assert found == {"a", "b"}
+        assert len(workspace.select_from_view(view)) == 3
+        assert workspace.find_job(str(view / "bar" / "c")).id == by_name["c"]
+        assert workspace.find_jobspec(str(view / "foo" / "a")).id == by_name["a"]
+
+        # Database fallback when the manifest is unavailable
+        (view / ".canary-view.json").unlink()
+        found = {spec.name for spec in workspace.select_from_view(view / "foo")}
+        assert found == {"a", "b"}
+        monkeypatch.undo()
+
+        # Directory scan for paths unknown to the manifest and the database
+        assert sorted(_canary.workspace.scan_job_ids(view)) == sorted(by_name.values())
+        assert workspace.select_from_view(root / "foo") == []
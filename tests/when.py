@@ -228,3 +228,14 @@ def test_testname_case_sensitive_default_true():
     w = When.from_string("testname=Foo")
     assert w.evaluate(testname="Foo").value is True
     assert w.evaluate(testname="foo").value is False
+
+
+def test_parameter_key_projects_on_referenced_parameters():
+    expr = When.from_string("parameters='np>1' options='${MESH}'")
+    assert expr.names >= {"np", "MESH"}
+    a = expr.parameter_key({"np": 2, "mesh": "a", "dt": 0.1})
+    assert a == expr.parameter_key({"np": 2, "mesh": "a", "dt": 0.2})
+    assert a != expr.parameter_key({"np": 2, "mesh": "b", "dt": 0.1})
+    assert a != expr.parameter_key({"mesh": "a", "dt": 0.1})
+    assert When.from_string("options=dbg").parameter_key({"np": 1}) == ()
+    assert expr.parameter_key(None) is None
@@ -127,3 +127,46 @@ def test_info_contains_expected_fields(chdir_tmp):
     assert "version" in info
     assert "workspace_version" in info
     assert info["root"] == str(ws.root)
+
+
+def test_gc_prunes_superseded_results_and_unreferenced_specs(chdir_tmp):
+    import json
+
+    from _canary.util.testing import generate_random_jobs
+
+    ws = Workspace.create(chdir_tmp / "proj")
+    jobs = generate_random_jobs(chdir_tmp / "src", count=4)
+    upstream = {dep.job.id for job in jobs for dep in job.dependencies}
+    orphan = next(job for job in jobs if job.id not in upstream)
+    jobs.remove(orphan)
+    ws.db.put_specs([job.spec for job in jobs] + [orphan.spec])
+    ws.db.put_selection("sel", [job.spec for job in jobs])
+
+    # s1 is superseded by s2, and s3 reruns a single job
+    for name, ran in (("s1", jobs), ("s2", jobs), ("s3", jobs[:1])):
+        for job in ran:
+            job.workspace.root = ws.sessions_dir / name
+            job.workspace.session = name
+            job.workspace.create(exist_ok=True)
+            (job.workspace.dir / "output.txt").write_text("x" * 1024)
+            job.status.set(category="PASS", outcome="SUCCESS")
+        ws.db.put_results(*ran)
+    running = ws.sessions_dir / "s4"
+    running.mkdir()
+    (running / "session.lock").write_text(json.dumps({"finished_on": "0001-01-01T00:00:00"}))
+
+    preview = ws.gc(dryrun=True, keep=2)
+    assert (ws.sessions_dir / "s1").exists()
+    assert len(ws.db.load_specs()) == len(jobs) + 1
+
+    stats = ws.gc(keep=2)
+    assert (stats.sessions, stats.directories) == (preview.sessions, preview.directories) == (1, 1)
+    assert (stats.results, stats.specs) == (preview.results, preview.specs) == (len(jobs), 1)
+    assert stats.bytes >= preview.bytes >= (len(jobs) + 1) * 1024
+    assert sorted(p.name for p in ws.sessions_dir.iterdir()) == ["s2", "s3", "s4"]
+    assert not (ws.sessions_dir / "s2" / jobs[0].workspace.path).exists()
+    assert all((ws.sessions_dir / "s2" / job.workspace.path).exists() for job in jobs[1:])
+    assert {spec.id for spec in ws.db.load_specs()} == {job.id for job in jobs}
+    history = ws.db.get_result_history(jobs[0].id)
+    assert [r["session"] for r in history] == ["s2", "s3"]
+    assert ws.gc(keep=2).directories == 0